@@ -1,14 +1,172 @@
-"""HTTP client for Checko API."""
+"""HTTP client for Checko API.
+
+All CheckoClient instances share one keep-alive httpx.AsyncClient and one pool of
+API keys (CHECKO_API_KEY, comma-separated). Every request takes a token from its
+key's token bucket (CHECKO_KEY_RATE_PER_SEC, burst CHECKO_KEY_BURST), so load is
+spread across keys before Checko starts answering 429. A key that got 429/403 or a
+limit error is cooled down for CHECKO_KEY_COOLDOWN_SEC; network errors and 5xx are
+retried with exponential backoff and jitter.
+"""
+import asyncio
+import random
+import time
 import httpx
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+class CheckoKeysExhausted(RuntimeError):
+    """Every API key is rate limited or blocked."""
+
+
+class TokenBucket:
+    """Token bucket: `rate` requests per second with bursts of up to `capacity`."""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = max(0.01, float(rate))
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 = available now)."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+    
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+
+class CheckoKeyPool:
+    """API keys with per-key token buckets and cooldowns after 429/403."""
+    
+    def __init__(self, keys: List[str], rate: float, burst: float, cooldown_seconds: float):
+        self.keys = list(keys)
+        self.cooldown_seconds = max(0.0, float(cooldown_seconds))
+        self._buckets = {key: TokenBucket(rate, burst) for key in self.keys}
+        self._cooldown_until = {key: 0.0 for key in self.keys}
+        self._lock = asyncio.Lock()
+        # Counters per key number (keys themselves are never exposed)
+        self._requests = {key: 0 for key in self.keys}
+        self._limited = {key: 0 for key in self.keys}
+    
+    def key_number(self, key: str) -> int:
+        return self.keys.index(key) + 1
+    
+    def _next_key(self) -> Tuple[Optional[str], float]:
+        """(key with most tokens, 0) if any key has a token now, else (None, seconds to wait)."""
+        now = time.monotonic()
+        best_key = None
+        best_wait = None
+        for key in self.keys:
+            wait = max(self._cooldown_until[key] - now, self._buckets[key].wait_time())
+            if wait <= 0:
+                if best_key is None or self._buckets[key].tokens > self._buckets[best_key].tokens:
+                    best_key = key
+            elif best_wait is None or wait < best_wait:
+                best_wait = wait
+        if best_key is not None:
+            return best_key, 0.0
+        return None, best_wait or 0.0
+    
+    async def acquire(self, max_wait: float) -> str:
+        """Take a token from the key that has one first; wait at most `max_wait` seconds."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            async with self._lock:
+                key, wait = self._next_key()
+                if key is not None:
+                    self._buckets[key].take()
+                    self._requests[key] += 1
+                    return key
+            if time.monotonic() + wait > deadline:
+                raise CheckoKeysExhausted("All Checko API keys are rate limited")
+            await asyncio.sleep(wait)
+    
+    def cool_down(self, key: str) -> None:
+        """Stop using a key for cooldown_seconds (429, 403 or limit error)."""
+        self._limited[key] += 1
+        self._cooldown_until[key] = time.monotonic() + self.cooldown_seconds
+        logger.warning(f"Checko API key #{self.key_number(key)} cooled down for {self.cooldown_seconds:.0f}s")
+    
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "keys": [
+                {
+                    "key": self.key_number(key),
+                    "requests": self._requests[key],
+                    "limited": self._limited[key],
+                    "cooldown_seconds_left": round(max(0.0, self._cooldown_until[key] - now), 1),
+                    "tokens": round(self._buckets[key].tokens, 2),
+                }
+                for key in self.keys
+            ],
+        }
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+_key_pools: Dict[Tuple[str, ...], CheckoKeyPool] = {}
+
+
+def get_checko_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive HTTP client for Checko API."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=settings.CHECKO_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CHECKO_MAX_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
+
+async def close_checko_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_checko_key_pool(keys: List[str]) -> CheckoKeyPool:
+    """Process-wide key pool for a set of keys (rate limits are per key, not per client)."""
+    pool_id = tuple(keys)
+    pool = _key_pools.get(pool_id)
+    if pool is None:
+        pool = _key_pools[pool_id] = CheckoKeyPool(
+            keys,
+            rate=settings.CHECKO_KEY_RATE_PER_SEC,
+            burst=settings.CHECKO_KEY_BURST,
+            cooldown_seconds=settings.CHECKO_KEY_COOLDOWN_SEC,
+        )
+    return pool
+
+
+def _is_limit_error(response: httpx.Response) -> bool:
+    """Checko also reports exhausted quotas as JSON {"error": "..."}."""
+    try:
+        data = response.json()
+    except ValueError:
+        return False
+    if not isinstance(data, dict):
+        return False
+    error_msg = str(data.get('error') or '').lower()
+    return 'limit' in error_msg or 'quota' in error_msg or 'превышен' in error_msg
+
+
 class CheckoClient:
-    """Client for Checko API v2 with automatic API key rotation."""
+    """Client for Checko API v2 with per-key rate limiting and key rotation."""
     
     BASE_URL = "https://api.checko.ru/v2"
     
@@ -20,7 +178,6 @@ class CheckoClient:
         """
         # Список API ключей для ротации
         self._api_keys: List[str] = []
-        self._current_key_index: int = 0
         
         if api_key:
             self._api_keys = [api_key]
@@ -29,7 +186,7 @@ class CheckoClient:
             self._load_api_keys()
             if not self._api_keys:
                 raise ValueError("Checko API key is required")
-        self.api_key = self._api_keys[self._current_key_index]
+        self._keys = get_checko_key_pool(self._api_keys)
     
     def _load_api_keys(self):
         """Load API keys from settings."""
@@ -41,87 +198,73 @@ class CheckoClient:
         # Разделяем по запятой и очищаем пробелы
         keys = [k.strip() for k in keys_str.split(',') if k.strip()]
         self._api_keys = keys
-        logger.info(f"Loaded {len(self._api_keys)} Checko API key(s) for rotation")
-    
-    def _rotate_api_key(self):
-        """Rotate to the next API key."""
-        if len(self._api_keys) <= 1:
-            logger.warning("Cannot rotate API key: only one key available")
-            return False
-        
-        self._current_key_index = (self._current_key_index + 1) % len(self._api_keys)
-        self.api_key = self._api_keys[self._current_key_index]
-        logger.info(f"Rotated to API key #{self._current_key_index + 1}/{len(self._api_keys)}")
-        return True
+        logger.debug(f"Loaded {len(self._api_keys)} Checko API key(s) for rotation")
     
     async def _make_request(self, url: str, params: Dict[str, Any], max_retries: int = None) -> Dict[str, Any]:
-        """Make HTTP request with automatic API key rotation on rate limit.
+        """Make HTTP request with per-key rate limiting, key rotation and retries.
         
         Args:
             url: API endpoint URL
             params: Request parameters
-            max_retries: Maximum number of retries with different keys (default: number of keys)
+            max_retries: Maximum number of retries (default: keys + CHECKO_MAX_RETRIES)
             
         Returns:
             API response data
             
         Raises:
-            httpx.HTTPStatusError: If all API keys are exhausted or other error occurs
+            CheckoKeysExhausted: If all API keys are rate limited for too long
+            httpx.HTTPStatusError: If the request fails with a non-retryable status
         """
         if max_retries is None:
-            max_retries = len(self._api_keys)
+            max_retries = len(self._api_keys) + settings.CHECKO_MAX_RETRIES
+        client = get_checko_http_client()
         
-        last_error = None
+        last_error: Optional[Exception] = None
+        transient_failures = 0
         
-        for attempt in range(max_retries):
-            params["key"] = self.api_key
+        for attempt in range(max(1, max_retries)):
+            key = await self._keys.acquire(max_wait=settings.CHECKO_KEY_MAX_WAIT_SEC)
+            key_number = self._keys.key_number(key)
             
             try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.get(url, params=params)
-                    
-                    # Проверяем на ошибку лимита (429) или блокировку (403)
-                    if response.status_code == 429 or response.status_code == 403:
-                        if response.status_code == 429:
-                            logger.warning(f"Rate limit exceeded for API key #{self._current_key_index + 1}")
-                        else:  # 403
-                            logger.warning(f"API key blocked (403) for key #{self._current_key_index + 1}")
-                        if self._rotate_api_key():
-                            continue  # Пробуем следующий ключ
-                        else:
-                            response.raise_for_status()
-                    
-                    # Проверяем ответ на наличие ошибки лимита в JSON
-                    try:
-                        data = response.json()
-                        if isinstance(data, dict):
-                            error_msg = data.get('error', '').lower()
-                            if 'limit' in error_msg or 'quota' in error_msg or 'превышен' in error_msg:
-                                logger.warning(f"API limit error in response for key #{self._current_key_index + 1}: {error_msg}")
-                                if self._rotate_api_key():
-                                    continue  # Пробуем следующий ключ
-                    except:
-                        pass
-                    
-                    response.raise_for_status()
-                    return response.json()
-                    
-            except httpx.HTTPStatusError as e:
+                response = await client.get(url, params={**params, "key": key})
+            except (httpx.TimeoutException, httpx.TransportError) as e:
                 last_error = e
-                if e.response.status_code == 429:
-                    logger.warning(f"Rate limit (429) for API key #{self._current_key_index + 1}")
-                    if attempt < max_retries - 1 and self._rotate_api_key():
-                        continue
-                raise
-            except Exception as e:
-                last_error = e
-                logger.error(f"Request failed with API key #{self._current_key_index + 1}: {e}")
-                raise
+                transient_failures += 1
+                logger.warning(f"Checko request failed with API key #{key_number}: {type(e).__name__}: {e}")
+                await self._backoff(transient_failures)
+                continue
+            
+            # Ошибка лимита (429), блокировка ключа (403) или лимит в JSON - берем другой ключ
+            if response.status_code in (429, 403) or (response.status_code == 200 and _is_limit_error(response)):
+                logger.warning(f"Checko API key #{key_number} is limited (HTTP {response.status_code})")
+                self._keys.cool_down(key)
+                last_error = httpx.HTTPStatusError(
+                    f"Checko API key limited: HTTP {response.status_code}", request=response.request, response=response
+                )
+                continue
+            
+            if response.status_code >= 500:
+                last_error = httpx.HTTPStatusError(
+                    f"Checko API error: HTTP {response.status_code}", request=response.request, response=response
+                )
+                transient_failures += 1
+                await self._backoff(transient_failures)
+                continue
+            
+            response.raise_for_status()
+            return response.json()
         
-        # Все ключи исчерпаны
+        # Все попытки исчерпаны
         if last_error:
             raise last_error
-        raise RuntimeError("All Checko API keys exhausted")
+        raise CheckoKeysExhausted("All Checko API keys exhausted")
+    
+    @staticmethod
+    async def _backoff(failures: int) -> None:
+        """Exponential backoff with full jitter (spreads retries of parallel requests)."""
+        delay = settings.CHECKO_RETRY_BASE_SEC * (2 ** (failures - 1))
+        await asyncio.sleep(random.uniform(0, min(delay, 30.0)))
     
     async def get_company(self, inn: str) -> Dict[str, Any]:
         """Get company information by INN.
@@ -219,9 +362,7 @@ class CheckoClient:
                 "_enforcements": {...}
             }
         """
-        import asyncio
-        
-        # Запускаем все запросы параллельно
+        # Запускаем все запросы параллельно (каждый берет токен своего ключа)
         tasks = [
             self.get_company(inn),
             self.get_finances(inn),
@@ -212,6 +212,61 @@ class ParsingRunModel(Base):
     )
 
 
+class ParsingJobModel(Base):
+    """Model for parsing_jobs table (durable queue consumed by parsing workers)."""
+    __tablename__ = "parsing_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    keyword: Mapped[str] = mapped_column(String(255), nullable=False)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False, default=10)
+    source: Mapped[str] = mapped_column(String(32), nullable=False, default="google")
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default="queued")  # queued, running, completed, failed
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    available_at: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False)
+    locked_by: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+
+
+class RecognitionJobModel(Base):
+    """Model for recognition_jobs table (background recognition of uploaded positions)."""
+    __tablename__ = "recognition_jobs"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    request_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    filename: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    engine: Mapped[str] = mapped_column(String(32), nullable=False, default="auto")
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default="queued")  # queued, running, completed, failed
+    stage: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)  # extract, llm, normalize, keys, done
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    partial_result_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    result_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+
+
 class DomainQueueModel(Base):
     """Model for domains_queue table."""
     __tablename__ = "domains_queue"
@@ -260,7 +315,7 @@ class RecognitionCacheModel(Base):
     usage_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON object with token usage
 
     # Statistics
-    hit_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         server_default=func.now(),
         nullable=False
@@ -279,6 +334,31 @@ class RecognitionCacheModel(Base):
     )
 
 
+class DomainInfoCacheModel(Base):
+    """Cached Domain Info Parser result (INN, emails) by normalized domain."""
+    __tablename__ = "domain_info_cache"
+
+    domain: Mapped[str] = mapped_column(String(255), primary_key=True)
+    inn: Mapped[Optional[str]] = mapped_column(String(12), nullable=True)
+    emails_json: Mapped[str] = mapped_column(Text, nullable=False, default="[]")
+    source_urls_json: Mapped[str] = mapped_column(Text, nullable=False, default="[]")
+    extractor_version: Mapped[str] = mapped_column(String(32), nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    extracted_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        nullable=False
+    )
+    expires_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)  # NULL = never expires
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(),
+        nullable=False
+    )
+
+    __table_args__ = (
+        Index("idx_domain_info_cache_expires_at", "expires_at"),
+    )
+
+
 class AuditLogModel(Base):
     """Model for audit_log table."""
     __tablename__ = "audit_log"
@@ -0,0 +1,115 @@
+"""Keyset (cursor) pagination and cheap totals for listing repositories.
+
+OFFSET pagination reads and throws away every skipped row, and an exact COUNT(*)
+scans the whole filtered set on every request, so both get slower as
+domains_queue grows. Listings now accept an opaque cursor: the (sort value, key)
+of the last row of the previous page, continued with a row-value comparison
+that the (created_at, id)-style indexes of migration 022 answer directly.
+
+Totals are computed per total_mode:
+- "exact": COUNT(*) (previous behaviour);
+- "approx": pg_class.reltuples for unfiltered listings, a COUNT capped at
+  APPROX_COUNT_CAP rows for filtered ones (small sets are still exact);
+- "none": no count at all (scrolling with a cursor).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import func, literal_column, select, text, tuple_
+
+TOTAL_EXACT = "exact"
+TOTAL_APPROX = "approx"
+TOTAL_NONE = "none"
+TOTAL_MODE_PATTERN = "^(exact|approx|none)$"
+
+APPROX_COUNT_CAP = 10000  # filtered "approx" totals above this are reported as the cap
+
+
+class InvalidCursor(ValueError):
+    """Cursor is malformed or was produced for another listing."""
+
+
+def encode_cursor(sort_value: Any, key: Any) -> str:
+    """Opaque cursor for the row (sort_value, key)."""
+    if isinstance(sort_value, datetime):
+        sort_value = {"ts": sort_value.isoformat()}
+    raw = json.dumps([sort_value, key], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """(sort_value, key) of a cursor from encode_cursor.
+
+    Raises:
+        InvalidCursor: If the cursor cannot be decoded
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if isinstance(sort_value, dict):
+            sort_value = datetime.fromisoformat(sort_value["ts"])
+        return sort_value, key
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def apply_keyset(query, sort_column, key_column, cursor: Optional[str], descending: bool = True):
+    """Order by (sort_column, key_column) and continue after the cursor row."""
+    if cursor:
+        sort_value, key = decode_cursor(cursor)
+        position = tuple_(sort_column, key_column)
+        query = query.where(position < tuple_(sort_value, key) if descending else position > tuple_(sort_value, key))
+    if descending:
+        return query.order_by(sort_column.desc(), key_column.desc())
+    return query.order_by(sort_column.asc(), key_column.asc())
+
+
+def next_cursor(items: Sequence[Any], limit: int, sort_attr: str, key_attr: str) -> Optional[str]:
+    """Cursor of the page after `items` (None when the page is not full)."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(getattr(last, sort_attr), getattr(last, key_attr))
+
+
+async def count_total(session, count_query, filtered_query, total_mode: str, table_name: str, filtered: bool) -> Optional[int]:
+    """Total rows of a listing according to total_mode (see module docstring).
+
+    Args:
+        count_query: Exact COUNT(*) query with the listing filters
+        filtered_query: The listing SELECT with filters (used for the capped count)
+        table_name: Table whose planner estimate is used for unfiltered listings
+        filtered: Whether any filter is applied
+    """
+    if total_mode == TOTAL_NONE:
+        return None
+    if total_mode == TOTAL_APPROX:
+        if not filtered:
+            result = await session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+                {"table_name": table_name},
+            )
+            estimate = result.scalar()
+            # -1: never analyzed; small tables are counted exactly
+            if estimate is not None and estimate > APPROX_COUNT_CAP:
+                return int(estimate)
+        else:
+            capped = (
+                filtered_query.order_by(None)
+                .with_only_columns(literal_column("1"), maintain_column_froms=True)
+                .limit(APPROX_COUNT_CAP + 1)
+                .subquery()
+            )
+            result = await session.execute(select(func.count()).select_from(capped))
+            return min(int(result.scalar() or 0), APPROX_COUNT_CAP)
+    result = await session.execute(count_query)
+    return result.scalar() or 0
+
+
+def resolve_total_mode(total_mode: Optional[str], cursor: Optional[str]) -> str:
+    """Default total mode of listing endpoints: approx for the first page, none when scrolling."""
+    if total_mode:
+        return total_mode
+    return TOTAL_NONE if cursor else TOTAL_APPROX
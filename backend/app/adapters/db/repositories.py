@@ -1,11 +1,12 @@
 """Database repositories for data access."""
 from typing import Optional, List
-from sqlalchemy import select, func, and_
-from sqlalchemy.exc import ProgrammingError
+from sqlalchemy import select, func, and_, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.adapters.db.base_repository import BaseRepository
+from app.adapters.db.pagination import TOTAL_EXACT, apply_keyset, count_total
 from app.adapters.db.models import (
     ModeratorSupplierModel,
     KeywordModel,
@@ -13,6 +14,7 @@ from app.adapters.db.models import (
     BlacklistModel,
     ParsingRequestModel,
     ParsingRunModel,
+    ParsingJobModel,
     DomainQueueModel,
 )
 
@@ -82,28 +84,87 @@ class ModeratorSupplierRepository:
         )
         return result.scalar_one_or_none()
     
+    @staticmethod
+    def summary_columns() -> list:
+        """Columns of the supplier table view: everything except the checko_data blob."""
+        columns = [
+            column for name, column in ModeratorSupplierModel.__table__.columns.items()
+            if name != "checko_data"
+        ]
+        return columns + [ModeratorSupplierModel.checko_data.isnot(None).label("has_checko_data")]
+    
+    async def get_checko_data_digest(self, supplier_id: int) -> Optional[dict]:
+        """{"md5", "size"} of the stored checko_data (None values if empty), computed in the DB.
+        
+        Returns None if the supplier does not exist. The blob itself is not fetched.
+        """
+        from sqlalchemy import text
+        result = await self.session.execute(
+            text("SELECT md5(checko_data), octet_length(checko_data) FROM moderator_suppliers WHERE id = :id"),
+            {"id": supplier_id},
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return {"md5": row[0], "size": row[1]}
+    
+    async def get_checko_data_blob(self, supplier_id: int) -> Optional[bytes]:
+        """Stored (compressed) checko_data of a supplier, selected alone."""
+        result = await self.session.execute(
+            select(ModeratorSupplierModel.checko_data)
+            .where(ModeratorSupplierModel.id == supplier_id)
+        )
+        blob = result.scalar_one_or_none()
+        return bytes(blob) if isinstance(blob, memoryview) else blob
+    
+    async def list_inns_without_checko(self, limit: int = 1000) -> List[str]:
+        """Distinct INNs of suppliers that have no Checko data yet (oldest first)."""
+        from sqlalchemy import text
+        result = await self.session.execute(
+            text(
+                "SELECT inn FROM moderator_suppliers "
+                "WHERE inn IS NOT NULL AND inn <> '' AND checko_data IS NULL "
+                "GROUP BY inn ORDER BY MIN(created_at) LIMIT :limit"
+            ),
+            {"limit": limit},
+        )
+        return [row[0] for row in result.fetchall()]
+    
     async def list(
         self,
         limit: int = 100,
         offset: int = 0,
-        type_filter: Optional[str] = None
-    ) -> tuple[List[ModeratorSupplierModel], int]:
-        """List suppliers with pagination."""
-        query = select(ModeratorSupplierModel)
+        type_filter: Optional[str] = None,
+        cursor: Optional[str] = None,
+        total_mode: str = TOTAL_EXACT,
+        summary: bool = False
+    ) -> tuple[list, Optional[int]]:
+        """List suppliers with pagination.
+        
+        With a cursor (see app.adapters.db.pagination) offset is ignored.
+        With summary=True rows are column projections (see summary_columns):
+        checko_data is neither loaded nor decompressed, only has_checko_data.
+        """
+        if summary:
+            query = select(*self.summary_columns())
+        else:
+            query = select(ModeratorSupplierModel)
         count_query = select(func.count()).select_from(ModeratorSupplierModel)
         
         if type_filter:
             query = query.where(ModeratorSupplierModel.type == type_filter)
             count_query = count_query.where(ModeratorSupplierModel.type == type_filter)
+        filtered_query = query
         
-        query = query.order_by(ModeratorSupplierModel.created_at.desc())
-        query = query.limit(limit).offset(offset)
+        query = apply_keyset(query, ModeratorSupplierModel.created_at, ModeratorSupplierModel.id, cursor)
+        query = query.limit(limit) if cursor else query.limit(limit).offset(offset)
         
         result = await self.session.execute(query)
-        suppliers = result.scalars().all()
+        suppliers = result.all() if summary else result.scalars().all()
         
-        count_result = await self.session.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await count_total(
+            self.session, count_query, filtered_query, total_mode, "moderator_suppliers", bool(type_filter)
+        )
         
         return list(suppliers), total
     
@@ -266,18 +327,23 @@ class BlacklistRepository:
         )
         return result.scalar_one_or_none()
     
-    async def list(self, limit: int = 100, offset: int = 0) -> tuple[List[BlacklistModel], int]:
-        """List blacklist entries with pagination."""
-        query = select(BlacklistModel).order_by(BlacklistModel.added_at.desc())
+    async def list(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        total_mode: str = TOTAL_EXACT
+    ) -> tuple[List[BlacklistModel], Optional[int]]:
+        """List blacklist entries with pagination (cursor over (added_at, domain))."""
+        query = apply_keyset(select(BlacklistModel), BlacklistModel.added_at, BlacklistModel.domain, cursor)
         count_query = select(func.count()).select_from(BlacklistModel)
         
         result = await self.session.execute(
-            query.limit(limit).offset(offset)
+            query.limit(limit) if cursor else query.limit(limit).offset(offset)
         )
         entries = result.scalars().all()
         
-        count_result = await self.session.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await count_total(self.session, count_query, select(BlacklistModel), total_mode, "blacklist", False)
         
         return list(entries), total
     
@@ -296,6 +362,20 @@ class BlacklistRepository:
         entry = await self.get_by_domain(domain)
         return entry is not None
 
+    async def all_domains(self) -> List[str]:
+        """All blacklisted domains (for the in-memory index)."""
+        from sqlalchemy import text
+        result = await self.session.execute(text("SELECT domain FROM blacklist"))
+        return [row[0] for row in result.fetchall()]
+
+    async def version(self) -> int:
+        """Change counter of blacklist (migration 020, bumped by trigger)."""
+        from sqlalchemy import text
+        result = await self.session.execute(
+            text("SELECT version FROM blacklist_version WHERE id = 1")
+        )
+        return int(result.scalar() or 0)
+
 
 class ParsingRequestRepository:
     """Repository for parsing requests."""
@@ -468,10 +548,20 @@ class ParsingRunRepository:
         status: Optional[str] = None,
         keyword: Optional[str] = None,
         sort_by: str = "created_at",
-        sort_order: str = "desc"
-    ) -> tuple[List[ParsingRunModel], int]:
-        """List parsing runs with pagination, filtering, and sorting."""
+        sort_order: str = "desc",
+        cursor: Optional[str] = None,
+        total_mode: str = TOTAL_EXACT
+    ) -> tuple[List[ParsingRunModel], Optional[int]]:
+        """List parsing runs with pagination, filtering, and sorting.
+        
+        A cursor (see app.adapters.db.pagination) is only valid for sort_by="created_at";
+        offset is ignored with it.
+        
+        Raises:
+            InvalidCursor: If a cursor is given for another sort field or is malformed
+        """
         from app.adapters.db.models import ParsingRequestModel
+        from app.adapters.db.pagination import InvalidCursor
         from sqlalchemy import text
         from types import SimpleNamespace
 
@@ -494,12 +584,22 @@ class ParsingRunRepository:
                     (ParsingRequestModel.raw_keys_json.ilike(f"%{keyword}%"))
                 )
 
+            filtered_query = query
+
             # Сортировка
-            sort_column = getattr(ParsingRunModel, sort_by, ParsingRunModel.created_at)
-            if sort_order == "asc":
-                query = query.order_by(sort_column.asc().nulls_last())
+            if cursor and sort_by != "created_at":
+                raise InvalidCursor("Cursor pagination is only supported for sort=created_at")
+            if sort_by == "created_at":
+                # Keyset по (created_at, id); id делает порядок однозначным
+                query = apply_keyset(
+                    query, ParsingRunModel.created_at, ParsingRunModel.id, cursor, descending=sort_order != "asc"
+                )
             else:
-                query = query.order_by(sort_column.desc().nulls_last())
+                sort_column = getattr(ParsingRunModel, sort_by, ParsingRunModel.created_at)
+                if sort_order == "asc":
+                    query = query.order_by(sort_column.asc().nulls_last(), ParsingRunModel.id.asc())
+                else:
+                    query = query.order_by(sort_column.desc().nulls_last(), ParsingRunModel.id.desc())
 
             # Count query с теми же фильтрами
             count_query = (
@@ -516,12 +616,13 @@ class ParsingRunRepository:
                 )
 
             result = await self.session.execute(
-                query.limit(limit).offset(offset)
+                query.limit(limit) if cursor else query.limit(limit).offset(offset)
             )
             runs = result.scalars().all()
 
-            count_result = await self.session.execute(count_query)
-            total = count_result.scalar() or 0
+            total = await count_total(
+                self.session, count_query, filtered_query, total_mode, "parsing_runs", bool(status or keyword)
+            )
 
             return list(runs), total
         except Exception as e:
@@ -659,6 +760,487 @@ class ParsingRunRepository:
         return result.rowcount > 0
 
 
+class ParsingJobRepository:
+    """Repository for the durable parsing job queue (parsing_jobs).
+
+    Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED so several workers
+    (and several backend replicas) can consume the queue without double-processing.
+    """
+
+    # Serializes claims across replicas so per-source running counts stay accurate
+    _CLAIM_LOCK_KEY = 716_001
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(
+        self,
+        run_id: str,
+        keyword: str,
+        depth: int,
+        source: str,
+        max_attempts: int = 3,
+    ) -> Optional[int]:
+        """Add a job for a parsing run. Returns job id, or None if the run is already queued."""
+        result = await self.session.execute(
+            pg_insert(ParsingJobModel)
+            .values(
+                run_id=run_id,
+                keyword=keyword,
+                depth=depth,
+                source=source,
+                status="queued",
+                max_attempts=max_attempts,
+            )
+            .on_conflict_do_nothing(index_elements=["run_id"])
+            .returning(ParsingJobModel.id)
+        )
+        return result.scalar_one_or_none()
+
+    async def claim(
+        self,
+        worker_id: str,
+        lease_seconds: int,
+        source_limits: dict,
+    ):
+        """Claim the next available job respecting per-source concurrency limits.
+
+        Args:
+            worker_id: Identifier of the claiming worker (stored in locked_by)
+            lease_seconds: Initial lease length; extended by heartbeat()
+            source_limits: Max running jobs per source, e.g. {"google": 1, "yandex": 1}.
+                A "both" job counts against both limits.
+
+        Returns:
+            Claimed job row (run_id, keyword, depth, source, attempts, max_attempts) or None
+        """
+        from sqlalchemy import text
+
+        await self.session.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"),
+            {"key": self._CLAIM_LOCK_KEY},
+        )
+        result = await self.session.execute(
+            text("""
+                WITH running AS (
+                    SELECT
+                        COUNT(*) FILTER (WHERE source IN ('google', 'both')) AS google,
+                        COUNT(*) FILTER (WHERE source IN ('yandex', 'both')) AS yandex
+                    FROM parsing_jobs
+                    WHERE status = 'running'
+                ),
+                next_job AS (
+                    SELECT j.id
+                    FROM parsing_jobs j, running r
+                    WHERE j.status = 'queued'
+                      AND j.available_at <= NOW()
+                      AND (j.source NOT IN ('google', 'both') OR r.google < :google_limit)
+                      AND (j.source NOT IN ('yandex', 'both') OR r.yandex < :yandex_limit)
+                    ORDER BY j.available_at, j.id
+                    LIMIT 1
+                    FOR UPDATE OF j SKIP LOCKED
+                )
+                UPDATE parsing_jobs
+                SET status = 'running',
+                    attempts = attempts + 1,
+                    locked_by = :worker_id,
+                    locked_until = NOW() + make_interval(secs => :lease),
+                    updated_at = NOW()
+                WHERE id = (SELECT id FROM next_job)
+                RETURNING id, run_id, keyword, depth, source, attempts, max_attempts
+            """),
+            {
+                "worker_id": worker_id,
+                "lease": float(lease_seconds),
+                "google_limit": int(source_limits.get("google", 1)),
+                "yandex_limit": int(source_limits.get("yandex", 1)),
+            },
+        )
+        return result.fetchone()
+
+    async def heartbeat(self, job_id: int, worker_id: str, lease_seconds: int) -> bool:
+        """Extend the lease of a running job. Returns False if the job was taken away."""
+        from sqlalchemy import text
+
+        result = await self.session.execute(
+            text("""
+                UPDATE parsing_jobs
+                SET locked_until = NOW() + make_interval(secs => :lease),
+                    updated_at = NOW()
+                WHERE id = :id AND status = 'running' AND locked_by = :worker_id
+            """),
+            {"id": job_id, "worker_id": worker_id, "lease": float(lease_seconds)},
+        )
+        return result.rowcount > 0
+
+    async def complete(self, job_id: int, worker_id: str) -> bool:
+        """Mark job as completed. Returns False if the job is no longer leased to worker_id."""
+        from sqlalchemy import text
+
+        result = await self.session.execute(
+            text("""
+                UPDATE parsing_jobs
+                SET status = 'completed', locked_by = NULL, locked_until = NULL,
+                    finished_at = NOW(), updated_at = NOW()
+                WHERE id = :id AND status = 'running' AND locked_by = :worker_id
+            """),
+            {"id": job_id, "worker_id": worker_id},
+        )
+        return result.rowcount > 0
+
+    async def fail(
+        self,
+        job_id: int,
+        worker_id: str,
+        error: str,
+        retry_delay_seconds: Optional[float] = None,
+    ) -> Optional[str]:
+        """Record a failed attempt.
+
+        The job is re-queued after retry_delay_seconds while attempts remain,
+        otherwise it is marked failed. Returns the new status, or None if the
+        job is no longer leased to worker_id.
+        """
+        from sqlalchemy import text
+
+        result = await self.session.execute(
+            text("""
+                UPDATE parsing_jobs
+                SET status = CASE
+                        WHEN :retry AND attempts < max_attempts THEN 'queued'
+                        ELSE 'failed'
+                    END,
+                    available_at = NOW() + make_interval(secs => :delay),
+                    finished_at = CASE
+                        WHEN :retry AND attempts < max_attempts THEN NULL
+                        ELSE NOW()
+                    END,
+                    locked_by = NULL,
+                    locked_until = NULL,
+                    last_error = :error,
+                    updated_at = NOW()
+                WHERE id = :id AND status = 'running' AND locked_by = :worker_id
+                RETURNING status
+            """),
+            {
+                "id": job_id,
+                "worker_id": worker_id,
+                "retry": retry_delay_seconds is not None,
+                "delay": float(retry_delay_seconds or 0),
+                "error": (error or "")[:2000],
+            },
+        )
+        return result.scalar_one_or_none()
+
+    async def reap_expired(self) -> list:
+        """Re-queue running jobs whose lease expired (crashed worker).
+
+        Jobs that already used all attempts are marked failed.
+        Returns rows of (run_id, status) for reaped jobs.
+        """
+        from sqlalchemy import text
+
+        result = await self.session.execute(
+            text("""
+                UPDATE parsing_jobs
+                SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                    available_at = NOW(),
+                    finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+                    last_error = COALESCE(last_error, 'Worker lease expired'),
+                    locked_by = NULL,
+                    locked_until = NULL,
+                    updated_at = NOW()
+                WHERE status = 'running' AND locked_until < NOW()
+                RETURNING run_id, status
+            """)
+        )
+        return list(result.fetchall())
+
+    async def stats(self) -> dict:
+        """Count jobs by status."""
+        from sqlalchemy import text
+
+        result = await self.session.execute(
+            text("SELECT status, COUNT(*) FROM parsing_jobs GROUP BY status")
+        )
+        return {row[0]: int(row[1]) for row in result.fetchall()}
+
+
+class RecognitionCacheRepository:
+    """Repository for cached recognition results (recognition_cache)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, text_hash: str, model: str, ttl_seconds: int = 0):
+        """Fetch a fresh entry and mark it as used (hit_count, last_accessed_at).
+
+        Args:
+            ttl_seconds: Entries older than this are ignored (0 = no expiration)
+
+        Returns:
+            Row (result_json, usage_json) or None
+        """
+        from sqlalchemy import text
+
+        result = await self.session.execute(
+            text("""
+                UPDATE recognition_cache
+                SET hit_count = hit_count + 1, last_accessed_at = NOW()
+                WHERE text_hash = :text_hash AND model = :model
+                  AND (:ttl <= 0 OR created_at > NOW() - make_interval(secs => :ttl))
+                RETURNING result_json, usage_json
+            """),
+            {"text_hash": text_hash, "model": model, "ttl": float(ttl_seconds)},
+        )
+        return result.fetchone()
+
+    async def put(self, text_hash: str, model: str, result_json: str, usage_json: Optional[str]) -> None:
+        """Insert or refresh an entry."""
+        from sqlalchemy import text
+
+        await self.session.execute(
+            text("""
+                INSERT INTO recognition_cache (text_hash, model, result_json, usage_json, hit_count, created_at, last_accessed_at)
+                VALUES (:text_hash, :model, :result_json, :usage_json, 0, NOW(), NOW())
+                ON CONFLICT (text_hash, model) DO UPDATE
+                SET result_json = EXCLUDED.result_json,
+                    usage_json = EXCLUDED.usage_json,
+                    created_at = NOW(),
+                    last_accessed_at = NOW()
+            """),
+            {"text_hash": text_hash, "model": model, "result_json": result_json, "usage_json": usage_json},
+        )
+
+    async def evict(self, ttl_seconds: int, max_entries: int) -> tuple[int, int]:
+        """Delete expired entries, then least recently used ones above max_entries.
+
+        Returns:
+            (expired, evicted) row counts
+        """
+        from sqlalchemy import text
+
+        expired = 0
+        if ttl_seconds > 0:
+            result = await self.session.execute(
+                text("DELETE FROM recognition_cache WHERE created_at < NOW() - make_interval(secs => :ttl)"),
+                {"ttl": float(ttl_seconds)},
+            )
+            expired = result.rowcount or 0
+
+        evicted = 0
+        if max_entries > 0:
+            result = await self.session.execute(
+                text("""
+                    DELETE FROM recognition_cache
+                    WHERE id IN (
+                        SELECT id FROM recognition_cache
+                        ORDER BY last_accessed_at DESC, id DESC
+                        OFFSET :max_entries
+                    )
+                """),
+                {"max_entries": int(max_entries)},
+            )
+            evicted = result.rowcount or 0
+        return expired, evicted
+
+    async def stats(self) -> dict:
+        """Entry count and lifetime hits stored in the table."""
+        from sqlalchemy import text
+
+        result = await self.session.execute(
+            text("""
+                SELECT COUNT(*), COALESCE(SUM(hit_count), 0), MIN(created_at), MAX(last_accessed_at)
+                FROM recognition_cache
+            """)
+        )
+        row = result.fetchone()
+        return {
+            "entries": int(row[0] or 0),
+            "stored_hits": int(row[1] or 0),
+            "oldest_entry_at": row[2].isoformat() if row[2] else None,
+            "last_access_at": row[3].isoformat() if row[3] else None,
+        }
+
+
+class DomainInfoCacheRepository:
+    """Repository for cached Domain Info Parser results (domain_info_cache)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_many(self, domains: List[str], extractor_version: str) -> list:
+        """Fetch fresh entries of the given extractor version and mark them as used.
+
+        Returns:
+            Rows (domain, inn, emails_json, source_urls_json, extracted_at)
+        """
+        from sqlalchemy import bindparam, text
+
+        if not domains:
+            return []
+        result = await self.session.execute(
+            text("""
+                UPDATE domain_info_cache
+                SET hit_count = hit_count + 1, last_accessed_at = NOW()
+                WHERE domain IN :domains
+                  AND extractor_version = :version
+                  AND (expires_at IS NULL OR expires_at > NOW())
+                RETURNING domain, inn, emails_json, source_urls_json, extracted_at
+            """).bindparams(bindparam("domains", expanding=True)),
+            {"domains": list(domains), "version": extractor_version},
+        )
+        return result.fetchall()
+
+    async def put(
+        self,
+        domain: str,
+        inn: Optional[str],
+        emails_json: str,
+        source_urls_json: str,
+        extractor_version: str,
+        ttl_seconds: int,
+    ) -> None:
+        """Insert or replace the entry of a domain (ttl_seconds <= 0 = never expires)."""
+        from sqlalchemy import text
+
+        await self.session.execute(
+            text("""
+                INSERT INTO domain_info_cache
+                    (domain, inn, emails_json, source_urls_json, extractor_version, hit_count,
+                     extracted_at, expires_at, last_accessed_at)
+                VALUES (:domain, :inn, :emails_json, :source_urls_json, :version, 0, NOW(),
+                        CASE WHEN :ttl > 0 THEN NOW() + make_interval(secs => :ttl) END, NOW())
+                ON CONFLICT (domain) DO UPDATE
+                SET inn = EXCLUDED.inn,
+                    emails_json = EXCLUDED.emails_json,
+                    source_urls_json = EXCLUDED.source_urls_json,
+                    extractor_version = EXCLUDED.extractor_version,
+                    extracted_at = EXCLUDED.extracted_at,
+                    expires_at = EXCLUDED.expires_at,
+                    last_accessed_at = EXCLUDED.last_accessed_at
+            """),
+            {
+                "domain": domain,
+                "inn": inn,
+                "emails_json": emails_json,
+                "source_urls_json": source_urls_json,
+                "version": extractor_version,
+                "ttl": float(ttl_seconds),
+            },
+        )
+
+    async def delete(self, domains: List[str]) -> int:
+        """Drop entries of the given domains; returns deleted row count."""
+        from sqlalchemy import bindparam, text
+
+        if not domains:
+            return 0
+        result = await self.session.execute(
+            text("DELETE FROM domain_info_cache WHERE domain IN :domains").bindparams(
+                bindparam("domains", expanding=True)
+            ),
+            {"domains": list(domains)},
+        )
+        return result.rowcount or 0
+
+    async def stats(self, extractor_version: str) -> dict:
+        """Entry counts (total / of current extractor version / with data) and stored hits."""
+        from sqlalchemy import text
+
+        result = await self.session.execute(
+            text("""
+                SELECT COUNT(*),
+                       COUNT(*) FILTER (WHERE extractor_version = :version),
+                       COUNT(*) FILTER (WHERE inn IS NOT NULL OR emails_json <> '[]'),
+                       COUNT(*) FILTER (WHERE expires_at IS NOT NULL AND expires_at < NOW()),
+                       COALESCE(SUM(hit_count), 0)
+                FROM domain_info_cache
+            """),
+            {"version": extractor_version},
+        )
+        row = result.fetchone()
+        return {
+            "entries": int(row[0] or 0),
+            "current_version_entries": int(row[1] or 0),
+            "entries_with_data": int(row[2] or 0),
+            "expired_entries": int(row[3] or 0),
+            "stored_hits": int(row[4] or 0),
+        }
+
+
+class RecognitionJobRepository:
+    """Repository for background recognition jobs (recognition_jobs)."""
+
+    # Columns that update() may set
+    _UPDATABLE = ("status", "stage", "progress", "partial_result_json", "result_json", "error")
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, job_id: str, user_id: int, request_id: int, filename: str, engine: str) -> None:
+        from sqlalchemy import text
+
+        await self.session.execute(
+            text("""
+                INSERT INTO recognition_jobs (id, user_id, request_id, filename, engine, status, progress)
+                VALUES (:id, :user_id, :request_id, :filename, :engine, 'queued', 0)
+            """),
+            {
+                "id": job_id,
+                "user_id": int(user_id),
+                "request_id": int(request_id),
+                "filename": (filename or "")[:500],
+                "engine": engine,
+            },
+        )
+
+    async def update(self, job_id: str, patch: dict) -> None:
+        """Update job state; patch["finished"]=True also sets finished_at."""
+        from sqlalchemy import text
+
+        fields = {k: v for k, v in patch.items() if k in self._UPDATABLE}
+        assignments = [f"{k} = :{k}" for k in fields] + ["updated_at = NOW()"]
+        if patch.get("finished"):
+            assignments.append("finished_at = NOW()")
+        await self.session.execute(
+            text(f"UPDATE recognition_jobs SET {', '.join(assignments)} WHERE id = :id"),
+            {**fields, "id": job_id},
+        )
+
+    async def get_for_user(self, job_id: str, user_id: int):
+        from sqlalchemy import text
+
+        result = await self.session.execute(
+            text("""
+                SELECT id, request_id, filename, engine, status, stage, progress,
+                       partial_result_json, result_json, error, created_at, updated_at, finished_at
+                FROM recognition_jobs
+                WHERE id = :id AND user_id = :user_id
+            """),
+            {"id": job_id, "user_id": int(user_id)},
+        )
+        return result.fetchone()
+
+    async def fail_stale(self, job_id: str, stale_seconds: int) -> bool:
+        """Mark the job failed if it is unfinished and has not progressed for stale_seconds."""
+        from sqlalchemy import text
+
+        result = await self.session.execute(
+            text("""
+                UPDATE recognition_jobs
+                SET status = 'failed',
+                    error = 'Recognition was interrupted (backend restarted)',
+                    finished_at = NOW(),
+                    updated_at = NOW()
+                WHERE id = :id AND status IN ('queued', 'running')
+                  AND updated_at < NOW() - make_interval(secs => :stale)
+            """),
+            {"id": job_id, "stale": float(stale_seconds)},
+        )
+        return (result.rowcount or 0) > 0
+
+
 class DomainQueueRepository(BaseRepository):
     """Repository for domains queue."""
     
@@ -705,6 +1287,96 @@ class DomainQueueRepository(BaseRepository):
             )
         )
         return result.scalar_one_or_none()
+
+    async def bulk_upsert(self, rows: List[dict], chunk_size: int = 500, merge_source: bool = False) -> tuple[int, int]:
+        """Insert many queue entries, skipping existing (domain, keyword, parsing_run_id).
+
+        Uses one multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING id per chunk
+        instead of a SELECT + INSERT round trip per row. The conflict target is
+        the column list: the UNIQUE constraint from migration 004 has a
+        generated name, not the one declared on DomainQueueModel.
+
+        Args:
+            rows: Dicts with domain, keyword, url, parsing_run_id, source, status
+            chunk_size: Max rows per INSERT statement
+            merge_source: On conflict, mark the existing entry source as "both" when
+                the other engine found it too (used by streamed, incremental inserts)
+
+        Returns:
+            Tuple of (inserted_count, skipped_count)
+        """
+        if not rows:
+            return 0, 0
+
+        # Deduplicate within the batch: ON CONFLICT cannot resolve the same key twice in one statement
+        unique_rows: dict = {}
+        for row in rows:
+            key = (row.get("domain"), row.get("keyword"), row.get("parsing_run_id"))
+            if key not in unique_rows:
+                unique_rows[key] = {
+                    "domain": row["domain"],
+                    "keyword": row["keyword"],
+                    "url": row["url"],
+                    "parsing_run_id": row.get("parsing_run_id"),
+                    "source": row.get("source") or "google",
+                    "status": row.get("status") or "pending",
+                }
+        values = list(unique_rows.values())
+
+        inserted = 0
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            stmt = pg_insert(DomainQueueModel).values(chunk)
+            if merge_source:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["domain", "keyword", "parsing_run_id"],
+                    set_={"source": "both"},
+                    where=and_(
+                        DomainQueueModel.source != stmt.excluded.source,
+                        DomainQueueModel.source != "both",
+                    ),
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=["domain", "keyword", "parsing_run_id"])
+            # xmax = 0 only for freshly inserted rows (updated rows are returned too)
+            stmt = stmt.returning(DomainQueueModel.id, literal_column("xmax = 0"))
+            try:
+                result = await self.session.execute(stmt)
+            except Exception as e:
+                # Use base class method to handle sequence errors
+                if await self._handle_sequence_error(e, "domains_queue"):
+                    result = await self.session.execute(stmt)
+                else:
+                    raise
+            inserted += sum(1 for _id, is_insert in result.all() if is_insert)
+
+        return inserted, len(rows) - inserted
+
+    async def result_counts(self, run_ids: List[str]) -> dict:
+        """Results of parsing runs in one grouped query (no per-run COUNT).
+        
+        Returns:
+            {run_id: {"total": int, "by_source": {source: int}, "by_status": {status: int}}};
+            runs without results are absent.
+        """
+        from sqlalchemy import bindparam, text
+        if not run_ids:
+            return {}
+        result = await self.session.execute(
+            text(
+                "SELECT parsing_run_id, COALESCE(source, 'google') AS source, status, COUNT(*) "
+                "FROM domains_queue WHERE parsing_run_id IN :run_ids "
+                "GROUP BY parsing_run_id, COALESCE(source, 'google'), status"
+            ).bindparams(bindparam("run_ids", expanding=True)),
+            {"run_ids": list(run_ids)},
+        )
+        counts: dict = {}
+        for run_id, source, status, count in result.fetchall():
+            entry = counts.setdefault(run_id, {"total": 0, "by_source": {}, "by_status": {}})
+            entry["total"] += count
+            entry["by_source"][source] = entry["by_source"].get(source, 0) + count
+            entry["by_status"][status] = entry["by_status"].get(status, 0) + count
+        return counts
     
     async def list(
         self,
@@ -712,10 +1384,14 @@ class DomainQueueRepository(BaseRepository):
         offset: int = 0,
         status: Optional[str] = None,
         keyword: Optional[str] = None,
-        parsing_run_id: Optional[str] = None  # Added parsing_run_id filter
-    ) -> tuple[List[DomainQueueModel], int]:
+        parsing_run_id: Optional[str] = None,  # Added parsing_run_id filter
+        cursor: Optional[str] = None,
+        total_mode: str = TOTAL_EXACT
+    ) -> tuple[List[DomainQueueModel], Optional[int]]:
         """List queue entries with pagination.
         
+        With a cursor (see app.adapters.db.pagination) offset is ignored.
+        
         IMPORTANT: Filtering logic:
         - If parsing_run_id is provided, filter ONLY by parsing_run_id (most specific)
         - If keyword is provided (and no parsing_run_id), filter by keyword
@@ -762,15 +1438,17 @@ class DomainQueueRepository(BaseRepository):
         else:
             logger.warning("DomainQueueRepository.list: NO FILTERS APPLIED - returning ALL entries!")
         
-        query = query.order_by(DomainQueueModel.created_at.desc())
+        filtered_query = query
+        query = apply_keyset(query, DomainQueueModel.created_at, DomainQueueModel.id, cursor)
         
         result = await self.session.execute(
-            query.limit(limit).offset(offset)
+            query.limit(limit) if cursor else query.limit(limit).offset(offset)
         )
         entries = result.scalars().all()
         
-        count_result = await self.session.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await count_total(
+            self.session, count_query, filtered_query, total_mode, "domains_queue", bool(filters_applied)
+        )
         
         logger.info(f"DomainQueueRepository.list: returning {len(entries)} entries (total={total}) with filters: {filters_applied}")
         
@@ -786,3 +1464,181 @@ class DomainQueueRepository(BaseRepository):
         await self.session.flush()
         return True
 
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards (backslash is the default ESCAPE in PostgreSQL)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SearchRepository:
+    """Ranked prefix/substring search over keywords, domains and parsing requests.
+    
+    Substring matching (ILIKE '%q%') is served by the pg_trgm GIN indexes of
+    migration 023; queries shorter than SUBSTRING_MIN_LEN characters have no
+    trigrams and use prefix matching on lower(column) (text_pattern_ops indexes).
+    Rank: exact match > prefix > substring, then trigram similarity(). Queue
+    keywords and domains are ranked on a bounded candidate set before counting.
+    """
+    
+    SUBSTRING_MIN_LEN = 3
+    CANDIDATE_SCAN_ROWS = 2000  # queue rows scanned per match kind when picking candidates
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    def _params(self, q: str, limit: int) -> tuple[str, dict]:
+        lowered = q.lower()
+        escaped = _escape_like(lowered)
+        params = {"q": lowered, "prefix": f"{escaped}%", "substring": f"%{escaped}%", "limit": limit}
+        mode = "substring" if len(q) >= self.SUBSTRING_MIN_LEN else "prefix"
+        return mode, params
+    
+    @staticmethod
+    def _match(column: str, mode: str) -> str:
+        if mode == "substring":
+            return f"{column} ILIKE :substring"
+        return f"lower({column}) LIKE :prefix"
+    
+    @staticmethod
+    def _rank(column: str) -> str:
+        return (
+            f"CASE WHEN lower({column}) = :q THEN 3 "
+            f"WHEN lower({column}) LIKE :prefix THEN 2 ELSE 1 END"
+        )
+    
+    async def keywords(self, q: str, limit: int = 10) -> list:
+        """Keywords from the keywords table: [{id, keyword, rank, score}]."""
+        from sqlalchemy import text
+        mode, params = self._params(q, limit)
+        result = await self.session.execute(
+            text(
+                f"SELECT id, keyword, {self._rank('keyword')} AS rank, similarity(keyword, :q) AS score "
+                f"FROM keywords WHERE {self._match('keyword', mode)} "
+                "ORDER BY rank DESC, score DESC, keyword LIMIT :limit"
+            ),
+            params,
+        )
+        return [
+            {"id": row[0], "keyword": row[1], "rank": row[2], "score": float(row[3] or 0)}
+            for row in result.fetchall()
+        ]
+    
+    def _candidates_sql(self, table: str, column: str, mode: str) -> str:
+        """CTE "candidates": top :limit distinct values of column, picked from LIMITed index scans.
+        
+        Exact and prefix matches come first, then up to CANDIDATE_SCAN_ROWS substring
+        matches; aggregates are computed afterwards only for these candidates, so a
+        common substring does not aggregate the whole matching part of the table.
+        """
+        parts = [
+            f"(SELECT {column} FROM {table} WHERE lower({column}) = :q LIMIT 1)",
+            f"(SELECT {column} FROM {table} WHERE lower({column}) LIKE :prefix LIMIT :scan_rows)",
+        ]
+        if mode == "substring":
+            parts.append(f"(SELECT {column} FROM {table} WHERE {column} ILIKE :substring LIMIT :scan_rows)")
+        return (
+            f"WITH hits AS ({' UNION ALL '.join(parts)}), "
+            f"candidates AS ("
+            f"SELECT {column} AS value, {self._rank(column)} AS rank, similarity({column}, :q) AS score "
+            f"FROM (SELECT DISTINCT {column} FROM hits) h "
+            f"ORDER BY rank DESC, score DESC LIMIT :limit) "
+        )
+    
+    async def queue_keywords(self, q: str, limit: int = 10) -> list:
+        """Keywords of domains_queue with their URL counts: [{keyword, urls, lastSeenAt, rank, score}]."""
+        from sqlalchemy import text
+        mode, params = self._params(q, limit)
+        params["scan_rows"] = self.CANDIDATE_SCAN_ROWS
+        result = await self.session.execute(
+            text(
+                self._candidates_sql("domains_queue", "keyword", mode)
+                + "SELECT c.value, COUNT(*) AS urls, MAX(dq.created_at) AS last_seen_at, c.rank, c.score "
+                "FROM candidates c JOIN domains_queue dq ON dq.keyword = c.value "
+                "GROUP BY c.value, c.rank, c.score ORDER BY c.rank DESC, c.score DESC, urls DESC"
+            ),
+            params,
+        )
+        return [
+            {
+                "keyword": row[0],
+                "urls": row[1],
+                "lastSeenAt": row[2].isoformat() if row[2] else None,
+                "rank": row[3],
+                "score": float(row[4] or 0),
+            }
+            for row in result.fetchall()
+        ]
+    
+    async def domains(self, q: str, limit: int = 10) -> list:
+        """Domains of domains_queue: [{domain, urls, keywords, lastSeenAt, rank, score}]."""
+        from sqlalchemy import text
+        mode, params = self._params(q, limit)
+        params["scan_rows"] = self.CANDIDATE_SCAN_ROWS
+        result = await self.session.execute(
+            text(
+                self._candidates_sql("domains_queue", "domain", mode)
+                + "SELECT c.value, COUNT(*) AS urls, COUNT(DISTINCT dq.keyword) AS keywords, "
+                "MAX(dq.created_at) AS last_seen_at, c.rank, c.score "
+                "FROM candidates c JOIN domains_queue dq ON dq.domain = c.value "
+                "GROUP BY c.value, c.rank, c.score ORDER BY c.rank DESC, c.score DESC, urls DESC"
+            ),
+            params,
+        )
+        return [
+            {
+                "domain": row[0],
+                "urls": row[1],
+                "keywords": row[2],
+                "lastSeenAt": row[3].isoformat() if row[3] else None,
+                "rank": row[4],
+                "score": float(row[5] or 0),
+            }
+            for row in result.fetchall()
+        ]
+    
+    async def requests(self, q: str, limit: int = 10) -> list:
+        """Parsing requests matched by title or keys: [{id, title, keys, lastRunId, createdAt, rank, score}].
+        
+        Prefix rank applies to the title; a match only in raw_keys_json ranks as substring.
+        """
+        import json
+        from sqlalchemy import text
+        mode, params = self._params(q, limit)
+        if mode == "substring":
+            where = "r.title ILIKE :substring OR r.raw_keys_json ILIKE :substring"
+        else:
+            # Ключи хранятся JSON-массивом: префикс ключа идет сразу после кавычки
+            params["key_prefix"] = f'%"{_escape_like(q.lower())}%'
+            where = "lower(r.title) LIKE :prefix OR r.raw_keys_json ILIKE :key_prefix"
+        title_rank = self._rank("COALESCE(r.title, '')")
+        result = await self.session.execute(
+            text(
+                "SELECT r.id, r.title, r.raw_keys_json, r.created_at, "
+                "(SELECT pr.run_id FROM parsing_runs pr WHERE pr.request_id = r.id "
+                " ORDER BY pr.created_at DESC LIMIT 1) AS last_run_id, "
+                f"{title_rank} AS rank, "
+                "GREATEST(similarity(COALESCE(r.title, ''), :q), similarity(COALESCE(r.raw_keys_json, ''), :q)) AS score "
+                f"FROM parsing_requests r WHERE {where} "
+                "ORDER BY rank DESC, score DESC, r.created_at DESC LIMIT :limit"
+            ),
+            params,
+        )
+        items = []
+        for row in result.fetchall():
+            try:
+                keys = json.loads(row[2]) if row[2] else []
+            except (TypeError, ValueError):
+                keys = []
+            if not isinstance(keys, list):
+                keys = []
+            items.append({
+                "id": row[0],
+                "title": row[1],
+                "keys": [str(k) for k in keys],
+                "lastRunId": row[4],
+                "createdAt": row[3].isoformat() if row[3] else None,
+                "rank": row[5],
+                "score": float(row[6] or 0),
+            })
+        return items
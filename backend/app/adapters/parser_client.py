@@ -1,6 +1,6 @@
 """HTTP client for Parser Service."""
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, Optional
 from app.config import settings
 
 
@@ -81,6 +81,43 @@ class ParserClient:
             logger.error(f"Unexpected error in parser_client.parse: {e}", exc_info=True)
             raise
     
+    async def parse_stream(
+        self,
+        keyword: str,
+        depth: int = 10,
+        source: str = "google",
+        run_id: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parse a keyword via POST /parse/stream, yielding events as they arrive.
+        
+        Yields {"event": "links", "engine", "page", "links": [{"url", "domain", "source"}]}
+        after every search results page, then {"event": "done", ...} with the same
+        payload as parse(), or {"event": "error", "error"} if parsing failed.
+        """
+        import json
+        
+        async with self.client.stream(
+            "POST",
+            "/parse/stream",
+            json={
+                "keyword": keyword,
+                "depth": depth,
+                "source": source,
+                "run_id": run_id
+            },
+            headers={
+                "Content-Type": "application/json; charset=utf-8"
+            },
+            timeout=httpx.Timeout(300.0, read=None),  # pages may be minutes apart (CAPTCHA)
+        ) as response:
+            if not response.is_success:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield json.loads(line)
+    
     async def health_check(self) -> Dict[str, Any]:
         """Check Parser Service health."""
         try:
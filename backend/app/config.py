@@ -22,14 +22,71 @@ class Settings(BaseSettings):
     OLLAMA_MODEL: str = ""
     OLLAMA_TIMEOUT_SEC: int = 15
 
+    # Parsing job queue (parsing_jobs table, consumed by app.services.parsing_queue)
+    PARSING_WORKERS: int = 2  # Worker coroutines per backend process (0 = do not consume jobs here)
+    PARSING_GOOGLE_CONCURRENCY: int = 1  # Max running Google jobs across all replicas
+    PARSING_YANDEX_CONCURRENCY: int = 1  # Max running Yandex jobs across all replicas
+    PARSING_JOB_MAX_ATTEMPTS: int = 3
+    PARSING_JOB_RETRY_BASE_SEC: int = 30  # Backoff: base * 2^(attempt-1)
+    PARSING_JOB_LEASE_SEC: int = 120  # Lease is extended by heartbeats every lease/3 seconds
+    PARSING_JOB_POLL_SEC: float = 2.0
+    # Stream URLs from Parser Service per results page (POST /parse/stream) and
+    # insert them into domains_queue incrementally instead of after the whole run
+    PARSER_STREAM_RESULTS: bool = True
+    PARSER_STREAM_BATCH_SIZE: int = 50
+    # In-memory blacklist index (app.services.blacklist_index): URLs of blacklisted
+    # domains and their subdomains are dropped before they reach domains_queue
+    BLACKLIST_INDEX_REFRESH_SEC: float = 30.0  # How often blacklist_version is checked
+    # Domain Info Parser worker (domain_info_parser/worker.py, one long-lived process)
+    DOMAIN_PARSER_PYTHON: str = "python"  # System Python with Playwright (backend venv has none)
+    DOMAIN_PARSER_CONCURRENCY: int = 4  # Pages parsed at once in the worker's browser
+    DOMAIN_PARSER_TIMEOUT_SEC: int = 120  # Per domain
+    # Stop opening pages of a domain once found: inn_and_email | inn | never (visit all)
+    DOMAIN_PARSER_STOP_POLICY: str = "inn_and_email"
+    # Domain info cache (domain_info_cache table, app.services.domain_info_cache)
+    DOMAIN_INFO_CACHE_ENABLED: bool = True
+    DOMAIN_INFO_CACHE_TTL_SEC: int = 30 * 24 * 3600  # Results with INN/emails (0 = never expire)
+    DOMAIN_INFO_CACHE_NEGATIVE_TTL_SEC: int = 24 * 3600  # Results where nothing was found
+
     # Checko API
-    CHECKO_API_KEY: str = ""
+    CHECKO_API_KEY: str = ""  # One key or several comma-separated (load is spread across them)
+    CHECKO_KEY_RATE_PER_SEC: float = 2.0  # Token bucket per key
+    CHECKO_KEY_BURST: int = 5
+    CHECKO_KEY_COOLDOWN_SEC: float = 60.0  # Key is skipped after 429/403/limit error
+    CHECKO_KEY_MAX_WAIT_SEC: float = 30.0  # Max wait for a free key before CheckoKeysExhausted
+    CHECKO_MAX_RETRIES: int = 3  # Retries of timeouts/5xx (exponential backoff with jitter)
+    CHECKO_RETRY_BASE_SEC: float = 1.0
+    CHECKO_MAX_CONNECTIONS: int = 10  # Shared keep-alive client
+    # Batch enrichment (app.services.checko_enrichment, POST /moderator/checko/batch)
+    CHECKO_BATCH_CONCURRENCY: int = 4  # INNs enriched at once (5 requests each)
+    CHECKO_BATCH_MAX_INNS: int = 5000
+    # Storage format of moderator_suppliers.checko_data (app.utils.checko_compression)
+    CHECKO_CODEC: str = "gzip"  # gzip | zstd - codec of newly written data (all formats are readable)
+    CHECKO_ZSTD_LEVEL: int = 9
+    CHECKO_ZSTD_DICT_DIR: str = ""  # Trained dictionaries (checko-<id>.zdict), see app.services.checko_reencode
+    CHECKO_ZSTD_DICT_ID: int = 0  # Dictionary used for writing (0 = zstd without dictionary)
 
     # Groq (platform key)
     GROQ_API_KEY: str = ""
     GROQ_MODEL: str = ""
     GROQ_BASE_URL: str = ""
 
+    # Recognition cache (recognition_cache table, app.services.recognition_cache)
+    RECOGNITION_CACHE_ENABLED: bool = True
+    RECOGNITION_CACHE_TTL_SEC: int = 30 * 24 * 3600  # 0 = entries never expire
+    RECOGNITION_CACHE_MAX_ENTRIES: int = 20000  # LRU eviction by last_accessed_at (0 = unbounded)
+    RECOGNITION_CACHE_EVICT_EVERY: int = 100  # Run eviction after every N stored results
+    # Text extraction cache (app.services.extraction_cache): file hash + engine -> text
+    EXTRACTION_CACHE_ENABLED: bool = True
+    EXTRACTION_CACHE_DIR: str = ""  # Empty = <system temp>/b2b_extraction_cache
+    EXTRACTION_CACHE_MAX_MB: int = 512  # LRU files are evicted above this size
+    EXTRACTION_CACHE_MEMORY_ITEMS: int = 256  # In-process LRU in front of the disk store
+    # Recognition executor (app.services.recognition_executor)
+    RECOGNITION_PROCESS_WORKERS: int = 2  # OCR/parsing processes (0 = threads of the backend process)
+    RECOGNITION_PER_USER_CONCURRENCY: int = 1  # Uploads recognized at once per user
+    RECOGNITION_MAX_QUEUE: int = 50  # Uploads waiting for a slot before 429 (0 = unbounded)
+    RECOGNITION_JOB_STALE_SEC: int = 1800  # Unfinished job without progress this long is reported failed
+
     # Application
     ENV: str = "development"
     LOG_LEVEL: str = "INFO"
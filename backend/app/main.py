@@ -25,6 +25,12 @@ from sqlalchemy import text
 from app.config import settings
 from app.logging_config import setup_logging, log_service_event, get_logger
 from app.adapters.db.session import AsyncSessionLocal
+from app.services.parsing_queue import get_parsing_worker_pool
+from app.services.blacklist_index import get_blacklist_index
+from app.services.domain_parser_worker import get_domain_parser_worker
+from app.services.recognition_executor import get_recognition_executor
+from app.services.checko_enrichment import get_checko_enrichment_service
+from app.adapters.checko_client import close_checko_http_client
 from app.transport.routers import (
     health,
     moderator_suppliers,
@@ -41,6 +47,8 @@ from app.transport.routers import (
     auth,
     cabinet,
     mail,
+    recognition,
+    search,
 )
 
 
@@ -76,9 +84,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger = get_logger("db")
         logger.warning(f"DB schema check failed (openai_api_key_encrypted): {type(e).__name__}: {e}")
+
+    # Blacklist index for the ingestion path (refreshed later by blacklist_version)
+    await get_blacklist_index().load()
+
+    # Start parsing job workers (PARSING_WORKERS=0 leaves the queue to standalone workers)
+    parsing_worker_pool = get_parsing_worker_pool()
+    try:
+        await parsing_worker_pool.start()
+    except Exception as e:
+        get_logger("parsing_queue").error(f"Failed to start parsing worker pool: {type(e).__name__}: {e}")
     
     yield
     # Shutdown
+    await parsing_worker_pool.stop()
+    await get_domain_parser_worker().close()
+    if "app.services.recognition_jobs" in sys.modules:
+        # Imported lazily by the cabinet router (pulls in OCR libraries)
+        await sys.modules["app.services.recognition_jobs"].get_recognition_job_manager().close()
+    get_recognition_executor().shutdown()
+    await get_checko_enrichment_service().close()
+    await close_checko_http_client()
     log_service_event(
         event_type="shutdown", 
         service="backend",
@@ -312,6 +338,7 @@ async def root():
             "parsing_runs": "/parsing/runs",
             "domains_queue": "/domains",
             "attachments": "/attachments",
+            "search": "/search",
         }
     }
 
@@ -402,6 +429,12 @@ try:
     
     logger.info("Registering mail router")
     app.include_router(mail.router, prefix="/api", tags=["Mail"])
+
+    logger.info("Registering recognition router")
+    app.include_router(recognition.router, prefix="/moderator", tags=["Recognition"])
+
+    logger.info("Registering search router")
+    app.include_router(search.router, tags=["Search"])
     
     # Log registration summary
     from fastapi.routing import APIRoute
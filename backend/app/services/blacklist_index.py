@@ -0,0 +1,207 @@
+"""In-memory blacklist index: reversed-label suffix trie of blacklisted domains.
+
+The blacklist was only consulted by the moderator UI: BlacklistRepository.is_blacklisted
+is a SELECT per domain and nothing in the ingestion path (start_parsing) applied it,
+so URLs of blacklisted sites and their subdomains kept landing in domains_queue.
+
+The index holds every blacklisted domain as a path of labels from the TLD
+("shop.example.ru" -> ru -> example -> shop), so a lookup walks the host's labels
+once and matches the domain itself and any of its subdomains: with "example.ru"
+blacklisted, "example.ru", "www.example.ru" and "msk.shop.example.ru" are all
+dropped, "myexample.ru" is not.
+
+Freshness: migration 020 keeps a change counter in blacklist_version (bumped by a
+trigger on every statement touching blacklist). ensure_fresh() compares it at
+most every BLACKLIST_INDEX_REFRESH_SEC and reloads the whole index on change;
+the blacklist router calls invalidate() so this process sees its own edits on the
+next check. Parser Service pulls the same data via GET /parsing/blacklist-index.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.adapters.db.repositories import BlacklistRepository
+from app.adapters.db.session import AsyncSessionLocal
+from app.config import settings
+from app.utils.domains import normalize_domain
+
+logger = logging.getLogger(__name__)
+
+_TERMINAL = ""  # key of a trie node that ends a blacklisted domain (labels are never empty)
+
+
+class DomainSuffixIndex:
+    """Suffix trie over domain labels: matches a domain and all its subdomains."""
+
+    def __init__(self, domains: Iterable[str] = ()):
+        self._root: Dict[str, dict] = {}
+        self._size = 0
+        for domain in domains:
+            self.add(domain)
+
+    @staticmethod
+    def _labels(domain: str) -> List[str]:
+        return [label for label in reversed(normalize_domain(domain).split(".")) if label]
+
+    def add(self, domain: str) -> bool:
+        """Add a domain (URL or host); False if it is empty or already present."""
+        labels = self._labels(domain)
+        if not labels:
+            return False
+        node = self._root
+        for label in labels:
+            node = node.setdefault(label, {})
+        if _TERMINAL in node:
+            return False
+        node[_TERMINAL] = ".".join(reversed(labels))
+        self._size += 1
+        return True
+
+    def match(self, domain: str) -> Optional[str]:
+        """Blacklisted domain covering `domain` (URL or host), or None."""
+        node = self._root
+        for label in self._labels(domain):
+            node = node.get(label)
+            if node is None:
+                return None
+            if _TERMINAL in node:
+                return node[_TERMINAL]
+        return None
+
+    def domains(self) -> List[str]:
+        """All indexed domains, sorted."""
+        out = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == _TERMINAL:
+                    out.append(child)
+                else:
+                    stack.append(child)
+        return sorted(out)
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class BlacklistIndex:
+    """Process-wide blacklist index refreshed by the blacklist_version counter."""
+
+    def __init__(self, refresh_seconds: float = 30.0):
+        self.refresh_seconds = max(0.0, float(refresh_seconds))
+        self._index = DomainSuffixIndex()
+        self._lock = asyncio.Lock()
+        self.version: Optional[int] = None  # None: not loaded or counter table missing
+        self.loaded = False
+        self._stale = True
+        self._checked_at = 0.0
+        self.loaded_at: Optional[float] = None
+        # Counters of this process (since start)
+        self.loads = 0
+        self.load_errors = 0
+        self.urls_checked = 0
+        self.urls_dropped = 0
+
+    @classmethod
+    def from_settings(cls) -> "BlacklistIndex":
+        return cls(refresh_seconds=settings.BLACKLIST_INDEX_REFRESH_SEC)
+
+    async def _read_version(self) -> Optional[int]:
+        try:
+            async with AsyncSessionLocal() as db:
+                return await BlacklistRepository(db).version()
+        except Exception as e:
+            logger.debug(f"blacklist_version is not available: {type(e).__name__}: {e}")
+            return None
+
+    async def load(self) -> None:
+        """Rebuild the index from the blacklist table."""
+        async with self._lock:
+            await self._load()
+
+    async def _load(self) -> None:
+        version = await self._read_version()
+        try:
+            async with AsyncSessionLocal() as db:
+                domains = await BlacklistRepository(db).all_domains()
+        except Exception as e:
+            self.load_errors += 1
+            # Keep the previous index and retry after refresh_seconds
+            self._stale = False
+            self._checked_at = time.monotonic()
+            logger.warning(f"Blacklist index load failed: {type(e).__name__}: {e}")
+            return
+        self._index = DomainSuffixIndex(domains)
+        self.version = version
+        self.loaded = True
+        self._stale = False
+        self.loaded_at = self._checked_at = time.monotonic()
+        self.loads += 1
+        logger.info(f"Blacklist index loaded: {len(self._index)} domains, version={version}")
+
+    async def ensure_fresh(self) -> None:
+        """Reload the index if blacklist_version changed (checked every refresh_seconds)."""
+        if not self._stale and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if not self._stale and time.monotonic() - self._checked_at < self.refresh_seconds:
+                return
+            if not self._stale:
+                version = await self._read_version()
+                # Without the counter table (migration 020 not applied) reload every interval
+                if version is not None and version == self.version:
+                    self._checked_at = time.monotonic()
+                    return
+            await self._load()
+
+    def invalidate(self) -> None:
+        """Reload on the next ensure_fresh() (after this process changed the blacklist)."""
+        self._stale = True
+
+    def match(self, url_or_domain: str) -> Optional[str]:
+        """Blacklisted domain covering a URL or host, or None."""
+        return self._index.match(url_or_domain or "")
+
+    def filter_rows(self, rows: List[dict]) -> Tuple[List[dict], int]:
+        """Drop domains_queue rows whose domain or URL is blacklisted: (kept rows, dropped count)."""
+        kept = []
+        for row in rows:
+            if self.match(row.get("domain") or "") or self.match(row.get("url") or ""):
+                continue
+            kept.append(row)
+        dropped = len(rows) - len(kept)
+        self.urls_checked += len(rows)
+        self.urls_dropped += dropped
+        return kept, dropped
+
+    def export(self) -> dict:
+        """Version and domain list for Parser Service (GET /parsing/blacklist-index)."""
+        return {"version": self.version, "domains": self._index.domains()}
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "domains": len(self._index),
+            "version": self.version,
+            "refresh_seconds": self.refresh_seconds,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at else None,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "urls_checked": self.urls_checked,
+            "urls_dropped": self.urls_dropped,
+        }
+
+
+_index_instance: Optional[BlacklistIndex] = None
+
+
+def get_blacklist_index() -> BlacklistIndex:
+    """Get blacklist index instance"""
+    global _index_instance
+    if _index_instance is None:
+        _index_instance = BlacklistIndex.from_settings()
+    return _index_instance
@@ -50,6 +50,12 @@ try:
 except Exception:
     DOCLING_AVAILABLE = False
 
+try:
+    from app.services.extraction_cache import extraction_cache_key, get_extraction_cache
+    EXTRACTION_CACHE_AVAILABLE = True
+except ImportError:
+    EXTRACTION_CACHE_AVAILABLE = False
+
 
 class RecognitionEngine(str, Enum):
     auto = "auto"
@@ -247,110 +253,124 @@ def extract_item_names_via_groq(*, text: str, api_key: str) -> List[str]:
 
 
 def extract_text_best_effort(*, filename: str, content: bytes, engine: RecognitionEngine = RecognitionEngine.auto) -> str:
+    text, _method = extract_text_with_method(filename=filename, content=content, engine=engine)
+    return text
+
+
+def extract_text_with_method(
+    *, filename: str, content: bytes, engine: RecognitionEngine = RecognitionEngine.auto
+) -> tuple[str, str]:
+    """Extract text, returning (text, method that succeeded).
+
+    Results are cached by SHA-256 of the file bytes + engine (app.services.extraction_cache),
+    so re-uploads of the same document skip OCR entirely.
+    """
+    if not content:
+        return "", ""
+
+    if not EXTRACTION_CACHE_AVAILABLE:
+        return _extract_text_uncached(filename, content, engine)
+
+    cache = get_extraction_cache()
+    key = text_extraction_cache_key(filename, content, engine)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    text, method = _extract_text_uncached(filename, content, engine, preferred_method=cache.method_hint(key))
+    cache.put(key, text, method)
+    return text, method
+
+
+def text_extraction_cache_key(filename: str, content: bytes, engine: RecognitionEngine) -> str:
+    """Extraction cache key of a file: content hash + engine + extension."""
     name = (filename or "").lower()
     ext = name.split(".")[-1] if "." in name else ""
+    return extraction_cache_key(content, f"{engine.value}:{ext}")
 
+
+def extract_text_uncached(
+    *,
+    filename: str,
+    content: bytes,
+    engine: RecognitionEngine = RecognitionEngine.auto,
+    preferred_method: Optional[str] = None,
+) -> tuple[str, str]:
+    """(text, method) without touching the extraction cache.
+
+    For recognition pool workers: the cache lookup and store stay in the API process
+    (see recognition_jobs.extract_text), where its memory tier and stats live.
+    """
     if not content:
-        return ""
+        return "", ""
+    return _extract_text_uncached(filename, content, engine, preferred_method=preferred_method)
+
 
+def _extract_text_uncached(
+    filename: str,
+    content: bytes,
+    engine: RecognitionEngine,
+    preferred_method: Optional[str] = None,
+) -> tuple[str, str]:
+    """Run the fallback chain of extraction methods; preferred_method (if applicable) goes first."""
+    name = (filename or "").lower()
+    ext = name.split(".")[-1] if "." in name else ""
+
+    steps: List[tuple[str, object]] = []
     # Respect explicit engine selection when possible.
     if engine == RecognitionEngine.docling:
-        try:
-            return (_extract_docling_text(filename, content) or "").strip()
-        except Exception:
-            return ""
-
-    if ext == "pdf":
+        steps.append(("docling", lambda: _extract_docling_text(filename, content)))
+    elif ext == "pdf":
         # Fast path: digital PDF text
-        try:
-            t = (_extract_pdf_text(content) or "").strip()
-            if t:
-                return t
-        except Exception:
-            pass
-
+        steps.append(("pdf_text", lambda: _extract_pdf_text(content)))
         # Table extraction may catch some PDFs
         if engine in {RecognitionEngine.auto, RecognitionEngine.structured}:
-            try:
-                t = (_extract_pdf_tables_text(content) or "").strip()
-                if t:
-                    return t
-            except Exception:
-                pass
+            steps.append(("pdf_tables", lambda: _extract_pdf_tables_text(content)))
+        # OCR via parser_service first, then local OCR fallback
+        steps.append(("parser_service_ocr", lambda: _ocr_via_parser_service(filename, content)))
+        steps.append(("local_ocr", lambda: _ocr_pdf_bytes(content)))
+    elif ext in {"png", "jpg", "jpeg"}:
+        steps.append(("parser_service_ocr", lambda: _ocr_via_parser_service(filename, content)))
+        steps.append(("local_ocr", lambda: _ocr_image_bytes(content)))
+        if EASYOCR_AVAILABLE:
+            steps.append(("easyocr", lambda: smart_extract_text(filename, content)))
+    elif ext == "docx":
+        steps.append(("docx", lambda: _extract_docx_text(content)))
+    elif ext in {"xlsx", "xls"}:
+        steps.append(("xlsx", lambda: _extract_xlsx_text(content)))
+    else:
+        # Plain text fallback
+        steps.append(("plain", lambda: content.decode("utf-8", errors="ignore")))
 
-        # OCR via parser_service first
-        try:
-            t = (_ocr_via_parser_service(filename, content) or "").strip()
-            if t:
-                return t
-        except Exception:
-            pass
+    if preferred_method:
+        # Start with the method that worked for this document last time
+        steps.sort(key=lambda step: step[0] != preferred_method)
 
-        # Local OCR fallback
+    for method, extract in steps:
         try:
-            t = (_ocr_pdf_bytes(content) or "").strip()
+            t = (extract() or "").strip()
             if t:
-                return t
+                return t, method
         except Exception:
             pass
+    return "", ""
 
-        return ""
 
-    if ext in {"png", "jpg", "jpeg"}:
-        try:
-            t = (_ocr_via_parser_service(filename, content) or "").strip()
-            if t:
-                return t
-        except Exception:
-            pass
-        try:
-            t = (_ocr_image_bytes(content) or "").strip()
-            if t:
-                return t
-        except Exception:
-            pass
+# Part of the recognition cache key: bump when the Groq prompt or post-processing
+# changes so cached names from the old prompt are not reused
+GROQ_PROMPT_VERSION = "names-v1"
 
-        if EASYOCR_AVAILABLE:
-            try:
-                t = (smart_extract_text(filename, content) or "").strip()
-                if t:
-                    return t
-            except Exception:
-                pass
-        return ""
 
-    if ext == "docx":
-        try:
-            return (_extract_docx_text(content) or "").strip()
-        except Exception:
-            return ""
+def groq_model_name() -> str:
+    return (os.getenv("GROQ_MODEL") or "llama-3.1-8b-instant").strip()
 
-    if ext in {"xlsx", "xls"}:
-        try:
-            return (_extract_xlsx_text(content) or "").strip()
-        except Exception:
-            return ""
-
-    # Plain text fallback
-    try:
-        return content.decode("utf-8", errors="ignore").strip()
-    except Exception:
-        return ""
-
-
-def extract_item_names_via_groq_with_usage(*, text: str, api_key: str) -> tuple[List[str], dict]:
-    raw = (text or "").strip()
-    key = (api_key or "").strip()
-    if not raw:
-        return [], {}
-    if not key:
-        raise RecognitionDependencyError("GROQ_API_KEY is not configured")
 
+def _groq_request(text: str) -> tuple[str, dict]:
+    """Build Groq chat completion (url, payload) for item-name extraction."""
     # Minimize data sent: take only the first chunk.
     max_chars = int(os.getenv("GROQ_INPUT_MAX_CHARS", "12000"))
-    payload_text = raw[: max(1, min(max_chars, 50000))]
+    payload_text = text[: max(1, min(max_chars, 50000))]
 
-    model = (os.getenv("GROQ_MODEL") or "llama-3.1-8b-instant").strip()
+    model = groq_model_name()
     url = (os.getenv("GROQ_BASE_URL") or "https://api.groq.com/openai/v1").rstrip("/") + "/chat/completions"
 
     system = (
@@ -375,31 +395,29 @@ def extract_item_names_via_groq_with_usage(*, text: str, api_key: str) -> tuple[
         ],
         "response_format": {"type": "json_object"},
     }
+    return url, payload
+
 
+def _groq_status_error(r: httpx.Response, e: Exception) -> RecognitionDependencyError:
+    snippet = ""
     try:
-        with httpx.Client(timeout=30.0) as client:
-            r = client.post(url, headers={"Authorization": f"Bearer {key}"}, json=payload)
-            try:
-                r.raise_for_status()
-            except httpx.HTTPStatusError as e:
-                snippet = ""
-                try:
-                    snippet = (r.text or "").strip()
-                except Exception:
-                    snippet = ""
-                if snippet:
-                    snippet = snippet[:400]
-                raise RecognitionDependencyError(
-                    f"Groq request failed: {r.status_code} {r.reason_phrase}. {snippet}".strip()
-                ) from e
-            data = r.json() or {}
-            usage = data.get("usage") or {}
-            content = (((data.get("choices") or [{}])[0].get("message") or {}).get("content") or "").strip()
-    except RecognitionDependencyError:
-        raise
-    except Exception as e:
-        raise RecognitionDependencyError(f"Groq request failed: {e}")
+        snippet = (r.text or "").strip()
+    except Exception:
+        snippet = ""
+    if snippet:
+        snippet = snippet[:400]
+    err = RecognitionDependencyError(f"Groq request failed: {r.status_code} {r.reason_phrase}. {snippet}".strip())
+    err.__cause__ = e
+    return err
 
+
+def _groq_content_and_usage(data: dict) -> tuple[str, dict]:
+    usage = data.get("usage") or {}
+    content = (((data.get("choices") or [{}])[0].get("message") or {}).get("content") or "").strip()
+    return content, usage
+
+
+def _parse_groq_names(content: str, usage: dict) -> tuple[List[str], dict]:
     if not content:
         return [], usage if isinstance(usage, dict) else {}
 
@@ -441,7 +459,58 @@ def extract_item_names_via_groq_with_usage(*, text: str, api_key: str) -> tuple[
         out.append(s)
         if len(out) >= limit:
             break
-    return normalize_item_names(out)
+    return normalize_item_names(out), usage if isinstance(usage, dict) else {}
+
+
+def extract_item_names_via_groq_with_usage(*, text: str, api_key: str) -> tuple[List[str], dict]:
+    raw = (text or "").strip()
+    key = (api_key or "").strip()
+    if not raw:
+        return [], {}
+    if not key:
+        raise RecognitionDependencyError("GROQ_API_KEY is not configured")
+
+    url, payload = _groq_request(raw)
+    try:
+        with httpx.Client(timeout=30.0) as client:
+            r = client.post(url, headers={"Authorization": f"Bearer {key}"}, json=payload)
+            try:
+                r.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                raise _groq_status_error(r, e)
+            content, usage = _groq_content_and_usage(r.json() or {})
+    except RecognitionDependencyError:
+        raise
+    except Exception as e:
+        raise RecognitionDependencyError(f"Groq request failed: {e}")
+
+    return _parse_groq_names(content, usage)
+
+
+async def extract_item_names_via_groq_with_usage_async(*, text: str, api_key: str) -> tuple[List[str], dict]:
+    """Async version of extract_item_names_via_groq_with_usage (does not block the event loop)."""
+    raw = (text or "").strip()
+    key = (api_key or "").strip()
+    if not raw:
+        return [], {}
+    if not key:
+        raise RecognitionDependencyError("GROQ_API_KEY is not configured")
+
+    url, payload = _groq_request(raw)
+    try:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            r = await client.post(url, headers={"Authorization": f"Bearer {key}"}, json=payload)
+            try:
+                r.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                raise _groq_status_error(r, e)
+            content, usage = _groq_content_and_usage(r.json() or {})
+    except RecognitionDependencyError:
+        raise
+    except Exception as e:
+        raise RecognitionDependencyError(f"Groq request failed: {e}")
+
+    return _parse_groq_names(content, usage)
 
 
 def parse_positions_from_text(text: str) -> List[str]:
@@ -1443,14 +1512,8 @@ def _extract_rtf_text(data: bytes) -> str:
     return raw
 
 
-def extract_unique_parsing_keys_via_openai(*, positions: List[str], api_key: str) -> List[str]:
-    items = [str(x).strip() for x in (positions or []) if str(x).strip()]
-    if not items:
-        return []
-    key = (api_key or "").strip()
-    if not key:
-        return extract_parsing_keys_from_positions(items)
-
+def _openai_keys_request(items: List[str]) -> tuple[str, dict]:
+    """Build OpenAI chat completion (url, payload) for parsing-key extraction."""
     system = (
         "Ты извлекаешь уникальные ключи (короткие поисковые фразы) из заявки. "
         "На входе список строк позиций/номенклатуры. "
@@ -1473,15 +1536,10 @@ def extract_unique_parsing_keys_via_openai(*, positions: List[str], api_key: str
 
     url = (os.getenv("OPENAI_BASE_URL") or "https://api.openai.com").rstrip("/") + "/v1/chat/completions"
 
-    try:
-        with httpx.Client(timeout=30.0) as client:
-            r = client.post(url, headers={"Authorization": f"Bearer {key}"}, json=payload)
-            r.raise_for_status()
-            data = r.json() or {}
-            content = (((data.get("choices") or [{}])[0].get("message") or {}).get("content") or "").strip()
-    except Exception:
-        return extract_parsing_keys_from_positions(items)
+    return url, payload
+
 
+def _parse_openai_keys(content: str, items: List[str]) -> List[str]:
     if not content:
         return extract_parsing_keys_from_positions(items)
 
@@ -1518,6 +1576,55 @@ def extract_unique_parsing_keys_via_openai(*, positions: List[str], api_key: str
     return out if out else extract_parsing_keys_from_positions(items)
 
 
+def extract_unique_parsing_keys_via_openai(*, positions: List[str], api_key: str) -> List[str]:
+    items = [str(x).strip() for x in (positions or []) if str(x).strip()]
+    if not items:
+        return []
+    key = (api_key or "").strip()
+    if not key:
+        return extract_parsing_keys_from_positions(items)
+
+    url, payload = _openai_keys_request(items)
+    try:
+        with httpx.Client(timeout=30.0) as client:
+            r = client.post(url, headers={"Authorization": f"Bearer {key}"}, json=payload)
+            r.raise_for_status()
+            data = r.json() or {}
+            content = (((data.get("choices") or [{}])[0].get("message") or {}).get("content") or "").strip()
+    except Exception:
+        return extract_parsing_keys_from_positions(items)
+
+    return _parse_openai_keys(content, items)
+
+
+async def extract_unique_parsing_keys_via_openai_async(*, positions: List[str], api_key: str) -> List[str]:
+    """Async version of extract_unique_parsing_keys_via_openai.
+
+    The heuristic fallback (which may call Ollama per line) runs in the recognition executor.
+    """
+    from app.services.recognition_executor import get_recognition_executor
+
+    items = [str(x).strip() for x in (positions or []) if str(x).strip()]
+    if not items:
+        return []
+    key = (api_key or "").strip()
+    executor = get_recognition_executor()
+    if not key:
+        return await executor.run(extract_parsing_keys_from_positions, items)
+
+    url, payload = _openai_keys_request(items)
+    try:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            r = await client.post(url, headers={"Authorization": f"Bearer {key}"}, json=payload)
+            r.raise_for_status()
+            data = r.json() or {}
+            content = (((data.get("choices") or [{}])[0].get("message") or {}).get("content") or "").strip()
+    except Exception:
+        return await executor.run(extract_parsing_keys_from_positions, items)
+
+    return await executor.run(_parse_openai_keys, content, items)
+
+
 def _extract_pdf_text(data: bytes) -> str:
     from io import BytesIO
 
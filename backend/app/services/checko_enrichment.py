@@ -0,0 +1,188 @@
+"""Batched Checko enrichment of suppliers by INN.
+
+Enriching suppliers after a parsing wave meant opening /moderator/checko/{inn} one
+INN at a time. A batch job takes a list of INNs (or every supplier INN without
+Checko data) and runs them through get_checko_data, CHECKO_BATCH_CONCURRENCY at a
+time. Requests go through the shared Checko client, so API keys are used within
+their token buckets and a rate limited key is skipped instead of failing the INN.
+
+Jobs live in memory of the process that started them (like Domain Parser runs);
+progress is polled via GET /moderator/checko/batch/{job_id}.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.adapters.checko_client import CheckoKeysExhausted
+from app.adapters.db.repositories import ModeratorSupplierRepository
+from app.adapters.db.session import AsyncSessionLocal
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_JOBS_KEPT = 50  # finished jobs beyond this are forgotten (oldest first)
+MAX_ERRORS_KEPT = 100  # per job
+MAX_RATE_LIMIT_WAITS = 3  # per INN, when all keys stay limited
+
+
+def _valid_inn(inn: str) -> bool:
+    return inn.isdigit() and len(inn) in (10, 12)
+
+
+class CheckoEnrichmentService:
+    """Runs Checko batch jobs with bounded concurrency and tracks their progress."""
+
+    def __init__(self, concurrency: int = 4, max_inns: int = 5000):
+        self.concurrency = max(1, int(concurrency))
+        self.max_inns = max(1, int(max_inns))
+        self._jobs: Dict[str, Dict] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_settings(cls) -> "CheckoEnrichmentService":
+        return cls(
+            concurrency=settings.CHECKO_BATCH_CONCURRENCY,
+            max_inns=settings.CHECKO_BATCH_MAX_INNS,
+        )
+
+    async def start(self, inns: Optional[List[str]] = None, force_refresh: bool = False) -> Dict:
+        """Start a job for the given INNs; None = suppliers without Checko data.
+
+        Raises:
+            RuntimeError: If no Checko API key is configured
+            ValueError: If there are more than max_inns INNs
+        """
+        if not settings.CHECKO_API_KEY.strip():
+            raise RuntimeError("Checko API ключ не настроен. Установите CHECKO_API_KEY в переменных окружения.")
+        if inns is None:
+            async with AsyncSessionLocal() as db:
+                inns = await ModeratorSupplierRepository(db).list_inns_without_checko(limit=self.max_inns)
+        unique = list(dict.fromkeys((inn or "").strip() for inn in inns))
+        invalid = [inn for inn in unique if not _valid_inn(inn)]
+        valid = [inn for inn in unique if _valid_inn(inn)]
+        if len(valid) > self.max_inns:
+            raise ValueError(f"Too many INNs: {len(valid)} (max {self.max_inns})")
+
+        job_id = f"checko_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        job = {
+            "jobId": job_id,
+            "status": "running",
+            "total": len(valid),
+            "processed": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skippedInvalid": len(invalid),
+            "rateLimitWaits": 0,
+            "forceRefresh": force_refresh,
+            "errors": [{"inn": inn, "error": "invalid INN"} for inn in invalid[:MAX_ERRORS_KEPT]],
+            "startedAt": datetime.now().isoformat(),
+            "finishedAt": None,
+        }
+        self._jobs[job_id] = job
+        self._forget_old_jobs()
+        task = asyncio.create_task(self._run(job, valid, force_refresh))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _t, _id=job_id: self._tasks.pop(_id, None))
+        logger.info(f"Checko batch {job_id} started: {len(valid)} INNs ({len(invalid)} invalid skipped)")
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    async def _run(self, job: Dict, inns: List[str], force_refresh: bool) -> None:
+        queue: asyncio.Queue = asyncio.Queue()
+        for inn in inns:
+            queue.put_nowait(inn)
+
+        async def worker() -> None:
+            while True:
+                try:
+                    inn = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self._enrich_one(job, inn, force_refresh)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(inns)) or 1)]
+        try:
+            await asyncio.gather(*workers)
+            job["status"] = "completed"
+        except asyncio.CancelledError:
+            for w in workers:
+                w.cancel()
+            job["status"] = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Checko batch {job['jobId']} failed: {e}", exc_info=True)
+            job["status"] = "failed"
+            job["error"] = str(e)
+        finally:
+            job["finishedAt"] = datetime.now().isoformat()
+            logger.info(
+                f"Checko batch {job['jobId']} {job['status']}: "
+                f"{job['succeeded']} ok, {job['failed']} failed of {job['total']}"
+            )
+
+    async def _enrich_one(self, job: Dict, inn: str, force_refresh: bool) -> None:
+        from app.usecases import get_checko_data
+
+        error: Optional[str] = None
+        for wait_number in range(MAX_RATE_LIMIT_WAITS + 1):
+            try:
+                async with AsyncSessionLocal() as db:
+                    await get_checko_data.execute(db=db, inn=inn, force_refresh=force_refresh)
+                    await db.commit()
+                error = None
+                break
+            except CheckoKeysExhausted as e:
+                # Все ключи на паузе: ждем остывания и пробуем тот же ИНН снова
+                error = str(e)
+                if wait_number == MAX_RATE_LIMIT_WAITS:
+                    break
+                job["rateLimitWaits"] += 1
+                await asyncio.sleep(settings.CHECKO_KEY_COOLDOWN_SEC * random.uniform(0.5, 1.0))
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                break
+
+        job["processed"] += 1
+        if error is None:
+            job["succeeded"] += 1
+        else:
+            job["failed"] += 1
+            if len(job["errors"]) < MAX_ERRORS_KEPT:
+                job["errors"].append({"inn": inn, "error": error})
+            logger.warning(f"Checko batch {job['jobId']}: INN {inn} failed: {error}")
+
+    def _forget_old_jobs(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] != "running"]
+        for job_id in finished[:max(0, len(self._jobs) - MAX_JOBS_KEPT)]:
+            self._jobs.pop(job_id, None)
+
+    async def close(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_service_instance: Optional[CheckoEnrichmentService] = None
+
+
+def get_checko_enrichment_service() -> CheckoEnrichmentService:
+    """Get Checko enrichment service instance"""
+    global _service_instance
+    if _service_instance is None:
+        _service_instance = CheckoEnrichmentService.from_settings()
+    return _service_instance
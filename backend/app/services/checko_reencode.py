@@ -0,0 +1,215 @@
+"""Maintenance of stored Checko data: zstd dictionary training, re-encoding, benchmark.
+
+moderator_suppliers.checko_data was gzipped per document; app.utils.checko_compression
+now reads gzip, zstd and zstd with a trained dictionary. This tool moves existing
+rows to the configured codec:
+
+    python -m app.services.checko_reencode train --dict-dir /data/checko-dicts
+    # set CHECKO_CODEC=zstd, CHECKO_ZSTD_DICT_DIR, CHECKO_ZSTD_DICT_ID (printed by train)
+    # and deploy: every process must have the dictionary before rows use it
+    python -m app.services.checko_reencode reencode --batch-size 200 --pause 0.5
+    python -m app.services.checko_reencode bench --sample 500
+
+Re-encoding walks the table by id in small batches with a pause between them
+(one transaction per batch), so it can run next to the API. A row is written only
+if its blob is unchanged since it was read and the new blob decodes
+back to the same JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from app.adapters.db.session import AsyncSessionLocal
+from app.utils import checko_compression as codec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DICT_SIZE = 112 * 1024
+DEFAULT_SAMPLE = 2000
+
+
+async def _load_samples(limit: int) -> List[bytes]:
+    """Decoded JSON of up to `limit` most recent suppliers with Checko data."""
+    from sqlalchemy import text
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text(
+                "SELECT checko_data FROM moderator_suppliers WHERE checko_data IS NOT NULL "
+                "ORDER BY id DESC LIMIT :limit"
+            ),
+            {"limit": limit},
+        )
+        blobs = [bytes(row[0]) for row in result.fetchall()]
+    samples = []
+    for blob in blobs:
+        try:
+            samples.append(codec.decode_payload(blob))
+        except ValueError as e:
+            logger.warning(f"Skipping undecodable sample: {e}")
+    return samples
+
+
+def train_dictionary(samples: List[bytes], dict_size: int = DEFAULT_DICT_SIZE, dict_dir: Optional[str] = None):
+    """Train a zstd dictionary on decoded documents and save it as checko-<id>.zdict.
+
+    Returns:
+        (dict_id, path)
+    """
+    if not codec.ZSTD_AVAILABLE:
+        raise RuntimeError("zstandard is not installed")
+    if len(samples) < 10:
+        raise ValueError(f"Not enough samples to train a dictionary: {len(samples)}")
+    dict_data = codec.zstd.train_dictionary(dict_size, samples)
+    dict_id = dict_data.dict_id()
+    path = codec.dictionary_path(dict_id, dict_dir)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(dict_data.as_bytes())
+    logger.info(f"Checko dictionary {dict_id} trained on {len(samples)} documents: {path}")
+    return dict_id, path
+
+
+def benchmark_codecs(samples: List[bytes], dict_size: int = DEFAULT_DICT_SIZE, level: int = 9) -> List[Dict]:
+    """Compression ratio and decode time of gzip, zstd and zstd with a dictionary.
+
+    The dictionary is trained on every other document and measured on the rest,
+    so its ratio is not flattered by training on the measured data.
+    """
+    raw_total = sum(len(doc) for doc in samples)
+    results = []
+
+    def measure(name: str, docs: List[bytes], encode, decode) -> None:
+        encoded = [encode(doc) for doc in docs]
+        started = time.perf_counter()
+        for blob in encoded:
+            decode(blob)
+        elapsed = time.perf_counter() - started
+        raw = sum(len(doc) for doc in docs)
+        stored = sum(len(blob) for blob in encoded)
+        results.append({
+            "codec": name,
+            "documents": len(docs),
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "ratio": round(raw / stored, 2) if stored else None,
+            "decode_us_per_doc": round(elapsed / len(docs) * 1e6, 1) if docs else None,
+        })
+
+    measure("gzip", samples, gzip.compress, gzip.decompress)
+    if codec.ZSTD_AVAILABLE and raw_total:
+        zstd = codec.zstd
+        compressor, decompressor = zstd.ZstdCompressor(level=level), zstd.ZstdDecompressor()
+        measure("zstd", samples, compressor.compress, decompressor.decompress)
+        train, test = samples[::2], samples[1::2]
+        if len(train) >= 10 and test:
+            dict_data = zstd.train_dictionary(dict_size, train)
+            compressor = zstd.ZstdCompressor(level=level, dict_data=dict_data)
+            decompressor = zstd.ZstdDecompressor(dict_data=dict_data)
+            measure(f"zstd-dict ({len(dict_data.as_bytes())} B, held-out half)", test,
+                    compressor.compress, decompressor.decompress)
+    return results
+
+
+async def reencode(
+    batch_size: int = 200,
+    pause_seconds: float = 0.5,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+) -> Dict:
+    """Rewrite checko_data rows whose format differs from the configured codec."""
+    from sqlalchemy import text
+    target = codec.get_codec()
+    stats = {"target": target.name, "scanned": 0, "rewritten": 0, "skipped_changed": 0, "failed": 0,
+             "bytes_before": 0, "bytes_after": 0}
+    last_id = 0
+    while limit is None or stats["scanned"] < limit:
+        size = batch_size if limit is None else min(batch_size, limit - stats["scanned"])
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                text(
+                    "SELECT id, checko_data FROM moderator_suppliers "
+                    "WHERE id > :last_id AND checko_data IS NOT NULL ORDER BY id LIMIT :size"
+                ),
+                {"last_id": last_id, "size": size},
+            )
+            rows = result.fetchall()
+            if not rows:
+                break
+            for supplier_id, blob in rows:
+                last_id = supplier_id
+                stats["scanned"] += 1
+                blob = bytes(blob)
+                if codec.payload_format(blob) == target.name:
+                    continue
+                try:
+                    raw = codec.decode_payload(blob)
+                    new_blob = target.encode(raw)
+                    # Контроль: новый blob читается в тот же JSON
+                    if json.loads(codec.decode_payload(new_blob)) != json.loads(raw):
+                        raise ValueError("round trip mismatch")
+                except (ValueError, RuntimeError) as e:
+                    stats["failed"] += 1
+                    logger.warning(f"Supplier {supplier_id}: cannot re-encode checko_data: {e}")
+                    continue
+                stats["bytes_before"] += len(blob)
+                stats["bytes_after"] += len(new_blob)
+                if dry_run:
+                    stats["rewritten"] += 1
+                    continue
+                # Только если checko_data не изменились после чтения (параллельный get_checko_data)
+                updated = await db.execute(
+                    text(
+                        "UPDATE moderator_suppliers SET checko_data = :new_blob "
+                        "WHERE id = :id AND checko_data = :old_blob"
+                    ),
+                    {"new_blob": new_blob, "id": supplier_id, "old_blob": blob},
+                )
+                if updated.rowcount:
+                    stats["rewritten"] += 1
+                else:
+                    stats["skipped_changed"] += 1
+            await db.commit()
+        logger.info(f"Checko re-encode: {stats}")
+        if pause_seconds > 0:
+            await asyncio.sleep(pause_seconds)
+    return stats
+
+
+async def _main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    train = commands.add_parser("train", help="Train a zstd dictionary on stored Checko data")
+    train.add_argument("--sample", type=int, default=DEFAULT_SAMPLE)
+    train.add_argument("--dict-size", type=int, default=DEFAULT_DICT_SIZE)
+    train.add_argument("--dict-dir", default=None, help="Default: CHECKO_ZSTD_DICT_DIR")
+    run = commands.add_parser("reencode", help="Rewrite rows with the configured codec (CHECKO_CODEC)")
+    run.add_argument("--batch-size", type=int, default=200)
+    run.add_argument("--pause", type=float, default=0.5, help="Seconds between batches")
+    run.add_argument("--limit", type=int, default=None)
+    run.add_argument("--dry-run", action="store_true")
+    bench = commands.add_parser("bench", help="Compare gzip, zstd and zstd with a dictionary")
+    bench.add_argument("--sample", type=int, default=500)
+    bench.add_argument("--dict-size", type=int, default=DEFAULT_DICT_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        dict_id, path = train_dictionary(await _load_samples(args.sample), args.dict_size, args.dict_dir)
+        print(f"CHECKO_ZSTD_DICT_ID={dict_id}  ({path})")
+    elif args.command == "reencode":
+        stats = await reencode(args.batch_size, args.pause, args.limit, args.dry_run)
+        print(json.dumps(stats, indent=2))
+    else:
+        for row in benchmark_codecs(await _load_samples(args.sample), args.dict_size):
+            print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -0,0 +1,185 @@
+"""Domain-level cache of Domain Info Parser results (domain_info_cache table).
+
+The same supplier domains come back across keywords and parsing runs, and every
+/domain-parser/extract-batch used to crawl all of them again (a browser session
+of up to DOMAIN_PARSER_TIMEOUT_SEC per domain). Results are cached by normalized
+domain together with the version of the extraction logic that produced them:
+EXTRACTOR_VERSION of domain_info_parser/extractors.py plus the stop policy, so a
+change of either turns old entries into misses.
+
+Entries with INN or emails live DOMAIN_INFO_CACHE_TTL_SEC, empty results only
+DOMAIN_INFO_CACHE_NEGATIVE_TTL_SEC (sites get fixed). Results with an error are
+never cached. Cache failures are logged and treated as misses.
+"""
+from __future__ import annotations
+
+import importlib.util
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+from app.adapters.db.repositories import DomainInfoCacheRepository
+from app.adapters.db.session import AsyncSessionLocal
+from app.config import settings
+from app.services.domain_parser_worker import PARSER_DIR
+from app.utils.domains import normalize_domain
+
+logger = logging.getLogger(__name__)
+
+EXTRACTORS_SCRIPT = os.path.join(PARSER_DIR, "extractors.py")
+
+
+def load_extractor_version() -> str:
+    """EXTRACTOR_VERSION of domain_info_parser/extractors.py.
+
+    The module only depends on re/typing, so it is safe to load into the backend
+    (parser.py itself needs Playwright, which the backend venv does not have).
+    """
+    try:
+        spec = importlib.util.spec_from_file_location("_domain_info_extractors", EXTRACTORS_SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return str(module.EXTRACTOR_VERSION)
+    except Exception as e:
+        logger.warning(f"Cannot read extractor version from {EXTRACTORS_SCRIPT}: {type(e).__name__}: {e}")
+        return "unknown"
+
+
+class DomainInfoCache:
+    """Cache of per-domain parser results with hit/miss counters."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        ttl_seconds: int = 0,
+        negative_ttl_seconds: int = 0,
+        version: str = "unknown",
+    ):
+        self.enabled = bool(enabled)
+        self.ttl_seconds = max(0, int(ttl_seconds))
+        self.negative_ttl_seconds = max(0, int(negative_ttl_seconds))
+        self.version = version
+        # Counters of this process (since start)
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0  # lookups skipped because of forceRefresh
+        self.stores = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls) -> "DomainInfoCache":
+        return cls(
+            enabled=settings.DOMAIN_INFO_CACHE_ENABLED,
+            ttl_seconds=settings.DOMAIN_INFO_CACHE_TTL_SEC,
+            negative_ttl_seconds=settings.DOMAIN_INFO_CACHE_NEGATIVE_TTL_SEC,
+            version=f"{load_extractor_version()}/{settings.DOMAIN_PARSER_STOP_POLICY}",
+        )
+
+    async def get_many(self, domains: Iterable[str], force_refresh: bool = False) -> Dict[str, Dict]:
+        """Cached results by the domain as given (API result format, "cached": True)."""
+        by_key: Dict[str, List[str]] = {}
+        for domain in domains:
+            key = normalize_domain(domain)
+            if key:
+                by_key.setdefault(key, []).append(domain)
+        if not self.enabled or not by_key:
+            return {}
+        if force_refresh:
+            self.refreshes += len(by_key)
+            return {}
+
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = await DomainInfoCacheRepository(db).get_many(list(by_key), self.version)
+                await db.commit()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Domain info cache read failed: {type(e).__name__}: {e}")
+            return {}
+
+        out: Dict[str, Dict] = {}
+        for key, inn, emails_json, source_urls_json, extracted_at in rows:
+            try:
+                emails = json.loads(emails_json or "[]")
+                source_urls = json.loads(source_urls_json or "[]")
+            except ValueError:
+                continue
+            for domain in by_key.get(key, []):
+                out[domain] = {
+                    "domain": domain,
+                    "inn": inn,
+                    "emails": list(emails),
+                    "sourceUrls": list(source_urls),
+                    "error": None,
+                    "cached": True,
+                    "extractedAt": extracted_at.isoformat() if extracted_at else None,
+                }
+        hits = sum(1 for key in by_key if any(d in out for d in by_key[key]))
+        self.hits += hits
+        self.misses += len(by_key) - hits
+        return out
+
+    async def put(self, result: Dict) -> None:
+        """Store a fresh parser result (results with an error are skipped)."""
+        key = normalize_domain(result.get("domain") or "")
+        if not self.enabled or not key or result.get("error"):
+            return
+        emails = list(result.get("emails") or [])
+        has_data = bool(result.get("inn") or emails)
+        try:
+            async with AsyncSessionLocal() as db:
+                await DomainInfoCacheRepository(db).put(
+                    key,
+                    result.get("inn"),
+                    json.dumps(emails, ensure_ascii=False),
+                    json.dumps(list(result.get("sourceUrls") or []), ensure_ascii=False),
+                    self.version,
+                    self.ttl_seconds if has_data else self.negative_ttl_seconds,
+                )
+                await db.commit()
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Domain info cache write failed for {key}: {type(e).__name__}: {e}")
+
+    async def invalidate(self, domains: Iterable[str]) -> int:
+        """Drop cached results of domains (next batch crawls them again)."""
+        keys = sorted({normalize_domain(d) for d in domains} - {""})
+        async with AsyncSessionLocal() as db:
+            deleted = await DomainInfoCacheRepository(db).delete(keys)
+            await db.commit()
+        return deleted
+
+    async def stats(self) -> dict:
+        """Process counters plus table totals."""
+        lookups = self.hits + self.misses
+        out = {
+            "enabled": self.enabled,
+            "version": self.version,
+            "ttl_seconds": self.ttl_seconds,
+            "negative_ttl_seconds": self.negative_ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "refreshes": self.refreshes,
+            "stores": self.stores,
+            "errors": self.errors,
+        }
+        try:
+            async with AsyncSessionLocal() as db:
+                out["table"] = await DomainInfoCacheRepository(db).stats(self.version)
+        except Exception as e:
+            out["table"] = {"error": f"{type(e).__name__}: {e}"}
+        return out
+
+
+_cache_instance: Optional[DomainInfoCache] = None
+
+
+def get_domain_info_cache() -> DomainInfoCache:
+    """Get domain info cache instance"""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = DomainInfoCache.from_settings()
+    return _cache_instance
@@ -0,0 +1,214 @@
+"""Client for the long-lived Domain Info Parser worker (domain_info_parser/worker.py).
+
+The worker runs in the system Python (Playwright is not installed in the backend
+venv), keeps one browser open and parses up to DOMAIN_PARSER_CONCURRENCY domains
+at once. Requests and results are JSON lines over the worker's stdin/stdout and
+are matched by id, so results stream back as soon as each domain is done.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARSER_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "domain_info_parser")
+)
+WORKER_SCRIPT = os.path.join(PARSER_DIR, "worker.py")
+
+
+def _error_result(domain: str, error: str) -> Dict:
+    return {"domain": domain, "inn": None, "emails": [], "sourceUrls": [], "error": error}
+
+
+def _to_api_result(domain: str, result: Dict) -> Dict:
+    """Worker result (snake_case) -> format used by /domain-parser endpoints."""
+    return {
+        "domain": result.get("domain", domain),
+        "inn": result.get("inn"),
+        "emails": result.get("emails", []),
+        "sourceUrls": result.get("source_urls", []),
+        "error": result.get("error"),
+    }
+
+
+class DomainParserWorkerClient:
+    """Starts the worker subprocess on first use and multiplexes requests over it."""
+
+    def __init__(
+        self,
+        python_exe: str = "python",
+        concurrency: int = 4,
+        domain_timeout: float = 120.0,
+        stop_policy: str = "inn_and_email",
+        startup_timeout: float = 60.0,
+    ):
+        self.python_exe = python_exe
+        self.concurrency = max(1, int(concurrency))
+        self.domain_timeout = float(domain_timeout)
+        self.stop_policy = stop_policy
+        self.startup_timeout = float(startup_timeout)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._start_lock = asyncio.Lock()
+        # Requests in flight never exceed the worker's page pool, so the per-domain
+        # timeout does not include time spent queued inside the worker
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    @classmethod
+    def from_settings(cls) -> "DomainParserWorkerClient":
+        return cls(
+            python_exe=settings.DOMAIN_PARSER_PYTHON,
+            concurrency=settings.DOMAIN_PARSER_CONCURRENCY,
+            domain_timeout=settings.DOMAIN_PARSER_TIMEOUT_SEC,
+            stop_policy=settings.DOMAIN_PARSER_STOP_POLICY,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def _ensure_started(self) -> asyncio.subprocess.Process:
+        async with self._start_lock:
+            if self.running:
+                return self._process
+            if not os.path.exists(WORKER_SCRIPT):
+                raise Exception(f"Domain parser worker script not found: {WORKER_SCRIPT}")
+
+            logger.info(f"Starting domain parser worker: {self.python_exe} {WORKER_SCRIPT} (concurrency={self.concurrency})")
+            process = await asyncio.create_subprocess_exec(
+                self.python_exe,
+                WORKER_SCRIPT,
+                "--concurrency", str(self.concurrency),
+                # Worker's own per-domain limit is slightly lower so it answers before we give up
+                "--domain-timeout", str(max(1.0, self.domain_timeout - 5)),
+                "--stop-policy", self.stop_policy,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=PARSER_DIR,
+                limit=1024 * 1024,
+            )
+            try:
+                await asyncio.wait_for(self._wait_ready(process), timeout=self.startup_timeout)
+            except Exception as e:
+                if process.returncode is None:
+                    process.kill()
+                raise Exception(f"Domain parser worker failed to start: {type(e).__name__}: {e}")
+
+            self._process = process
+            self._reader_task = asyncio.create_task(self._read_results(process))
+            self._stderr_task = asyncio.create_task(self._drain_stderr(process))
+            logger.info(f"Domain parser worker started (pid={process.pid})")
+            return process
+
+    async def _wait_ready(self, process: asyncio.subprocess.Process) -> None:
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                stderr = (await process.stderr.read()).decode("utf-8", errors="ignore")
+                raise Exception(f"worker exited: {stderr[-500:]}")
+            try:
+                if json.loads(line).get("event") == "ready":
+                    return
+            except ValueError:
+                continue
+
+    async def _read_results(self, process: asyncio.subprocess.Process) -> None:
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Domain parser worker: bad output line {line[:200]!r}")
+                    continue
+                future = self._pending.pop(str(message.get("id")), None)
+                if future is not None and not future.done():
+                    future.set_result(message.get("result") or {})
+        finally:
+            # Worker died: fail everything still waiting, next request restarts it
+            for job_id, future in list(self._pending.items()):
+                if not future.done():
+                    future.set_exception(Exception("Domain parser worker exited"))
+                self._pending.pop(job_id, None)
+            if process.returncode is None:
+                await process.wait()
+            logger.warning(f"Domain parser worker exited with code {process.returncode}")
+
+    async def _drain_stderr(self, process: asyncio.subprocess.Process) -> None:
+        # Worker prints progress to stderr; it must be read or the pipe buffer fills up
+        while True:
+            line = await process.stderr.readline()
+            if not line:
+                break
+            logger.debug(f"[domain_info_parser] {line.decode('utf-8', errors='ignore').rstrip()}")
+
+    async def parse(self, domain: str) -> Dict:
+        """Parse one domain. Never raises: errors are returned in the "error" field."""
+        try:
+            async with self._slots:
+                process = await self._ensure_started()
+                job_id = uuid.uuid4().hex
+                future = asyncio.get_running_loop().create_future()
+                self._pending[job_id] = future
+                process.stdin.write((json.dumps({"id": job_id, "domain": domain}) + "\n").encode("utf-8"))
+                await process.stdin.drain()
+                try:
+                    result = await asyncio.wait_for(future, timeout=self.domain_timeout)
+                finally:
+                    self._pending.pop(job_id, None)
+            return _to_api_result(domain, result)
+        except asyncio.TimeoutError:
+            return _error_result(domain, f"Parser error: Domain parser timeout ({int(self.domain_timeout)}s)")
+        except Exception as e:
+            logger.error(f"Error running domain parser for {domain}: {e}")
+            return _error_result(domain, f"Parser error: {e}")
+
+    async def parse_many(self, domains: Iterable[str]) -> AsyncIterator[Dict]:
+        """Parse domains concurrently, yielding results in completion order."""
+        tasks = [asyncio.create_task(self.parse(domain)) for domain in domains]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def close(self) -> None:
+        """Stop the worker (closing stdin lets it finish in-flight domains and exit)."""
+        process = self._process
+        self._process = None
+        if process is None or process.returncode is not None:
+            return
+        try:
+            process.stdin.close()
+            await asyncio.wait_for(process.wait(), timeout=10)
+        except Exception:
+            process.kill()
+        for task in (self._reader_task, self._stderr_task):
+            if task is not None:
+                task.cancel()
+
+
+# Singleton instance (closed from app.main lifespan)
+_worker_client: Optional[DomainParserWorkerClient] = None
+
+
+def get_domain_parser_worker() -> DomainParserWorkerClient:
+    """Get domain parser worker client"""
+    global _worker_client
+    if _worker_client is None:
+        _worker_client = DomainParserWorkerClient.from_settings()
+    return _worker_client
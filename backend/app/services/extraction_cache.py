@@ -0,0 +1,232 @@
+"""Content-addressed cache of document text extraction (extract_text_best_effort).
+
+OCR of a scanned PDF takes 20-60 s on CPU-only servers, and users upload the same
+files again and again. Results are keyed by SHA-256 of the file bytes plus the
+selected engine and stored as small JSON files on disk (bounded by total size,
+least recently used files are evicted first) with an in-process LRU in front.
+
+Besides the text, the extraction method that succeeded is remembered, so even
+after the text was evicted the next extraction starts with that method instead of
+walking the whole fallback chain again.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction code changes in a way that makes old results wrong
+EXTRACTION_CACHE_VERSION = "1"
+
+
+def extraction_cache_key(content: bytes, engine: str) -> str:
+    """SHA-256 of the file bytes + engine (+ cache version)."""
+    digest = hashlib.sha256(content or b"")
+    digest.update(f"\0{engine}\0{EXTRACTION_CACHE_VERSION}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Two-level (memory LRU + bounded disk) cache of (text, method) by content key."""
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        memory_items: int = 256,
+        method_hints: int = 10000,
+        enabled: bool = True,
+    ):
+        self.directory = directory
+        self.max_bytes = max(0, int(max_bytes))
+        self.memory_items = max(0, int(memory_items))
+        self.method_hints = max(0, int(method_hints))
+        self.enabled = bool(enabled)
+        self._memory: "OrderedDict[str, tuple[str, str]]" = OrderedDict()
+        self._hints: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None  # computed lazily on first write
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted_files = 0
+
+    @classmethod
+    def from_settings(cls) -> "ExtractionCache":
+        try:
+            from app.config import settings
+
+            directory = settings.EXTRACTION_CACHE_DIR
+            max_mb = settings.EXTRACTION_CACHE_MAX_MB
+            memory_items = settings.EXTRACTION_CACHE_MEMORY_ITEMS
+            enabled = settings.EXTRACTION_CACHE_ENABLED
+        except Exception:
+            directory = os.getenv("EXTRACTION_CACHE_DIR", "")
+            max_mb = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512"))
+            memory_items = int(os.getenv("EXTRACTION_CACHE_MEMORY_ITEMS", "256"))
+            enabled = os.getenv("EXTRACTION_CACHE_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+        return cls(
+            directory=directory or os.path.join(tempfile.gettempdir(), "b2b_extraction_cache"),
+            max_bytes=int(max_mb) * 1024 * 1024,
+            memory_items=memory_items,
+            enabled=enabled,
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _remember(self, key: str, text: str, method: str) -> None:
+        # Caller holds self._lock
+        if self.memory_items:
+            self._memory[key] = (text, method)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+        if self.method_hints:
+            self._hints[key] = method
+            self._hints.move_to_end(key)
+            while len(self._hints) > self.method_hints:
+                self._hints.popitem(last=False)
+
+    def get(self, key: str) -> Optional[tuple[str, str]]:
+        """(text, method) for a content key, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return hit
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+            text, method = str(record["text"]), str(record["method"])
+            os.utime(path, None)  # mtime = last access, drives disk LRU eviction
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Extraction cache read failed for {key[:12]}: {type(e).__name__}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, text, method)
+        return text, method
+
+    def method_hint(self, key: str) -> Optional[str]:
+        """Extraction method that worked for this content before (even if the text was evicted)."""
+        with self._lock:
+            return self._hints.get(key)
+
+    def put(self, key: str, text: str, method: str) -> None:
+        """Store extracted text (empty results are not cached)."""
+        if not self.enabled or not text:
+            return
+        with self._lock:
+            self._remember(key, text, method)
+
+        path = self._path(key)
+        data = json.dumps({"text": text, "method": method, "created_at": time.time()}, ensure_ascii=False).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write-then-rename so concurrent readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Extraction cache write failed for {key[:12]}: {type(e).__name__}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(data)
+            over_limit = self.max_bytes and self._disk_bytes > self.max_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _list_files(self) -> list:
+        files = []
+        if not os.path.isdir(self.directory):
+            return files
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(".json"):
+                    try:
+                        st = entry.stat()
+                        files.append((st.st_mtime, st.st_size, entry.path))
+                    except OSError:
+                        continue
+        return files
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _mtime, size, _path in self._list_files())
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used files until the store is at 90% of max_bytes."""
+        files = sorted(self._list_files())
+        total = sum(size for _mtime, size, _path in files)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _mtime, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._disk_bytes = total
+            self.evicted_files += removed
+        if removed:
+            logger.info(f"Extraction cache: evicted {removed} files, {total} bytes left")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "directory": self.directory,
+                "max_bytes": self.max_bytes,
+                "disk_bytes": self._disk_bytes,
+                "memory_entries": len(self._memory),
+                "method_hints": len(self._hints),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evicted_files": self.evicted_files,
+            }
+
+
+_cache_instance: Optional[ExtractionCache] = None
+_cache_instance_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Get extraction cache instance"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_instance_lock:
+            if _cache_instance is None:
+                _cache_instance = ExtractionCache.from_settings()
+    return _cache_instance
@@ -0,0 +1,239 @@
+"""Worker pool consuming the durable parsing job queue (parsing_jobs table).
+
+Each backend process runs PARSING_WORKERS worker coroutines. Workers claim jobs
+with SELECT ... FOR UPDATE SKIP LOCKED, so several replicas can share the queue.
+A claimed job holds a lease (locked_until) that is extended by heartbeats while
+the job runs; jobs of a crashed worker are re-queued once their lease expires.
+
+Run standalone (without the API) with:
+    python -m app.services.parsing_queue
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from app.adapters.db.repositories import ParsingJobRepository, ParsingRunRepository
+from app.adapters.db.session import AsyncSessionLocal
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay_seconds(attempt: int, base: float) -> float:
+    """Exponential backoff for the given (1-based) attempt number."""
+    return float(base) * (2 ** max(0, attempt - 1))
+
+
+class ParsingWorkerPool:
+    """Pool of worker coroutines executing parsing jobs from parsing_jobs."""
+
+    def __init__(
+        self,
+        workers: int,
+        source_limits: dict,
+        lease_seconds: int = 120,
+        poll_seconds: float = 2.0,
+        retry_base_seconds: float = 30,
+    ):
+        self.workers = max(0, int(workers))
+        self.source_limits = dict(source_limits)
+        self.lease_seconds = max(10, int(lease_seconds))
+        self.poll_seconds = max(0.1, float(poll_seconds))
+        self.retry_base_seconds = float(retry_base_seconds)
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+        self._active_jobs: dict[str, str] = {}  # worker_id -> run_id
+
+    @classmethod
+    def from_settings(cls) -> "ParsingWorkerPool":
+        return cls(
+            workers=settings.PARSING_WORKERS,
+            source_limits={
+                "google": settings.PARSING_GOOGLE_CONCURRENCY,
+                "yandex": settings.PARSING_YANDEX_CONCURRENCY,
+            },
+            lease_seconds=settings.PARSING_JOB_LEASE_SEC,
+            poll_seconds=settings.PARSING_JOB_POLL_SEC,
+            retry_base_seconds=settings.PARSING_JOB_RETRY_BASE_SEC,
+        )
+
+    @property
+    def running(self) -> bool:
+        return any(not t.done() for t in self._tasks)
+
+    async def start(self) -> None:
+        """Start worker coroutines (no-op if already running or workers == 0)."""
+        if self.running or self.workers == 0:
+            return
+        self._stopping.clear()
+        for i in range(self.workers):
+            worker_id = f"{self.instance_id}#{i}"
+            self._tasks.append(asyncio.create_task(self._worker_loop(worker_id), name=f"parsing-worker-{i}"))
+        logger.info(f"Parsing worker pool started: workers={self.workers}, limits={self.source_limits}, id={self.instance_id}")
+
+    async def stop(self) -> None:
+        """Stop workers. Jobs in progress are cancelled and re-queued when their lease expires."""
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        logger.info("Parsing worker pool stopped")
+
+    async def stats(self) -> dict:
+        """Queue depth by status plus jobs running in this process."""
+        async with AsyncSessionLocal() as db:
+            by_status = await ParsingJobRepository(db).stats()
+        return {
+            "instance_id": self.instance_id,
+            "workers": self.workers,
+            "source_limits": self.source_limits,
+            "active_jobs": dict(self._active_jobs),
+            "jobs_by_status": by_status,
+        }
+
+    async def _worker_loop(self, worker_id: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self._reap_expired()
+                job = await self._claim(worker_id)
+                if job is None:
+                    await asyncio.sleep(self.poll_seconds)
+                    continue
+                await self._execute(worker_id, job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Parsing worker {worker_id} loop error: {e}", exc_info=True)
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _claim(self, worker_id: str):
+        async with AsyncSessionLocal() as db:
+            job = await ParsingJobRepository(db).claim(
+                worker_id=worker_id,
+                lease_seconds=self.lease_seconds,
+                source_limits=self.source_limits,
+            )
+            await db.commit()
+            return job
+
+    async def _reap_expired(self) -> None:
+        async with AsyncSessionLocal() as db:
+            reaped = await ParsingJobRepository(db).reap_expired()
+            for run_id, status in reaped:
+                logger.warning(f"Parsing job for run_id {run_id} lease expired, new status: {status}")
+                if status == "failed":
+                    await ParsingRunRepository(db).update(run_id, {
+                        "status": "failed",
+                        "error_message": "Parsing worker lease expired (worker crashed or restarted)",
+                        "finished_at": datetime.utcnow(),
+                    })
+            await db.commit()
+
+    async def _heartbeat(self, worker_id: str, job_id: int, parse: asyncio.Task) -> None:
+        """Extend the lease while `parse` runs; cancel it and return once the lease is lost."""
+        interval = self.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as db:
+                    alive = await ParsingJobRepository(db).heartbeat(job_id, worker_id, self.lease_seconds)
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for parsing job {job_id}: {e}")
+                continue
+            if not alive:
+                # Lease expired and the job was reaped (possibly claimed by another worker):
+                # stop parsing so two workers do not write the same run
+                logger.warning(f"Parsing job {job_id} lease lost by worker {worker_id}, cancelling it")
+                parse.cancel()
+                return
+
+    async def _execute(self, worker_id: str, job) -> None:
+        # Imported here to avoid a circular import (usecases -> services)
+        from app.usecases.start_parsing import run_parsing
+
+        final_attempt = job.attempts >= job.max_attempts
+        logger.info(
+            f"Worker {worker_id} claimed parsing job {job.id} (run_id={job.run_id}, "
+            f"source={job.source}, attempt {job.attempts}/{job.max_attempts})"
+        )
+        self._active_jobs[worker_id] = job.run_id
+        parse = asyncio.create_task(run_parsing(
+            run_id=job.run_id,
+            keyword=job.keyword,
+            depth=job.depth,
+            source=job.source,
+            raise_on_error=not final_attempt,
+        ))
+        heartbeat = asyncio.create_task(self._heartbeat(worker_id, job.id, parse))
+        error: Optional[Exception] = None
+        try:
+            await parse
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled():
+                # Cancelled by _heartbeat: the job is no longer ours, leave its row alone
+                return
+            parse.cancel()
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            heartbeat.cancel()
+            self._active_jobs.pop(worker_id, None)
+
+        async with AsyncSessionLocal() as db:
+            job_repo = ParsingJobRepository(db)
+            if error is None:
+                if not await job_repo.complete(job.id, worker_id):
+                    logger.warning(f"Parsing job {job.id} finished after its lease was lost by worker {worker_id}")
+            else:
+                delay = retry_delay_seconds(job.attempts, self.retry_base_seconds)
+                status = await job_repo.fail(job.id, worker_id, str(error), retry_delay_seconds=delay)
+                if status is None:
+                    logger.warning(f"Parsing job {job.id} failed after its lease was lost by worker {worker_id}: {error}")
+                else:
+                    logger.warning(f"Parsing job {job.id} attempt {job.attempts} failed ({error}); new status: {status}")
+                if status == "queued":
+                    await ParsingRunRepository(db).update(job.run_id, {
+                        "error_message": f"Attempt {job.attempts}/{job.max_attempts} failed, retrying in {int(delay)}s: {str(error)[:500]}",
+                    })
+            await db.commit()
+
+
+# Singleton instance (started from app.main lifespan)
+_pool_instance: Optional[ParsingWorkerPool] = None
+
+
+def get_parsing_worker_pool() -> ParsingWorkerPool:
+    """Get worker pool instance"""
+    global _pool_instance
+    if _pool_instance is None:
+        _pool_instance = ParsingWorkerPool.from_settings()
+    return _pool_instance
+
+
+async def _run_standalone() -> None:
+    pool = get_parsing_worker_pool()
+    if pool.workers == 0:
+        pool.workers = 1
+    await pool.start()
+    try:
+        await asyncio.gather(*pool._tasks)
+    finally:
+        await pool.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    )
+    asyncio.run(_run_standalone())
@@ -0,0 +1,158 @@
+"""Read-through cache for Groq item-name recognition (recognition_cache table).
+
+Users upload the same invoices and commercial offers again and again; every Groq
+call costs a 1-5 s round trip plus quota. Results are cached under
+SHA-256(prompt version + model + extracted text), so a new prompt or model never
+returns stale names.
+
+Entries expire after RECOGNITION_CACHE_TTL_SEC; when the table grows beyond
+RECOGNITION_CACHE_MAX_ENTRIES the least recently used entries (last_accessed_at)
+are evicted. Cache failures are logged and treated as misses: recognition never
+fails because of the cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import List, Optional
+
+from app.adapters.db.repositories import RecognitionCacheRepository
+from app.adapters.db.session import AsyncSessionLocal
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def recognition_cache_key(text: str, model: str, prompt_version: str) -> str:
+    """SHA-256 cache key of the document text for a given model and prompt version."""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, text or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class RecognitionCache:
+    """Cache of (names, usage) recognition results with hit/miss counters."""
+
+    def __init__(self, enabled: bool = True, ttl_seconds: int = 0, max_entries: int = 0, evict_every: int = 100):
+        self.enabled = bool(enabled)
+        self.ttl_seconds = max(0, int(ttl_seconds))
+        self.max_entries = max(0, int(max_entries))
+        self.evict_every = max(1, int(evict_every))
+        # Counters of this process (since start)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_settings(cls) -> "RecognitionCache":
+        return cls(
+            enabled=settings.RECOGNITION_CACHE_ENABLED,
+            ttl_seconds=settings.RECOGNITION_CACHE_TTL_SEC,
+            max_entries=settings.RECOGNITION_CACHE_MAX_ENTRIES,
+            evict_every=settings.RECOGNITION_CACHE_EVICT_EVERY,
+        )
+
+    async def get(self, text: str, model: str, prompt_version: str) -> Optional[tuple[List[str], dict]]:
+        """Cached (names, usage) for this text, or None on a miss."""
+        if not self.enabled:
+            return None
+        key = recognition_cache_key(text, model, prompt_version)
+        try:
+            # Own session: a cache error must not abort the caller's transaction
+            async with AsyncSessionLocal() as db:
+                row = await RecognitionCacheRepository(db).get(key, model, self.ttl_seconds)
+                await db.commit()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Recognition cache read failed: {type(e).__name__}: {e}")
+            return None
+
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            names = json.loads(row[0])
+            usage = json.loads(row[1]) if row[1] else {}
+        except ValueError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [str(n) for n in names], usage if isinstance(usage, dict) else {}
+
+    async def put(self, text: str, model: str, prompt_version: str, names: List[str], usage: Optional[dict]) -> None:
+        """Store a fresh recognition result (evicting old entries every evict_every stores)."""
+        if not self.enabled:
+            return
+        key = recognition_cache_key(text, model, prompt_version)
+        try:
+            async with AsyncSessionLocal() as db:
+                await RecognitionCacheRepository(db).put(
+                    key,
+                    model,
+                    json.dumps(list(names), ensure_ascii=False),
+                    json.dumps(usage, ensure_ascii=False) if usage else None,
+                )
+                await db.commit()
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Recognition cache write failed: {type(e).__name__}: {e}")
+            return
+
+        if self.stores % self.evict_every == 0:
+            await self.evict()
+
+    async def evict(self) -> dict:
+        """Drop expired and least recently used entries now."""
+        try:
+            async with AsyncSessionLocal() as db:
+                expired, evicted = await RecognitionCacheRepository(db).evict(self.ttl_seconds, self.max_entries)
+                await db.commit()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Recognition cache eviction failed: {type(e).__name__}: {e}")
+            return {"expired": 0, "evicted": 0}
+        self.expired += expired
+        self.evicted += evicted
+        if expired or evicted:
+            logger.info(f"Recognition cache eviction: expired={expired}, evicted={evicted}")
+        return {"expired": expired, "evicted": evicted}
+
+    async def stats(self) -> dict:
+        """Process counters plus table totals."""
+        lookups = self.hits + self.misses
+        out = {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "stores": self.stores,
+            "errors": self.errors,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+        try:
+            async with AsyncSessionLocal() as db:
+                out["table"] = await RecognitionCacheRepository(db).stats()
+        except Exception as e:
+            out["table"] = {"error": f"{type(e).__name__}: {e}"}
+        return out
+
+
+_cache_instance: Optional[RecognitionCache] = None
+
+
+def get_recognition_cache() -> RecognitionCache:
+    """Get recognition cache instance"""
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = RecognitionCache.from_settings()
+    return _cache_instance
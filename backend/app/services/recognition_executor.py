@@ -0,0 +1,153 @@
+"""Executor for CPU-bound document recognition (OCR, text extraction, position parsing).
+
+Recognition used to run directly on the event loop, so one scanned PDF froze every
+other request of the backend process for tens of seconds. CPU-bound steps are now
+submitted to a ProcessPoolExecutor (RECOGNITION_PROCESS_WORKERS, 0 = thread pool);
+LLM calls use async HTTP (see *_async functions in app.services.cabinet_recognition).
+
+Each user may run at most RECOGNITION_PER_USER_CONCURRENCY recognitions at once,
+and at most RECOGNITION_MAX_QUEUE recognitions may wait for a slot: beyond that
+RecognitionQueueFull is raised (HTTP 429 in the routers).
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RecognitionQueueFull(Exception):
+    """Too many recognitions are waiting; the client should retry later."""
+
+
+class RecognitionExecutor:
+    """Process pool for recognition steps with per-user limits and queue metrics."""
+
+    def __init__(self, process_workers: int = 2, per_user_concurrency: int = 1, max_queue: int = 50):
+        self.process_workers = max(0, int(process_workers))
+        self.per_user_concurrency = max(1, int(per_user_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._user_slots: Dict[int, asyncio.Semaphore] = {}
+        self._active_by_user: Dict[int, int] = {}
+        # Metrics
+        self.waiting = 0  # recognitions waiting for a per-user slot
+        self.active = 0  # recognitions holding a slot
+        self.tasks_pending = 0  # steps submitted to the pool, not finished yet
+        self.tasks_completed = 0
+        self.tasks_failed = 0
+        self.rejected = 0
+        self.slots_acquired = 0
+        self._wait_seconds_total = 0.0
+        self._run_seconds_total = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "RecognitionExecutor":
+        return cls(
+            process_workers=settings.RECOGNITION_PROCESS_WORKERS,
+            per_user_concurrency=settings.RECOGNITION_PER_USER_CONCURRENCY,
+            max_queue=settings.RECOGNITION_MAX_QUEUE,
+        )
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.process_workers == 0:
+            return None  # loop's default thread pool
+        if self._pool is None:
+            # spawn: forking a process with a running event loop and open DB connections is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Recognition process pool started: workers={self.process_workers}")
+        return self._pool
+
+    @asynccontextmanager
+    async def user_slot(self, user_id: int):
+        """Hold one of the user's recognition slots for the duration of an upload."""
+        if self.max_queue and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise RecognitionQueueFull(f"Recognition queue is full ({self.waiting} waiting)")
+        semaphore = self._user_slots.get(user_id)
+        if semaphore is None:
+            semaphore = self._user_slots[user_id] = asyncio.Semaphore(self.per_user_concurrency)
+
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self._wait_seconds_total += time.monotonic() - started
+        self.slots_acquired += 1
+
+        self.active += 1
+        self._active_by_user[user_id] = self._active_by_user.get(user_id, 0) + 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            left = self._active_by_user.get(user_id, 1) - 1
+            if left > 0:
+                self._active_by_user[user_id] = left
+            else:
+                self._active_by_user.pop(user_id, None)
+            semaphore.release()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a picklable module-level function in the pool and await its result."""
+        loop = asyncio.get_running_loop()
+        self.tasks_pending += 1
+        started = time.monotonic()
+        try:
+            result = await loop.run_in_executor(self._get_pool(), functools.partial(fn, *args, **kwargs))
+        except Exception:
+            self.tasks_failed += 1
+            raise
+        finally:
+            self.tasks_pending -= 1
+            self._run_seconds_total += time.monotonic() - started
+        self.tasks_completed += 1
+        return result
+
+    def stats(self) -> dict:
+        finished = self.tasks_completed + self.tasks_failed
+        return {
+            "process_workers": self.process_workers,
+            "per_user_concurrency": self.per_user_concurrency,
+            "max_queue": self.max_queue,
+            "waiting": self.waiting,
+            "active": self.active,
+            "active_by_user": {str(k): v for k, v in self._active_by_user.items()},
+            "tasks_pending": self.tasks_pending,
+            "tasks_completed": self.tasks_completed,
+            "tasks_failed": self.tasks_failed,
+            "rejected": self.rejected,
+            "avg_task_seconds": round(self._run_seconds_total / finished, 3) if finished else None,
+            "avg_slot_wait_seconds": round(self._wait_seconds_total / self.slots_acquired, 3)
+            if self.slots_acquired else None,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_executor_instance: Optional[RecognitionExecutor] = None
+
+
+def get_recognition_executor() -> RecognitionExecutor:
+    """Get recognition executor instance"""
+    global _executor_instance
+    if _executor_instance is None:
+        _executor_instance = RecognitionExecutor.from_settings()
+    return _executor_instance
@@ -0,0 +1,471 @@
+"""Document recognition pipeline and background recognition jobs.
+
+recognize_positions() runs the stages of position recognition for an uploaded file:
+
+    extract   - text extraction / OCR (recognition executor, extraction cache)
+    llm       - item names via Groq (recognition cache), heuristic parser as fallback
+    normalize - normalize_item_names
+    keys      - parsing keys per position (background jobs only)
+
+POST /cabinet/requests/{id}/positions/upload?mode=job runs it as a recognition job:
+the upload returns a job id at once, progress and partial results are stored in
+recognition_jobs and polled via GET /cabinet/recognition-jobs/{id}, and the names
+are written to parsing_requests.raw_keys_json when the job finishes. The job runs
+as a task of the backend process, so a client disconnect does not lose the work.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.db.repositories import RecognitionJobRepository
+from app.adapters.db.session import AsyncSessionLocal
+from app.config import settings
+from app.services.cabinet_recognition import (
+    GROQ_PROMPT_VERSION,
+    RecognitionDependencyError,
+    RecognitionEngine,
+    extract_item_names_via_groq_with_usage_async,
+    extract_parsing_keys_per_position,
+    EXTRACTION_CACHE_AVAILABLE,
+    extract_text_best_effort,
+    extract_text_uncached,
+    groq_model_name,
+    normalize_item_names,
+    parse_positions_from_text,
+    text_extraction_cache_key,
+)
+from app.services.recognition_cache import get_recognition_cache
+from app.services.recognition_executor import RecognitionQueueFull, get_recognition_executor
+
+logger = logging.getLogger(__name__)
+
+# stage -> progress (percent) when the stage starts
+STAGES = {"extract": 5, "llm": 35, "normalize": 75, "keys": 85}
+
+ProgressCallback = Callable[[str, int, Optional[dict]], Awaitable[None]]
+
+
+def _is_probably_valid_groq_key(v: str) -> bool:
+    vv = (v or "").strip()
+    if not vv:
+        return False
+    # Minimal heuristic validation to avoid using obviously broken keys.
+    if len(vv) < 20:
+        return False
+    return True
+
+
+async def resolve_groq_keys(db: AsyncSession, user_id: int) -> Dict[str, str]:
+    """Pick Groq keys: user's cabinet key first, then the platform key.
+
+    Returns:
+        {groq_key, groq_key_source, platform_key, platform_key_source}
+    """
+    groq_key = ""
+    groq_key_source = ""
+    platform_key = ""
+    platform_key_source = ""
+
+    # 1) User override key (cabinet)
+    try:
+        r = await db.execute(
+            text("SELECT groq_api_key_encrypted FROM users WHERE id = :id"),
+            {"id": int(user_id)},
+        )
+        row = r.fetchone()
+        enc = (row[0] if row else None)
+        if enc:
+            from app.utils.secrets import decrypt_user_secret
+
+            groq_key = (decrypt_user_secret(str(enc)) or "").strip()
+            if _is_probably_valid_groq_key(groq_key):
+                groq_key_source = "user_db"
+            else:
+                groq_key = ""
+    except Exception:
+        groq_key = ""
+
+    # 2) Platform key from process env
+    if not platform_key:
+        platform_key = (os.getenv("GROQ_API_KEY") or "").strip()
+        if _is_probably_valid_groq_key(platform_key):
+            platform_key_source = "env"
+        else:
+            platform_key = ""
+
+    # 3) Platform key from Settings (backend/.env)
+    if not platform_key:
+        platform_key = (getattr(settings, "GROQ_API_KEY", "") or "").strip()
+        if _is_probably_valid_groq_key(platform_key):
+            platform_key_source = "settings"
+        else:
+            platform_key = ""
+
+    # 4) Platform key from DB (latest moderator/admin)
+    if not platform_key:
+        try:
+            r = await db.execute(
+                text(
+                    "SELECT groq_api_key_encrypted FROM users "
+                    "WHERE groq_api_key_encrypted IS NOT NULL AND groq_api_key_encrypted <> '' "
+                    "AND role IN ('admin','moderator') "
+                    "ORDER BY id DESC LIMIT 1"
+                )
+            )
+            row = r.fetchone()
+            enc = (row[0] if row else None)
+            if enc:
+                from app.utils.secrets import decrypt_user_secret
+
+                platform_key = (decrypt_user_secret(str(enc)) or "").strip()
+                if _is_probably_valid_groq_key(platform_key):
+                    platform_key_source = "admin_db"
+                else:
+                    platform_key = ""
+        except Exception:
+            platform_key = ""
+            platform_key_source = ""
+
+    if not groq_key and platform_key:
+        groq_key = platform_key
+        groq_key_source = platform_key_source
+
+    return {
+        "groq_key": groq_key,
+        "groq_key_source": groq_key_source,
+        "platform_key": platform_key,
+        "platform_key_source": platform_key_source,
+    }
+
+
+async def extract_text(*, filename: str, content: bytes, engine: RecognitionEngine) -> str:
+    """Extract document text, consulting the extraction cache in this process.
+
+    Pool workers are separate processes that get recycled, so a cache inside them
+    would lose its memory tier and its counters (GET /moderator/extraction-cache/stats).
+    Only misses are sent to the recognition pool.
+    """
+    executor = get_recognition_executor()
+    if not content:
+        return ""
+    if not EXTRACTION_CACHE_AVAILABLE:
+        return await executor.run(extract_text_best_effort, filename=filename, content=content, engine=engine)
+
+    from app.services.extraction_cache import get_extraction_cache
+
+    cache = get_extraction_cache()
+    key = text_extraction_cache_key(filename, content, engine)
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        return cached[0]
+    text_content, method = await executor.run(
+        extract_text_uncached,
+        filename=filename,
+        content=content,
+        engine=engine,
+        preferred_method=cache.method_hint(key),
+    )
+    await asyncio.to_thread(cache.put, key, text_content, method)
+    return text_content
+
+
+async def recognize_positions(
+    *,
+    filename: str,
+    content: bytes,
+    engine: RecognitionEngine,
+    keys: Dict[str, str],
+    with_parsing_keys: bool = False,
+    on_progress: Optional[ProgressCallback] = None,
+) -> dict:
+    """Run the recognition stages for one file.
+
+    Returns:
+        {names, parsing_keys, groq_used, groq_key_source, groq_key_source_initial,
+         groq_error, groq_usage, groq_cache_hit, groq_attempted}
+    """
+    executor = get_recognition_executor()
+
+    async def progress(stage: str, partial: Optional[dict] = None) -> None:
+        if on_progress is not None:
+            await on_progress(stage, STAGES[stage], partial)
+
+    await progress("extract")
+    text_content = await extract_text(filename=filename, content=content, engine=engine)
+    if not text_content:
+        text_content = ""
+
+    await progress("llm", {"text_chars": len(text_content)})
+    groq_key = keys.get("groq_key") or ""
+    groq_key_source = keys.get("groq_key_source") or ""
+    platform_key = keys.get("platform_key") or ""
+    platform_key_source = keys.get("platform_key_source") or ""
+    groq_key_source_initial = groq_key_source
+    if groq_key_source:
+        logger.info(f"Groq key source: {groq_key_source}")
+
+    names: List[str] = []
+    groq_usage: dict = {}
+    groq_error = ""
+    groq_used = False
+    groq_cache_hit = False
+    groq_attempted = bool(groq_key and text_content.strip())
+    if groq_attempted:
+        recognition_cache = get_recognition_cache()
+        groq_model = groq_model_name()
+        cached = await recognition_cache.get(text_content, groq_model, GROQ_PROMPT_VERSION)
+        if cached is not None:
+            names, groq_usage = cached
+            groq_used = True
+            groq_cache_hit = True
+        else:
+            try:
+                names, groq_usage = await extract_item_names_via_groq_with_usage_async(text=text_content, api_key=groq_key)
+                groq_used = True
+            except RecognitionDependencyError as e:
+                # If user-provided key is invalid/blocked (401/403), try platform key as fallback.
+                err_text = str(e)
+                is_auth_error = ("Groq request failed: 401" in err_text) or ("Groq request failed: 403" in err_text)
+                if groq_key_source == "user_db" and platform_key and is_auth_error:
+                    try:
+                        names, groq_usage = await extract_item_names_via_groq_with_usage_async(
+                            text=text_content, api_key=platform_key
+                        )
+                        groq_used = True
+                        groq_key_source = f"{platform_key_source}_fallback"
+                    except Exception as e2:
+                        groq_error = str(e2)
+                else:
+                    groq_error = err_text
+            except Exception as e:
+                # Не RecognitionDependencyError - ошибка в нашем коде, а не у Groq: не прячем ее за эвристикой
+                logger.warning(f"Groq item-name extraction failed: {type(e).__name__}: {e}", exc_info=True)
+                groq_error = f"Failed to extract item names: {e}"
+
+            if groq_used and names:
+                # Empty answers are not cached: they are more often a glitch than a real result
+                await recognition_cache.put(text_content, groq_model, GROQ_PROMPT_VERSION, names, groq_usage)
+
+    # Without Groq (or if it failed) fall back to heuristic extraction instead of failing.
+    if not groq_used:
+        try:
+            names = await executor.run(parse_positions_from_text, text_content or "")
+        except Exception:
+            names = []
+
+    await progress("normalize", {"names": list(names or [])})
+    names = await executor.run(normalize_item_names, names or [])
+
+    parsing_keys: List[str] = []
+    if with_parsing_keys and names:
+        await progress("keys", {"names": names})
+        try:
+            parsing_keys = await executor.run(extract_parsing_keys_per_position, names)
+        except Exception as e:
+            logger.warning(f"Parsing key extraction failed: {type(e).__name__}: {e}")
+
+    return {
+        "names": names,
+        "parsing_keys": parsing_keys,
+        "groq_used": groq_used,
+        "groq_attempted": groq_attempted,
+        "groq_key_source": groq_key_source,
+        "groq_key_source_initial": groq_key_source_initial,
+        "groq_error": groq_error,
+        "groq_usage": groq_usage if isinstance(groq_usage, dict) else {},
+        "groq_cache_hit": groq_cache_hit,
+    }
+
+
+def recognition_proof_headers(outcome: dict) -> Dict[str, str]:
+    """X-Groq-* headers describing how names were recognized (no secrets)."""
+    groq_key_source = outcome.get("groq_key_source") or ""
+    groq_key_source_initial = outcome.get("groq_key_source_initial") or ""
+    groq_cache_hit = bool(outcome.get("groq_cache_hit"))
+    headers = {
+        "X-Groq-Used": "1" if outcome.get("groq_used") else "0",
+        "X-Groq-Key-Source": groq_key_source,
+        "X-Groq-Cache": ("hit" if groq_cache_hit else "miss") if outcome.get("groq_attempted") else "",
+    }
+    if groq_key_source_initial and groq_key_source_initial != groq_key_source:
+        headers["X-Groq-Key-Source-Initial"] = groq_key_source_initial
+    if outcome.get("groq_error"):
+        headers["X-Groq-Error"] = str(outcome["groq_error"])[:200]
+    # Token headers report tokens spent by this request, so none on a cache hit
+    groq_usage = outcome.get("groq_usage") or {}
+    if groq_usage and not groq_cache_hit:
+        for header, field in (
+            ("X-Groq-Total-Tokens", "total_tokens"),
+            ("X-Groq-Prompt-Tokens", "prompt_tokens"),
+            ("X-Groq-Completion-Tokens", "completion_tokens"),
+        ):
+            if groq_usage.get(field) is not None:
+                headers[header] = str(groq_usage[field])
+    return headers
+
+
+async def save_request_positions(db: AsyncSession, request_id: int, user_id: int, names: List[str]) -> bool:
+    """Store recognized names as the request's raw keys. Returns False if the request is gone."""
+    result = await db.execute(
+        text("UPDATE parsing_requests SET raw_keys_json = :raw_keys_json, updated_at = NOW() WHERE id = :id AND created_by = :uid"),
+        {"raw_keys_json": json.dumps(names, ensure_ascii=False), "id": int(request_id), "uid": int(user_id)},
+    )
+    return (result.rowcount or 0) > 0
+
+
+class RecognitionJobManager:
+    """Runs recognition jobs as background tasks, tracking state in recognition_jobs."""
+
+    def __init__(self, stale_seconds: int = 1800):
+        self.stale_seconds = max(60, int(stale_seconds))
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_settings(cls) -> "RecognitionJobManager":
+        return cls(stale_seconds=settings.RECOGNITION_JOB_STALE_SEC)
+
+    async def submit(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        request_id: int,
+        filename: str,
+        content: bytes,
+        engine: RecognitionEngine,
+    ) -> str:
+        """Create a job and start it. Raises RecognitionQueueFull if too many uploads wait."""
+        executor = get_recognition_executor()
+        if executor.max_queue and executor.waiting >= executor.max_queue:
+            executor.rejected += 1
+            raise RecognitionQueueFull(f"Recognition queue is full ({executor.waiting} waiting)")
+
+        job_id = uuid.uuid4().hex
+        await RecognitionJobRepository(db).create(
+            job_id=job_id,
+            user_id=user_id,
+            request_id=request_id,
+            filename=filename,
+            engine=engine.value,
+        )
+        await db.commit()
+
+        task = asyncio.create_task(
+            self._run(job_id, user_id, request_id, filename, content, engine),
+            name=f"recognition-job-{job_id}",
+        )
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _t: self._tasks.pop(job_id, None))
+        return job_id
+
+    async def _update(self, job_id: str, patch: dict) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                await RecognitionJobRepository(db).update(job_id, patch)
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Recognition job {job_id} state update failed: {type(e).__name__}: {e}")
+
+    async def _run(
+        self,
+        job_id: str,
+        user_id: int,
+        request_id: int,
+        filename: str,
+        content: bytes,
+        engine: RecognitionEngine,
+    ) -> None:
+        async def on_progress(stage: str, progress: int, partial: Optional[dict]) -> None:
+            patch = {"status": "running", "stage": stage, "progress": progress}
+            if partial is not None:
+                patch["partial_result_json"] = json.dumps(partial, ensure_ascii=False)
+            await self._update(job_id, patch)
+
+        try:
+            async with get_recognition_executor().user_slot(user_id):
+                await self._update(job_id, {"status": "running", "stage": "extract", "progress": 0})
+                async with AsyncSessionLocal() as db:
+                    keys = await resolve_groq_keys(db, user_id)
+                outcome = await recognize_positions(
+                    filename=filename,
+                    content=content,
+                    engine=engine,
+                    keys=keys,
+                    with_parsing_keys=True,
+                    on_progress=on_progress,
+                )
+
+            async with AsyncSessionLocal() as db:
+                saved = await save_request_positions(db, request_id, user_id, outcome["names"])
+                result = {
+                    "names": outcome["names"],
+                    "parsing_keys": outcome["parsing_keys"],
+                    "groq": recognition_proof_headers(outcome),
+                }
+                await RecognitionJobRepository(db).update(job_id, {
+                    "status": "completed" if saved else "failed",
+                    "stage": "done",
+                    "progress": 100,
+                    "result_json": json.dumps(result, ensure_ascii=False),
+                    "error": None if saved else "Request not found",
+                    "finished": True,
+                })
+                await db.commit()
+            logger.info(f"Recognition job {job_id} finished: {len(outcome['names'])} names (request {request_id})")
+        except asyncio.CancelledError:
+            await self._update(job_id, {"status": "failed", "error": "Cancelled (backend shutdown)", "finished": True})
+            raise
+        except Exception as e:
+            logger.error(f"Recognition job {job_id} failed: {type(e).__name__}: {e}", exc_info=True)
+            await self._update(job_id, {"status": "failed", "error": f"{type(e).__name__}: {e}"[:2000], "finished": True})
+
+    async def get(self, db: AsyncSession, job_id: str, user_id: int) -> Optional[dict]:
+        """Job state for its owner (None if not found)."""
+        repo = RecognitionJobRepository(db)
+        # Jobs of a backend process that died stay "running" forever otherwise
+        if await repo.fail_stale(job_id, self.stale_seconds):
+            await db.commit()
+        row = await repo.get_for_user(job_id, user_id)
+        if row is None:
+            return None
+        return {
+            "job_id": row.id,
+            "request_id": row.request_id,
+            "filename": row.filename,
+            "engine": row.engine,
+            "status": row.status,
+            "stage": row.stage,
+            "progress": row.progress,
+            "partial_result": json.loads(row.partial_result_json) if row.partial_result_json else None,
+            "result": json.loads(row.result_json) if row.result_json else None,
+            "error": row.error,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+            "finished_at": row.finished_at.isoformat() if row.finished_at else None,
+        }
+
+    async def close(self) -> None:
+        """Cancel running jobs (they are marked failed)."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_manager_instance: Optional[RecognitionJobManager] = None
+
+
+def get_recognition_job_manager() -> RecognitionJobManager:
+    """Get recognition job manager instance"""
+    global _manager_instance
+    if _manager_instance is None:
+        _manager_instance = RecognitionJobManager.from_settings()
+    return _manager_instance
@@ -14,6 +14,8 @@ from . import domain_parser
 from . import auth
 from . import cabinet
 from . import mail
+from . import recognition
+from . import search
 
 try:
     from . import comet
@@ -40,6 +42,8 @@ __all__ = [
     "auth",
     "cabinet",
     "mail",
+    "recognition",
+    "search",
 ]
 
 if comet is not None:
@@ -1,7 +1,11 @@
 """Router for blacklist."""
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
+from app.adapters.db.pagination import TOTAL_MODE_PATTERN, InvalidCursor, next_cursor, resolve_total_mode
 from app.adapters.db.session import get_db
+from app.services.blacklist_index import get_blacklist_index
 from app.transport.routers.auth import can_access_moderator_zone, get_current_user
 from app.transport.schemas.blacklist import (
     BlacklistEntryDTO,
@@ -55,19 +59,29 @@ async def debug_blacklist_endpoint(
 async def list_blacklist_endpoint(
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="nextCursor of the previous page (offset is ignored)"),
+    totalMode: Optional[str] = Query(
+        default=None, pattern=TOTAL_MODE_PATTERN, description="exact | approx | none (default: approx, none with cursor)"
+    ),
     db = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    """List blacklist entries with pagination."""
+    """List blacklist entries with offset or cursor pagination."""
     _require_moderator(current_user)
     import logging
     logger = logging.getLogger(__name__)
     
-    entries, total = await list_blacklist.execute(
-        db=db,
-        limit=limit,
-        offset=offset
-    )
+    total_mode = resolve_total_mode(totalMode, cursor)
+    try:
+        entries, total = await list_blacklist.execute(
+            db=db,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            total_mode=total_mode
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     logger.info(f"Blacklist query: found {total} total entries, returning {len(entries)} entries")
     
@@ -96,7 +110,9 @@ async def list_blacklist_endpoint(
         entries=entry_dtos,
         total=total,
         limit=limit,
-        offset=offset
+        offset=offset,
+        totalMode=total_mode,
+        nextCursor=next_cursor(entries, limit, "added_at", "domain")
     )
 
 
@@ -135,6 +151,7 @@ async def add_to_blacklist_endpoint(
         # This ensures the domain is saved even if audit log fails
         await db.flush()
         await db.commit()
+        get_blacklist_index().invalidate()
         logger.info(f"Successfully added domain to blacklist: {domain} (added_at: {entry.added_at})")
         
         # Log to audit_log AFTER commit (in a separate transaction)
@@ -196,6 +213,7 @@ async def remove_from_blacklist_endpoint(
             raise HTTPException(status_code=404, detail="Domain not found in blacklist")
         
         await db.commit()
+        get_blacklist_index().invalidate()
         logger.info(f"Successfully removed domain from blacklist: {domain}")
     except HTTPException:
         await db.rollback()
@@ -1027,25 +1027,23 @@ async def upload_cabinet_request_positions(
     request_id: int,
     file: UploadFile = FastAPIFile(...),
     engine: str = Query("auto", description="auto | structured | ocr | docling"),
+    mode: str = Query("sync", description="sync | job (return recognition job id at once)"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     from sqlalchemy import text
     from sqlalchemy.exc import DBAPIError, ProgrammingError
-    import json
     import os
     from pathlib import Path
 
-    from app.config import settings
-
-    from app.services.cabinet_recognition import (
-        RecognitionDependencyError,
-        RecognitionEngine,
-        extract_item_names_via_groq,
-        extract_item_names_via_groq_with_usage,
-        extract_text_best_effort,
-        normalize_item_names,
-        parse_positions_from_text,
+    from app.services.cabinet_recognition import RecognitionEngine
+    from app.services.recognition_executor import RecognitionQueueFull, get_recognition_executor
+    from app.services.recognition_jobs import (
+        get_recognition_job_manager,
+        recognition_proof_headers,
+        recognize_positions,
+        resolve_groq_keys,
+        save_request_positions,
     )
 
     user_id = int(current_user.get("id"))
@@ -1073,157 +1071,6 @@ async def upload_cabinet_request_positions(
     except Exception:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid engine. Use auto|structured|ocr|docling")
 
-    # Extract plain text locally (best-effort), then use Groq to extract item names.
-    text_content = extract_text_best_effort(filename=filename, content=content, engine=engine_enum)
-    if not text_content:
-        text_content = ""
-
-    # Prefer user-entered key from cabinet settings (override), then fall back to platform key.
-    groq_key = ""
-    groq_key_source = ""
-    groq_error: str = ""
-    groq_key_source_initial: str = ""
-
-    def _is_probably_valid_groq_key(v: str) -> bool:
-        vv = (v or "").strip()
-        if not vv:
-            return False
-        # Minimal heuristic validation to avoid using obviously broken keys.
-        if len(vv) < 20:
-            return False
-        return True
-
-    platform_key = ""
-    platform_key_source = ""
-
-    # 1) User override key (cabinet)
-    try:
-        r = await db.execute(
-            text("SELECT groq_api_key_encrypted FROM users WHERE id = :id"),
-            {"id": int(current_user.get("id"))},
-        )
-        row = r.fetchone()
-        enc = (row[0] if row else None)
-        if enc:
-            from app.utils.secrets import decrypt_user_secret
-
-            groq_key = (decrypt_user_secret(str(enc)) or "").strip()
-            if _is_probably_valid_groq_key(groq_key):
-                groq_key_source = "user_db"
-            else:
-                groq_key = ""
-    except Exception:
-        groq_key = ""
-
-    # 2) Platform key from process env
-    if not platform_key:
-        platform_key = (os.getenv("GROQ_API_KEY") or "").strip()
-        if _is_probably_valid_groq_key(platform_key):
-            platform_key_source = "env"
-        else:
-            platform_key = ""
-
-    # 3) Platform key from Settings (backend/.env)
-    if not platform_key:
-        platform_key = (getattr(settings, "GROQ_API_KEY", "") or "").strip()
-        if _is_probably_valid_groq_key(platform_key):
-            platform_key_source = "settings"
-        else:
-            platform_key = ""
-
-    # 4) Platform key from DB (latest moderator/admin)
-    if not platform_key:
-        try:
-            r = await db.execute(
-                text(
-                    "SELECT groq_api_key_encrypted FROM users "
-                    "WHERE groq_api_key_encrypted IS NOT NULL AND groq_api_key_encrypted <> '' "
-                    "AND role IN ('admin','moderator') "
-                    "ORDER BY id DESC LIMIT 1"
-                )
-            )
-            row = r.fetchone()
-            enc = (row[0] if row else None)
-            if enc:
-                from app.utils.secrets import decrypt_user_secret
-
-                platform_key = (decrypt_user_secret(str(enc)) or "").strip()
-                if _is_probably_valid_groq_key(platform_key):
-                    platform_key_source = "admin_db"
-                else:
-                    platform_key = ""
-        except Exception:
-            platform_key = ""
-            platform_key_source = ""
-
-    if not groq_key and platform_key:
-        groq_key = platform_key
-        groq_key_source = platform_key_source
-
-    if groq_key_source:
-        groq_key_source_initial = groq_key_source
-        logger.info(f"Groq key source: {groq_key_source}")
-    names: list[str] = []
-    groq_usage: dict = {}
-    groq_used = False
-    if groq_key and text_content.strip():
-        try:
-            names, groq_usage = extract_item_names_via_groq_with_usage(text=text_content, api_key=groq_key)
-            groq_used = True
-        except RecognitionDependencyError as e:
-            # If user-provided key is invalid/blocked (401/403), try platform key as fallback.
-            err_text = str(e)
-            is_auth_error = ("Groq request failed: 401" in err_text) or ("Groq request failed: 403" in err_text)
-            if groq_key_source == "user_db" and platform_key and is_auth_error:
-                try:
-                    names, groq_usage = extract_item_names_via_groq_with_usage(text=text_content, api_key=platform_key)
-                    groq_used = True
-                    groq_key_source = f"{platform_key_source}_fallback"
-                except Exception as e2:
-                    groq_error = str(e2)
-            else:
-                groq_error = err_text
-        except Exception as e:
-            groq_error = f"Failed to extract item names: {e}"
-
-        # If Groq failed, fall back to heuristic extraction instead of failing request.
-        if not groq_used:
-            try:
-                names = parse_positions_from_text(text_content or "")
-            except Exception:
-                names = []
-    else:
-        # Fallback: extract positions heuristically from extracted text.
-        try:
-            names = parse_positions_from_text(text_content or "")
-        except Exception:
-            names = []
-
-    # Proof headers (no secrets)
-    proof_headers = {
-        "X-Groq-Used": "1" if groq_used else "0",
-        "X-Groq-Key-Source": groq_key_source or "",
-    }
-    if groq_key_source_initial and groq_key_source_initial != (groq_key_source or ""):
-        proof_headers["X-Groq-Key-Source-Initial"] = groq_key_source_initial
-    if groq_error:
-        proof_headers["X-Groq-Error"] = (groq_error or "")[:200]
-    if isinstance(groq_usage, dict) and groq_usage:
-        tt = groq_usage.get("total_tokens")
-        pt = groq_usage.get("prompt_tokens")
-        ct = groq_usage.get("completion_tokens")
-        if tt is not None:
-            proof_headers["X-Groq-Total-Tokens"] = str(tt)
-        if pt is not None:
-            proof_headers["X-Groq-Prompt-Tokens"] = str(pt)
-        if ct is not None:
-            proof_headers["X-Groq-Completion-Tokens"] = str(ct)
-
-    if not names:
-        names = []
-
-    names = normalize_item_names(names)
-
     # Ensure request exists and belongs to user
     existing = await db.execute(
         text("SELECT id FROM parsing_requests WHERE id = :id AND created_by = :uid"),
@@ -1232,12 +1079,42 @@ async def upload_cabinet_request_positions(
     if not existing.fetchone():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
 
-    raw_keys_json = json.dumps(names, ensure_ascii=False)
+    if (mode or "sync").strip().lower() == "job":
+        # Background recognition: return job id at once, client polls /cabinet/recognition-jobs/{id}
+        try:
+            job_id = await get_recognition_job_manager().submit(
+                db,
+                user_id=user_id,
+                request_id=int(request_id),
+                filename=filename,
+                content=content,
+                engine=engine_enum,
+            )
+        except RecognitionQueueFull as e:
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"job_id": job_id, "status": "queued", "status_url": f"/cabinet/recognition-jobs/{job_id}"},
+        )
 
-    await db.execute(
-        text("UPDATE parsing_requests SET raw_keys_json = :raw_keys_json, updated_at = NOW() WHERE id = :id AND created_by = :uid"),
-        {"raw_keys_json": raw_keys_json, "id": int(request_id), "uid": user_id},
-    )
+    # CPU-bound steps run in the recognition process pool, LLM calls use async HTTP
+    try:
+        async with get_recognition_executor().user_slot(user_id):
+            groq_keys = await resolve_groq_keys(db, user_id)
+            outcome = await recognize_positions(
+                filename=filename,
+                content=content,
+                engine=engine_enum,
+                keys=groq_keys,
+            )
+    except RecognitionQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+
+    # Proof headers (no secrets)
+    proof_headers = recognition_proof_headers(outcome)
+    names = outcome["names"]
+
+    await save_request_positions(db, int(request_id), user_id, names)
     await db.commit()
 
     try:
@@ -1292,6 +1169,21 @@ async def upload_cabinet_request_positions(
         return JSONResponse(status_code=200, content=dto.dict(), headers=proof_headers)
 
 
+@router.get("/recognition-jobs/{job_id}")
+async def get_recognition_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Recognition job state: stage, progress, partial result and final result."""
+    from app.services.recognition_jobs import get_recognition_job_manager
+
+    job = await get_recognition_job_manager().get(db, job_id, int(current_user.get("id")))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recognition job not found")
+    return job
+
+
 @router.put("/requests/{request_id}", response_model=CabinetParsingRequestDTO)
 async def update_user_request(
     request_id: int,
@@ -1535,7 +1427,7 @@ async def submit_user_request(
     # Start parsing for existing request
     # Cabinet invariant: user flow always uses Google. Depth defaults to 25 if not set.
     safe_depth = int(depth or 25)
-    await start_parsing.execute(db=db, keyword=keyword, depth=safe_depth, source="google", background_tasks=None, request_id=int(request_id))
+    await start_parsing.execute(db=db, keyword=keyword, depth=safe_depth, source="google", request_id=int(request_id))
     await db.commit()
 
     try:
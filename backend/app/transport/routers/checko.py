@@ -1,13 +1,63 @@
 """Router for Checko API integration."""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.adapters.db.session import get_db
-from app.transport.schemas.checko import CheckoDataResponseDTO
+from app.adapters.checko_client import CheckoKeysExhausted, get_checko_key_pool
+from app.config import settings
+from app.services.checko_enrichment import get_checko_enrichment_service
+from app.transport.routers.auth import can_access_moderator_zone, get_current_user
+from app.transport.schemas.checko import CheckoBatchRequestDTO, CheckoDataResponseDTO
 from app.usecases import get_checko_data
 
 router = APIRouter()
 
 
+def _require_moderator(current_user: dict):
+    if not can_access_moderator_zone(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+def _job_response(job: dict) -> dict:
+    keys = [k.strip() for k in settings.CHECKO_API_KEY.split(",") if k.strip()]
+    return {**job, "apiKeys": get_checko_key_pool(keys).stats()["keys"] if keys else []}
+
+
+# Batch routes go before /checko/{inn}
+@router.post("/checko/batch", status_code=202)
+async def start_checko_batch_endpoint(
+    request: CheckoBatchRequestDTO,
+    current_user: dict = Depends(get_current_user),
+):
+    """Start batch Checko enrichment; poll progress with GET /checko/batch/{jobId}."""
+    _require_moderator(current_user)
+    try:
+        job = await get_checko_enrichment_service().start(request.inns, force_refresh=request.forceRefresh)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return _job_response(job)
+
+
+@router.get("/checko/batch/{job_id}")
+async def get_checko_batch_endpoint(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Progress of a batch Checko enrichment job."""
+    _require_moderator(current_user)
+    job = get_checko_enrichment_service().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Checko batch job not found")
+    return _job_response(job)
+
+
+@router.delete("/checko/batch/{job_id}", status_code=202)
+async def cancel_checko_batch_endpoint(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Cancel a running batch Checko enrichment job (processed INNs stay saved)."""
+    _require_moderator(current_user)
+    if not get_checko_enrichment_service().cancel(job_id):
+        raise HTTPException(status_code=404, detail="Running Checko batch job not found")
+    return {"jobId": job_id, "status": "cancelling"}
+
+
 @router.get("/checko/{inn}", response_model=CheckoDataResponseDTO)
 async def get_checko_data_endpoint(
     inn: str,
@@ -40,6 +90,13 @@ async def get_checko_data_endpoint(
     except ValueError as e:
         logger.warning(f"Invalid INN {inn}: {e}")
         raise HTTPException(status_code=400, detail=str(e))
+    except CheckoKeysExhausted as e:
+        logger.warning(f"Checko API keys are rate limited for INN {inn}: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail="Лимит запросов Checko исчерпан, повторите позже",
+            headers={"Retry-After": str(int(settings.CHECKO_KEY_COOLDOWN_SEC))},
+        )
     except RuntimeError as e:
         logger.error(f"Checko API configuration error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,5 +1,4 @@
 """Domain Parser API router."""
-import asyncio
 import logging
 import uuid
 import json
@@ -12,9 +11,12 @@ from app.adapters.db.session import get_db
 from app.transport.schemas.domain_parser import (
     DomainParserRequestDTO,
     DomainParserBatchResponseDTO,
-    DomainParserStatusResponseDTO
+    DomainParserStatusResponseDTO,
+    DomainParserCacheInvalidateDTO,
 )
 from app.usecases import get_parsing_run
+from app.services.domain_parser_worker import get_domain_parser_worker
+from app.services.domain_info_cache import get_domain_info_cache
 
 logger = logging.getLogger(__name__)
 
@@ -55,11 +57,12 @@ async def start_domain_parser_batch(
             "processed": 0,
             "total": len(domains),
             "results": [],
+            "cacheHits": 0,
             "startedAt": datetime.now().isoformat(),
         }
         
         # Start background task
-        background_tasks.add_task(_process_domain_parser_batch, parser_run_id, run_id, domains)
+        background_tasks.add_task(_process_domain_parser_batch, parser_run_id, run_id, domains, request.forceRefresh)
         
         logger.info(f"Domain parser batch started: {parser_run_id}")
         
@@ -87,11 +90,29 @@ async def get_domain_parser_status(parserRunId: str):
         status=run_data["status"],
         processed=run_data["processed"],
         total=run_data["total"],
-        results=run_data["results"]
+        results=run_data["results"],
+        cacheHits=run_data.get("cacheHits", 0),
     )
 
 
-async def _process_domain_parser_batch(parser_run_id: str, run_id: str, domains: List[str]):
+@router.get("/cache/stats")
+async def get_domain_info_cache_stats():
+    """Domain info cache: hits/misses of this process and table totals."""
+    return await get_domain_info_cache().stats()
+
+
+@router.post("/cache/invalidate")
+async def invalidate_domain_info_cache(request: DomainParserCacheInvalidateDTO):
+    """Drop cached results of domains so the next batch crawls them again."""
+    try:
+        deleted = await get_domain_info_cache().invalidate(request.domains)
+    except Exception as e:
+        logger.error(f"Error invalidating domain info cache: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    return {"deleted": deleted}
+
+
+async def _process_domain_parser_batch(parser_run_id: str, run_id: str, domains: List[str], force_refresh: bool = False):
     """Background task to process domain parser batch."""
     logger.info(f"=== PROCESSING DOMAIN PARSER BATCH ===")
     logger.info(f"Parser Run ID: {parser_run_id}")
@@ -100,30 +121,27 @@ async def _process_domain_parser_batch(parser_run_id: str, run_id: str, domains:
     results = []
     
     try:
-        for i, domain in enumerate(domains):
-            logger.info(f"Processing domain {i+1}/{len(domains)}: {domain}")
+        # Domains parsed recently (same extractor version) are answered from the cache
+        cache = get_domain_info_cache()
+        cached = await cache.get_many(domains, force_refresh=force_refresh)
+        if cached:
+            results.extend(cached[domain] for domain in domains if domain in cached)
+            _parser_runs[parser_run_id]["processed"] = len(results)
+            _parser_runs[parser_run_id]["results"] = results
+            _parser_runs[parser_run_id]["cacheHits"] = len(results)
+            logger.info(f"Domain info cache: {len(results)}/{len(domains)} domains cached, crawling {len(domains) - len(results)}")
+        
+        # Domains are parsed concurrently by the long-lived worker; results arrive as each one is done
+        worker = get_domain_parser_worker()
+        async for result in worker.parse_many([domain for domain in domains if domain not in cached]):
+            results.append(result)
+            await cache.put(result)
             
-            try:
-                result = await _run_domain_parser_for_domain(domain)
-                results.append(result)
-                
-                # Update status
-                _parser_runs[parser_run_id]["processed"] = i + 1
-                _parser_runs[parser_run_id]["results"] = results
-                
-                logger.info(f"Domain {domain} processed: INN={result.get('inn')}, Emails={result.get('emails')}")
-                
-            except Exception as e:
-                logger.error(f"Error processing domain {domain}: {e}")
-                results.append({
-                    "domain": domain,
-                    "inn": None,
-                    "emails": [],
-                    "sourceUrls": [],
-                    "error": str(e)
-                })
-                _parser_runs[parser_run_id]["processed"] = i + 1
-                _parser_runs[parser_run_id]["results"] = results
+            # Update status
+            _parser_runs[parser_run_id]["processed"] = len(results)
+            _parser_runs[parser_run_id]["results"] = results
+            
+            logger.info(f"Domain {result['domain']} processed ({len(results)}/{len(domains)}): INN={result.get('inn')}, Emails={result.get('emails')}")
         
         # Mark as completed
         _parser_runs[parser_run_id]["status"] = "completed"
@@ -167,141 +185,6 @@ async def _process_domain_parser_batch(parser_run_id: str, run_id: str, domains:
         _parser_runs[parser_run_id]["error"] = str(e)
 
 
-async def _run_domain_parser_for_domain(domain: str) -> Dict:
-    """Run domain parser for a single domain."""
-    import os
-    
-    # Path to domain_info_parser
-    parser_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "domain_info_parser")
-    parser_script = os.path.join(parser_dir, "parser.py")
-    
-    if not os.path.exists(parser_script):
-        raise Exception(f"Domain parser script not found: {parser_script}")
-    
-    # Use system Python (not venv) because Playwright is installed globally
-    # Backend venv doesn't have Playwright
-    python_exe = "python"  # Use system Python
-    
-    logger.info(f"Running domain parser for: {domain}")
-    logger.info(f"Python: {python_exe} (system)")
-    logger.info(f"Script: {parser_script}")
-    
-    try:
-        # Create a temporary Python script to run the parser
-        import tempfile
-        script_content = f"""
-import sys
-import asyncio
-import json
-
-# Add parser directory to path
-sys.path.insert(0, r'{parser_dir}')
-
-async def main():
-    try:
-        from parser import DomainInfoParser
-        
-        parser = DomainInfoParser(headless=True, timeout=15000)
-        await parser.start()
-        try:
-            result = await parser.parse_domain('{domain}')
-            print('RESULT_START')
-            print(json.dumps(result, ensure_ascii=False))
-            print('RESULT_END')
-        finally:
-            await parser.close()
-    except Exception as e:
-        print('RESULT_START')
-        print(json.dumps({{"domain": "{domain}", "inn": None, "emails": [], "source_urls": [], "error": str(e)}}))
-        print('RESULT_END')
-        raise
-
-if __name__ == "__main__":
-    asyncio.run(main())
-"""
-        
-        # Write script to temp file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as f:
-            f.write(script_content)
-            temp_script = f.name
-        
-        try:
-            # Run parser as subprocess using the temp script
-            process = await asyncio.create_subprocess_exec(
-                python_exe,
-                temp_script,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=parser_dir
-            )
-            
-            # Wait for completion with timeout
-            try:
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=120.0)
-            except asyncio.TimeoutError:
-                process.kill()
-                raise Exception("Domain parser timeout (120s)")
-            
-            # Decode output
-            try:
-                stdout_text = stdout.decode('utf-8')
-            except UnicodeDecodeError:
-                stdout_text = stdout.decode('cp1251', errors='ignore')
-            
-            try:
-                stderr_text = stderr.decode('utf-8')
-            except UnicodeDecodeError:
-                stderr_text = stderr.decode('cp1251', errors='ignore')
-            
-            logger.info(f"Domain parser for {domain}:")
-            logger.info(f"  - stdout length: {len(stdout_text)}")
-            logger.info(f"  - stderr length: {len(stderr_text)}")
-            
-            if stderr_text:
-                logger.warning(f"Domain parser stderr for {domain}:")
-                logger.warning(stderr_text)
-            
-            # Extract result from output
-            if 'RESULT_START' in stdout_text and 'RESULT_END' in stdout_text:
-                result_start = stdout_text.index('RESULT_START') + len('RESULT_START')
-                result_end = stdout_text.index('RESULT_END')
-                result_json = stdout_text[result_start:result_end].strip()
-                
-                logger.info(f"Extracted JSON for {domain}: {result_json[:200]}")
-                
-                result = json.loads(result_json)
-                
-                return {
-                    "domain": result.get("domain", domain),
-                    "inn": result.get("inn"),
-                    "emails": result.get("emails", []),
-                    "sourceUrls": result.get("source_urls", []),
-                    "error": result.get("error")
-                }
-            else:
-                error_msg = f"No result markers found. stdout: {stdout_text[:500]}, stderr: {stderr_text[:500]}"
-                logger.error(f"Parser output error for {domain}: {error_msg}")
-                raise Exception(error_msg)
-        finally:
-            # Clean up temp file
-            import os
-            try:
-                os.unlink(temp_script)
-            except:
-                pass
-        
-    except Exception as e:
-        error_details = str(e)
-        logger.error(f"Error running domain parser for {domain}: {error_details}")
-        return {
-            "domain": domain,
-            "inn": None,
-            "emails": [],
-            "sourceUrls": [],
-            "error": f"Parser error: {error_details}"
-        }
-
-
 async def _save_parser_results_to_db(run_id: str, parser_run_id: str, results: List[Dict]):
     """Save domain parser results to parsing run's process_log."""
     try:
@@ -3,6 +3,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.adapters.db.pagination import TOTAL_MODE_PATTERN, InvalidCursor, next_cursor, resolve_total_mode
 from app.adapters.db.session import get_db
 from app.transport.schemas.domain import (
     DomainQueueEntryDTO,
@@ -23,9 +24,13 @@ async def list_domains_queue_endpoint(
     status: Optional[str] = Query(default=None),
     keyword: Optional[str] = Query(default=None),
     parsingRunId: Optional[str] = Query(default=None),
+    cursor: Optional[str] = Query(default=None, description="nextCursor of the previous page (offset is ignored)"),
+    totalMode: Optional[str] = Query(
+        default=None, pattern=TOTAL_MODE_PATTERN, description="exact | approx | none (default: approx, none with cursor)"
+    ),
     db: AsyncSession = Depends(get_db)
 ):
-    """List domains queue entries with pagination."""
+    """List domains queue entries with offset or cursor pagination."""
     import logging
     logger = logging.getLogger(__name__)
     
@@ -46,14 +51,20 @@ async def list_domains_queue_endpoint(
     if parsingRunId:
         logger.info(f"DEBUG: parsingRunId value: '{parsingRunId}' (type: {type(parsingRunId)}, len: {len(parsingRunId)})")
     
-    entries, total = await list_domains_queue.execute(
-        db=db,
-        limit=limit,
-        offset=offset,
-        status=status,
-        keyword=keyword,
-        parsing_run_id=parsingRunId  # Pass parsingRunId as parsing_run_id
-    )
+    total_mode = resolve_total_mode(totalMode, cursor)
+    try:
+        entries, total = await list_domains_queue.execute(
+            db=db,
+            limit=limit,
+            offset=offset,
+            status=status,
+            keyword=keyword,
+            parsing_run_id=parsingRunId,  # Pass parsingRunId as parsing_run_id
+            cursor=cursor,
+            total_mode=total_mode
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     logger.info(f"list_domains_queue_endpoint returning {len(entries)} entries, total={total}")
     
@@ -84,7 +95,9 @@ async def list_domains_queue_endpoint(
         entries=dto_entries,
         total=total,
         limit=limit,
-        offset=offset
+        offset=offset,
+        totalMode=total_mode,
+        nextCursor=next_cursor(entries, limit, "created_at", "id")
     )
 
 
@@ -2,8 +2,9 @@
 import logging
 from typing import Optional
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
+from app.adapters.db.pagination import TOTAL_MODE_PATTERN, InvalidCursor, next_cursor, resolve_total_mode
 from app.adapters.db.session import get_db
 from app.transport.routers.auth import can_access_moderator_zone, get_current_user
 from app.transport.schemas.moderator_suppliers import (
@@ -140,19 +141,34 @@ async def list_suppliers(
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
     supplier_type: Optional[str] = Query(default=None, alias="type"),
+    cursor: Optional[str] = Query(default=None, description="nextCursor of the previous page (offset is ignored)"),
+    totalMode: Optional[str] = Query(
+        default=None, pattern=TOTAL_MODE_PATTERN, description="exact | approx | none (default: approx, none with cursor)"
+    ),
     db = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    """List suppliers with pagination."""
+    """List suppliers with offset or cursor pagination.
+    
+    Rows are column projections without checko_data (hasCheckoData only);
+    Checko data is fetched per supplier from /suppliers/{id}/checko-data.
+    """
     _require_moderator(current_user)
-    suppliers, total = await list_moderator_suppliers.execute(
-        db=db,
-        limit=limit,
-        offset=offset,
-        type_filter=supplier_type
-    )
+    total_mode = resolve_total_mode(totalMode, cursor)
+    try:
+        suppliers, total = await list_moderator_suppliers.execute(
+            db=db,
+            limit=limit,
+            offset=offset,
+            type_filter=supplier_type,
+            cursor=cursor,
+            total_mode=total_mode,
+            summary=True
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Convert suppliers to DTOs, handling date fields
+    # Convert supplier rows to DTOs, handling date fields
     supplier_dtos = []
     for s in suppliers:
         # Convert date fields to strings before validation
@@ -189,17 +205,10 @@ async def list_suppliers(
             'legal_cases_sum': s.legal_cases_sum,
             'legal_cases_as_plaintiff': s.legal_cases_as_plaintiff,
             'legal_cases_as_defendant': s.legal_cases_as_defendant,
-            'checko_data': s.checko_data,
+            'has_checko_data': s.has_checko_data,
             'created_at': s.created_at,
             'updated_at': s.updated_at,
         }
-        # Decompress checko_data if it's compressed bytes
-        from app.utils.checko_compression import decompress_checko_data_to_string
-        if supplier_dict.get("checko_data") and isinstance(supplier_dict["checko_data"], bytes):
-            try:
-                supplier_dict["checko_data"] = decompress_checko_data_to_string(supplier_dict["checko_data"])
-            except ValueError:
-                supplier_dict["checko_data"] = None
         
         supplier_dtos.append(ModeratorSupplierDTO.model_validate(supplier_dict, from_attributes=False))
     
@@ -207,7 +216,9 @@ async def list_suppliers(
         suppliers=supplier_dtos,
         total=total,
         limit=limit,
-        offset=offset
+        offset=offset,
+        totalMode=total_mode,
+        nextCursor=next_cursor(suppliers, limit, "created_at", "id")
     )
 
 
@@ -223,6 +234,9 @@ async def get_supplier(
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
     
+    # Same flag as in the list, so the supplier card knows whether to fetch /checko-data
+    supplier.has_checko_data = supplier.checko_data is not None
+    
     # Decompress checko_data if it's compressed bytes or memoryview
     from app.utils.checko_compression import decompress_checko_data_to_string
     if supplier.checko_data:
@@ -241,6 +255,56 @@ async def get_supplier(
     return ModeratorSupplierDTO.model_validate(supplier, from_attributes=True)
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+@router.get("/suppliers/{supplier_id}/checko-data")
+async def get_supplier_checko_data(
+    supplier_id: int,
+    request: Request,
+    db = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Full Checko data of a supplier (JSON), fetched lazily by the supplier card.
+    
+    ETag is the md5 of the stored blob, computed in the DB: a matching
+    If-None-Match gets 304 without reading or decompressing checko_data.
+    """
+    _require_moderator(current_user)
+    from app.adapters.db.repositories import ModeratorSupplierRepository
+    from app.utils.checko_compression import decompress_checko_data_to_string
+    
+    repo = ModeratorSupplierRepository(db)
+    digest = await repo.get_checko_data_digest(supplier_id)
+    if digest is None:
+        raise HTTPException(status_code=404, detail="Supplier not found")
+    if not digest["md5"]:
+        raise HTTPException(status_code=404, detail="Checko data not found")
+    
+    etag = f'"{digest["md5"]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    blob = await repo.get_checko_data_blob(supplier_id)
+    if blob is None:
+        # Удалены между запросами
+        raise HTTPException(status_code=404, detail="Checko data not found")
+    if isinstance(blob, bytes):
+        try:
+            content = decompress_checko_data_to_string(blob)
+        except ValueError as e:
+            logger.warning(f"Failed to decompress checko_data for supplier {supplier_id}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to decompress Checko data")
+    else:
+        content = blob
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
 @router.post("/suppliers", response_model=ModeratorSupplierDTO, status_code=201)
 async def create_supplier(
     request: CreateModeratorSupplierRequestDTO,
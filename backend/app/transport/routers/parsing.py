@@ -1,7 +1,7 @@
 """Router for parsing operations."""
-from fastapi import APIRouter, Depends, BackgroundTasks, Body, HTTPException
+from fastapi import APIRouter, Depends, Body, HTTPException, Query
 from fastapi.responses import JSONResponse
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from app.adapters.db.session import get_db
 from app.transport.schemas.parsing import (
@@ -19,10 +19,9 @@ router = APIRouter()
 @router.post("/start", status_code=201)
 async def start_parsing_endpoint(
     request: StartParsingRequestDTO,
-    background_tasks: BackgroundTasks,
     db = Depends(get_db)
 ):
-    """Start parsing for a keyword."""
+    """Start parsing for a keyword (enqueues a job for the parsing worker pool)."""
     # Validate source
     valid_sources = ["google", "yandex", "both"]
     source = request.source.lower() if request.source else "google"
@@ -34,7 +33,6 @@ async def start_parsing_endpoint(
         keyword=request.keyword,
         depth=request.depth,
         source=source,
-        background_tasks=background_tasks
     )
     await db.commit()
     
@@ -50,6 +48,31 @@ async def start_parsing_endpoint(
     )
 
 
+@router.get("/queue/stats")
+async def get_parsing_queue_stats_endpoint():
+    """Get parsing job queue depth and worker pool state."""
+    from app.services.parsing_queue import get_parsing_worker_pool
+
+    return await get_parsing_worker_pool().stats()
+
+
+@router.get("/blacklist-index")
+async def get_blacklist_index_endpoint(
+    version: Optional[int] = Query(default=None, description="Version the caller already has"),
+):
+    """Blacklisted domains for Parser Service (skips their URLs at collection time).
+    
+    Returns {"version", "changed": false} when the caller's version is current.
+    """
+    from app.services.blacklist_index import get_blacklist_index
+
+    index = get_blacklist_index()
+    await index.ensure_fresh()
+    if version is not None and index.version is not None and version == index.version:
+        return {"version": index.version, "changed": False}
+    return {**index.export(), "changed": True}
+
+
 @router.put("/status/{run_id}")
 async def update_parsing_status_endpoint(
     run_id: str,
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request, Body
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
+from app.adapters.db.pagination import TOTAL_MODE_PATTERN, InvalidCursor, next_cursor, resolve_total_mode
 from app.adapters.db.session import get_db
 from app.transport.schemas.parsing import (
     ParsingRunDTO,
@@ -43,9 +44,13 @@ async def list_parsing_runs_endpoint(
     keyword: Optional[str] = Query(default=None),
     sort: Optional[str] = Query(default="created_at"),
     order: Optional[str] = Query(default="desc"),
+    cursor: Optional[str] = Query(default=None, description="nextCursor of the previous page (offset is ignored)"),
+    totalMode: Optional[str] = Query(
+        default=None, pattern=TOTAL_MODE_PATTERN, description="exact | approx | none (default: approx, none with cursor)"
+    ),
     db = Depends(get_db)
 ):
-    """List parsing runs with pagination, filtering, and sorting."""
+    """List parsing runs with pagination (offset, or cursor for sort=created_at), filtering, and sorting."""
     import json
     import logging
     
@@ -59,15 +64,29 @@ async def list_parsing_runs_endpoint(
     if order not in ["asc", "desc"]:
         order = "desc"
     
-    runs, total = await list_parsing_runs.execute(
-        db=db,
-        limit=limit,
-        offset=offset,
-        status=status,
-        keyword=keyword,
-        sort_by=sort,
-        sort_order=order
-    )
+    total_mode = resolve_total_mode(totalMode, cursor)
+    try:
+        runs, total = await list_parsing_runs.execute(
+            db=db,
+            limit=limit,
+            offset=offset,
+            status=status,
+            keyword=keyword,
+            sort_by=sort,
+            sort_order=order,
+            cursor=cursor,
+            total_mode=total_mode
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Results of all runs on the page: one grouped query instead of a COUNT per run
+    from app.adapters.db.repositories import DomainQueueRepository
+    try:
+        counts_by_run = await DomainQueueRepository(db).result_counts([run.run_id for run in runs])
+    except Exception as e:
+        logger.warning(f"Failed to count parsing run results: {e}")
+        counts_by_run = {}
     
     # Convert runs to DTOs, extracting keyword from request
     run_dtos = []
@@ -92,19 +111,8 @@ async def list_parsing_runs_endpoint(
             elif getattr(run, "keyword", None):
                 keyword = str(run.keyword)
             
-            # CRITICAL FIX: Always calculate results_count from domains_queue
-            # This completely avoids AttributeError by never accessing the model attribute
-            from app.adapters.db.repositories import DomainQueueRepository
-            domain_queue_repo = DomainQueueRepository(db)
-            try:
-                _, count = await domain_queue_repo.list(
-                    limit=1,
-                    offset=0,
-                    parsing_run_id=run.run_id
-                )
-                results_count = count if count > 0 else None
-            except Exception:
-                results_count = None
+            # results_count is always calculated from domains_queue (the model column is not maintained)
+            counts = counts_by_run.get(run.run_id)
             
             # Create DTO with extracted keyword
             run_dict = {
@@ -114,7 +122,9 @@ async def list_parsing_runs_endpoint(
                 "startedAt": run.started_at.isoformat() if run.started_at else None,
                 "finishedAt": run.finished_at.isoformat() if run.finished_at else None,
                 "error": run.error_message,
-                "resultsCount": results_count,
+                "resultsCount": counts["total"] if counts else None,
+                "resultsBySource": counts["by_source"] if counts else None,
+                "resultsByStatus": counts["by_status"] if counts else None,
                 "createdAt": run.created_at.isoformat() if run.created_at else None,
                 "depth": run.depth,
             }
@@ -129,7 +139,11 @@ async def list_parsing_runs_endpoint(
         "runs": [r.model_dump(by_alias=True, mode="json") for r in run_dtos],
         "total": total,
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "totalMode": total_mode,
+        # Legacy-schema rows (SimpleNamespace) have no id: no cursor for them
+        "nextCursor": next_cursor(runs, limit, "created_at", "id")
+        if sort == "created_at" and runs and hasattr(runs[-1], "id") else None,
     }
     return JSONResponse(content=response_data)
 
@@ -171,7 +185,10 @@ async def update_parsing_logs_endpoint(
     request_data: Dict[str, Any] = Body(default={}),
     db = Depends(get_db)
 ):
-    """Update parsing logs for a specific run ID (incremental updates during parsing)."""
+    """Replace parsing logs for a run with a full snapshot.
+    
+    Used by old parser versions and as the fallback when a delta (PATCH) is rejected.
+    """
     import logging
     import json
     from fastapi import HTTPException
@@ -179,11 +196,6 @@ async def update_parsing_logs_endpoint(
     
     logger = logging.getLogger(__name__)
     
-    # Get parsing run to check if it exists
-    run = await get_parsing_run.execute(db=db, run_id=run_id)
-    if not run:
-        raise HTTPException(status_code=404, detail="Parsing run not found")
-    
     # Get parsing_logs from request
     if isinstance(request_data, dict):
         parsing_logs = request_data.get("parsing_logs", {})
@@ -207,34 +219,154 @@ async def update_parsing_logs_endpoint(
         links_by_page_count = len(engine_logs.get("links_by_page", {}))
         logger.info(f"  {engine_name}: total_links={total_links}, pages_processed={pages_processed}, last_links_count={last_links_count}, pages_with_links={links_by_page_count}")
     
-    # Update process_log with parsing_logs
-    # Get existing process_log or create new one
-    process_log = getattr(run, 'process_log', None)
-    existing_process_log = process_log if process_log and isinstance(process_log, dict) else {}
+    # Replace only process_log.parsing_logs (and the delta sequence keys), keep other fields
+    seq = request_data.get("seq") if isinstance(request_data, dict) else None
+    epoch = request_data.get("epoch") if isinstance(request_data, dict) else None
+    try:
+        result = await db.execute(
+            text("""
+                UPDATE parsing_runs
+                SET process_log = COALESCE(process_log, '{}'::jsonb) || jsonb_build_object(
+                    'parsing_logs', CAST(:parsing_logs AS jsonb),
+                    'parsing_logs_seq', CAST(:seq AS integer),
+                    'parsing_logs_base_seq', CAST(NULL AS integer),
+                    'parsing_logs_epoch', CAST(:epoch AS text)
+                )
+                WHERE run_id = :run_id
+                RETURNING run_id
+            """),
+            {
+                "parsing_logs": logs_json,
+                "seq": int(seq or 0),
+                "epoch": str(epoch) if epoch else None,
+                "run_id": run_id
+            }
+        )
+        if result.first() is None:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail="Parsing run not found")
+        await db.commit()
+        logger.info(f"Successfully updated parsing logs for run_id: {run_id}, size: {logs_size} bytes")
+        return {"status": "updated", "run_id": run_id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating parsing logs for run_id {run_id}: {e}", exc_info=True)
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error updating parsing logs: {str(e)}")
+
+
+_LAST_LINKS_LIMIT = 20
+
+
+def _merge_parsing_logs_delta(parsing_logs: Dict[str, Any], engines_delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply per-engine increments (see parser_service ParsingStats.delta) to stored parsing_logs."""
+    merged = dict(parsing_logs or {})
+    for engine_name, delta in (engines_delta or {}).items():
+        engine_logs = dict(merged.get(engine_name) or {})
+        links_by_page = dict(engine_logs.get("links_by_page") or {})
+        for page, inc in (delta.get("links_by_page_inc") or {}).items():
+            key = str(page)
+            links_by_page[key] = int(links_by_page.get(key, 0)) + int(inc)
+        last_links = list(engine_logs.get("last_links") or []) + list(delta.get("new_links") or [])
+        engine_logs["links_by_page"] = links_by_page
+        engine_logs["total_links"] = int(engine_logs.get("total_links", 0)) + int(delta.get("total_links_inc", 0))
+        engine_logs["last_links"] = last_links[-_LAST_LINKS_LIMIT:]
+        engine_logs["pages_processed"] = max(int(engine_logs.get("pages_processed", 0)), int(delta.get("pages_processed", 0)))
+        merged[engine_name] = engine_logs
+    return merged
+
+
+@router.patch("/runs/{run_id}/logs")
+async def patch_parsing_logs_endpoint(
+    run_id: str,
+    request_data: Dict[str, Any] = Body(default={}),
+    db = Depends(get_db)
+):
+    """Apply a parsing logs delta: {"epoch", "base_seq", "seq", "engines": {engine: increments}}.
+    
+    epoch identifies one parse (ParsingStats) of the run: a retry under the same
+    run_id starts again at seq 1 with a new epoch. A delta is applied only on top
+    of the state it was built against (same epoch, stored seq == base_seq); a
+    repeated delta (same epoch, base_seq and seq as the last applied one) is
+    acknowledged without applying. Otherwise 409 is returned and the parser
+    resends a full snapshot via PUT, which also records its epoch.
+    Only the small parsing_logs sub-document is read and rewritten.
+    """
+    import logging
     
-    # Update only parsing_logs in process_log, keep other fields
-    existing_process_log["parsing_logs"] = parsing_logs
+    logger = logging.getLogger(__name__)
+    
+    try:
+        base_seq = int(request_data.get("base_seq", 0))
+        seq = int(request_data.get("seq", base_seq + 1))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="base_seq and seq must be integers")
+    epoch = request_data.get("epoch")
+    epoch = str(epoch) if epoch else None
+    engines_delta = request_data.get("engines") or {}
     
-    # Update in database
     try:
-        process_log_json = json.dumps(existing_process_log, ensure_ascii=False)
-        final_size = len(process_log_json)
+        row = (await db.execute(
+            text("""
+                SELECT process_log->'parsing_logs' AS parsing_logs,
+                       COALESCE((process_log->>'parsing_logs_seq')::integer, 0) AS seq,
+                       (process_log->>'parsing_logs_base_seq')::integer AS base_seq,
+                       process_log->>'parsing_logs_epoch' AS epoch
+                FROM parsing_runs
+                WHERE run_id = :run_id
+                FOR UPDATE
+            """),
+            {"run_id": run_id}
+        )).first()
+        if row is None:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail="Parsing run not found")
+        fresh = row.parsing_logs is None and row.seq == 0 and base_seq == 0
+        if row.epoch != epoch and not fresh:
+            # Другой запуск парсера под тем же run_id (retry): нужен полный снимок
+            await db.rollback()
+            return JSONResponse(
+                status_code=409,
+                content={"detail": "Parsing logs epoch mismatch", "seq": row.seq},
+            )
+        if row.seq == seq and row.base_seq == base_seq:
+            await db.rollback()
+            return {"status": "duplicate", "run_id": run_id, "seq": seq}
+        if row.seq != base_seq:
+            await db.rollback()
+            return JSONResponse(
+                status_code=409,
+                content={"detail": "Parsing logs sequence mismatch", "seq": row.seq},
+            )
+        
+        merged = _merge_parsing_logs_delta(row.parsing_logs or {}, engines_delta)
         await db.execute(
             text("""
-                UPDATE parsing_runs 
-                SET process_log = CAST(:process_log AS jsonb)
+                UPDATE parsing_runs
+                SET process_log = COALESCE(process_log, '{}'::jsonb) || jsonb_build_object(
+                    'parsing_logs', CAST(:parsing_logs AS jsonb),
+                    'parsing_logs_seq', CAST(:seq AS integer),
+                    'parsing_logs_base_seq', CAST(:base_seq AS integer),
+                    'parsing_logs_epoch', CAST(:epoch AS text)
+                )
                 WHERE run_id = :run_id
             """),
             {
-                "process_log": process_log_json,
+                "parsing_logs": json.dumps(merged, ensure_ascii=False),
+                "seq": seq,
+                "base_seq": base_seq,
+                "epoch": epoch,
                 "run_id": run_id
             }
         )
         await db.commit()
-        logger.info(f"Successfully updated parsing logs for run_id: {run_id}, final process_log size: {final_size} bytes")
-        return {"status": "updated", "run_id": run_id}
+        logger.debug(f"Applied parsing logs delta seq={seq} for run_id: {run_id}")
+        return {"status": "updated", "run_id": run_id, "seq": seq}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error updating parsing logs for run_id {run_id}: {e}", exc_info=True)
+        logger.error(f"Error applying parsing logs delta for run_id {run_id}: {e}", exc_info=True)
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating parsing logs: {str(e)}")
 
@@ -313,12 +445,8 @@ async def get_parsing_run_endpoint(
         # CRITICAL FIX: Always calculate results_count from domains_queue
         # This completely avoids AttributeError by never accessing the model attribute
         from app.adapters.db.repositories import DomainQueueRepository
-        domain_queue_repo = DomainQueueRepository(db)
-        _, count = await domain_queue_repo.list(
-            limit=1,
-            offset=0,
-            parsing_run_id=run_id
-        )
+        counts = (await DomainQueueRepository(db).result_counts([run_id])).get(run_id)
+        count = counts["total"] if counts else 0
         results_count = count if count > 0 else None
         from datetime import datetime
         _agent_debug_log({
@@ -346,6 +474,8 @@ async def get_parsing_run_endpoint(
             "finishedAt": finished_at.isoformat() if finished_at else None,
             "error": getattr(run, 'error_message', None),
             "resultsCount": results_count,
+            "resultsBySource": counts["by_source"] if counts else None,
+            "resultsByStatus": counts["by_status"] if counts else None,
             "createdAt": created_at.isoformat() if created_at else None,
             "depth": getattr(run, 'depth', None),
             "source": getattr(run, 'source', None),
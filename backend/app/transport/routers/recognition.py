@@ -0,0 +1,58 @@
+"""Router for document recognition administration (moderator zone)."""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.transport.routers.auth import can_access_moderator_zone, get_current_user
+from app.config import settings
+
+router = APIRouter()
+
+
+def _require_moderator(current_user: dict):
+    # Dev-only relaxation to allow local testing without strict email-based moderator checks
+    if str(getattr(settings, "ENV", "")).lower() == "development":
+        return
+    role = str(current_user.get("role") or "")
+    username = str(current_user.get("username") or "")
+    if role in {"admin", "moderator"}:
+        return
+    if username == "admin":
+        return
+    if not can_access_moderator_zone(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+@router.get("/recognition-cache/stats")
+async def get_recognition_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Recognition cache hit/miss counters (this process) and table size."""
+    _require_moderator(current_user)
+    from app.services.recognition_cache import get_recognition_cache
+
+    return await get_recognition_cache().stats()
+
+
+@router.post("/recognition-cache/evict")
+async def evict_recognition_cache(current_user: dict = Depends(get_current_user)):
+    """Drop expired and least recently used cache entries now."""
+    _require_moderator(current_user)
+    from app.services.recognition_cache import get_recognition_cache
+
+    return await get_recognition_cache().evict()
+
+
+@router.get("/extraction-cache/stats")
+async def get_extraction_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Text extraction cache (file hash -> text) counters and disk usage."""
+    _require_moderator(current_user)
+    from app.services.extraction_cache import get_extraction_cache
+
+    return get_extraction_cache().stats()
+
+
+@router.get("/recognition-executor/stats")
+async def get_recognition_executor_stats(current_user: dict = Depends(get_current_user)):
+    """Recognition process pool: queue depth, active uploads per user, task timings."""
+    _require_moderator(current_user)
+    from app.services.recognition_executor import get_recognition_executor
+
+    return get_recognition_executor().stats()
@@ -0,0 +1,63 @@
+"""Router for unified search over keywords, domains and parsing requests."""
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.adapters.db.repositories import SearchRepository
+from app.adapters.db.session import get_db
+from app.transport.routers.auth import can_access_moderator_zone, get_current_user
+from app.transport.schemas.search import SearchResponseDTO
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+SEARCH_TYPES = ("keywords", "queueKeywords", "domains", "requests")
+
+
+def _require_moderator(current_user: dict):
+    if not can_access_moderator_zone(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+@router.get("/search", response_model=SearchResponseDTO)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = Query(
+        default=None, description=f"Comma-separated subset of: {', '.join(SEARCH_TYPES)} (default: all)"
+    ),
+    limit: int = Query(default=10, ge=1, le=50, description="Max hits per type"),
+    db=Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Ranked prefix and substring search (exact > prefix > substring, then trigram similarity).
+
+    Queries of 3+ characters match substrings via the pg_trgm indexes of migration 023,
+    shorter ones match prefixes only.
+    """
+    _require_moderator(current_user)
+    query = q.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="Empty query")
+
+    requested = [t.strip() for t in types.split(",") if t.strip()] if types else list(SEARCH_TYPES)
+    unknown = [t for t in requested if t not in SEARCH_TYPES]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown search types: {', '.join(unknown)} (allowed: {', '.join(SEARCH_TYPES)})",
+        )
+
+    repo = SearchRepository(db)
+    mode = "substring" if len(query) >= repo.SUBSTRING_MIN_LEN else "prefix"
+    response = {"query": query, "mode": mode}
+    # Одна сессия: запросы по типам выполняются последовательно
+    if "keywords" in requested:
+        response["keywords"] = await repo.keywords(query, limit)
+    if "queueKeywords" in requested:
+        response["queueKeywords"] = await repo.queue_keywords(query, limit)
+    if "domains" in requested:
+        response["domains"] = await repo.domains(query, limit)
+    if "requests" in requested:
+        response["requests"] = await repo.requests(query, limit)
+    return response
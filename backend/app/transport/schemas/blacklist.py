@@ -56,7 +56,9 @@ class AddToBlacklistRequestDTO(BaseModel):
 class BlacklistResponseDTO(BaseModel):
     """Response DTO for blacklist."""
     entries: List[BlacklistEntryDTO]
-    total: int
+    total: Optional[int] = None  # None when totalMode=none
     limit: int
     offset: int
+    totalMode: str = "exact"  # exact | approx (estimate or capped count) | none
+    nextCursor: Optional[str] = None  # pass as ?cursor= for the next page; None on the last page
 
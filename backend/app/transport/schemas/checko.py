@@ -1,6 +1,6 @@
 """Pydantic schemas for Checko API."""
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 
 class CheckoDataResponseDTO(BaseModel):
@@ -27,10 +27,9 @@ class CheckoDataResponseDTO(BaseModel):
     checkoData: str  # Full JSON data as string
 
 
-
-
-
-
-
-
-
+class CheckoBatchRequestDTO(BaseModel):
+    """Request DTO for batch Checko enrichment."""
+    inns: Optional[List[str]] = Field(
+        default=None, description="INNs to enrich; omitted = all suppliers without Checko data"
+    )
+    forceRefresh: bool = False
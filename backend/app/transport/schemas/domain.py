@@ -35,7 +35,9 @@ class DomainQueueEntryDTO(BaseDTO):
 class DomainsQueueResponseDTO(BaseModel):
     """Response DTO for domains queue."""
     entries: List[DomainQueueEntryDTO]
-    total: int
+    total: Optional[int] = None  # None when totalMode=none
     limit: int
     offset: int
+    totalMode: str = "exact"  # exact | approx (estimate or capped count) | none
+    nextCursor: Optional[str] = None  # pass as ?cursor= for the next page; None on the last page
 
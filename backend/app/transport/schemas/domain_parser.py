@@ -8,6 +8,7 @@ class DomainParserRequestDTO(BaseModel):
     
     runId: str = Field(..., description="Parsing run ID")
     domains: List[str] = Field(..., description="List of domains to parse", min_length=1)
+    forceRefresh: bool = Field(False, description="Ignore cached results and crawl every domain again")
 
 
 class DomainParserResultDTO(BaseModel):
@@ -18,6 +19,7 @@ class DomainParserResultDTO(BaseModel):
     emails: List[str] = Field(default_factory=list, description="Extracted emails")
     sourceUrls: List[str] = Field(default_factory=list, description="URLs where data was found")
     error: Optional[str] = Field(None, description="Error message if parsing failed")
+    cached: bool = Field(False, description="Result taken from the domain info cache")
 
 
 class DomainParserBatchResponseDTO(BaseModel):
@@ -36,3 +38,10 @@ class DomainParserStatusResponseDTO(BaseModel):
     processed: int = Field(0, description="Number of domains processed")
     total: int = Field(0, description="Total domains to process")
     results: List[DomainParserResultDTO] = Field(default_factory=list, description="Parsing results")
+    cacheHits: int = Field(0, description="Domains answered from the domain info cache")
+
+
+class DomainParserCacheInvalidateDTO(BaseModel):
+    """Domains whose cached results should be dropped."""
+    
+    domains: List[str] = Field(..., description="Domains to invalidate", min_length=1)
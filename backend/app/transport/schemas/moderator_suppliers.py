@@ -42,6 +42,8 @@ class ModeratorSupplierDTO(BaseDTO):
     legalCasesAsPlaintiff: Optional[int] = Field(None, alias="legal_cases_as_plaintiff", serialization_alias="legalCasesAsPlaintiff")
     legalCasesAsDefendant: Optional[int] = Field(None, alias="legal_cases_as_defendant", serialization_alias="legalCasesAsDefendant")
     checkoData: Optional[str] = Field(None, alias="checko_data", serialization_alias="checkoData")
+    # Список поставщиков не отдает checkoData: только флаг, сами данные - GET /suppliers/{id}/checko-data
+    hasCheckoData: Optional[bool] = Field(None, alias="has_checko_data", serialization_alias="hasCheckoData")
     
     createdAt: datetime = Field(alias="created_at")
     updatedAt: datetime = Field(alias="updated_at")
@@ -149,7 +151,9 @@ class SupplierKeywordsResponseDTO(BaseModel):
 class ModeratorSuppliersListResponseDTO(BaseModel):
     """Response DTO for suppliers list."""
     suppliers: List[ModeratorSupplierDTO]
-    total: int
+    total: Optional[int] = None  # None when totalMode=none
     limit: int
     offset: int
+    totalMode: str = "exact"  # exact | approx (estimate or capped count) | none
+    nextCursor: Optional[str] = None  # pass as ?cursor= for the next page; None on the last page
 
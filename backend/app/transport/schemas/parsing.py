@@ -44,6 +44,8 @@ class ParsingRunDTO(BaseDTO):
     finishedAt: Optional[str] = Field(None, alias="finished_at")
     error: Optional[str] = Field(None, alias="error_message")
     resultsCount: Optional[int] = None  # Not in DB, can be calculated from parsing_hits
+    resultsBySource: Optional[Dict[str, int]] = None  # domains_queue rows by source (google/yandex/both)
+    resultsByStatus: Optional[Dict[str, int]] = None  # domains_queue rows by status
     createdAt: str = Field(alias="created_at")
     depth: Optional[int] = None  # Depth of parsing (number of pages)
     source: Optional[str] = Field(None, description="Source for parsing: 'google', 'yandex', or 'both'")
@@ -77,7 +79,9 @@ class ParsingRunDTO(BaseDTO):
 class ParsingRunsListResponseDTO(BaseModel):
     """Response DTO for parsing runs list."""
     runs: List[ParsingRunDTO]
-    total: int
+    total: Optional[int] = None  # None when totalMode=none
     limit: int
     offset: int
+    totalMode: str = "exact"  # exact | approx (estimate or capped count) | none
+    nextCursor: Optional[str] = None  # pass as ?cursor= for the next page; None on the last page
 
@@ -0,0 +1,56 @@
+"""Pydantic schemas for unified search."""
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class KeywordHitDTO(BaseModel):
+    """Keyword from the keywords table."""
+    id: int
+    keyword: str
+    rank: int
+    score: float
+
+
+class QueueKeywordHitDTO(BaseModel):
+    """Keyword of domains_queue with its URL count."""
+    keyword: str
+    urls: int
+    lastSeenAt: Optional[str] = None
+    rank: int
+    score: float
+
+
+class DomainHitDTO(BaseModel):
+    """Domain of domains_queue with its URL and keyword counts."""
+    domain: str
+    urls: int
+    keywords: int
+    lastSeenAt: Optional[str] = None
+    rank: int
+    score: float
+
+
+class RequestHitDTO(BaseModel):
+    """Parsing request matched by title or keys."""
+    id: int
+    title: Optional[str] = None
+    keys: List[str] = []
+    lastRunId: Optional[str] = None
+    createdAt: Optional[str] = None
+    rank: int
+    score: float
+
+
+class SearchResponseDTO(BaseModel):
+    """Unified search response.
+
+    rank: 3 = exact, 2 = prefix, 1 = substring match; score: trigram similarity.
+    mode: "substring" (3+ characters) or "prefix" (shorter queries).
+    """
+    query: str
+    mode: str
+    keywords: List[KeywordHitDTO] = []
+    queueKeywords: List[QueueKeywordHitDTO] = []
+    domains: List[DomainHitDTO] = []
+    requests: List[RequestHitDTO] = []
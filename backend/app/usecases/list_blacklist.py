@@ -1,10 +1,17 @@
 """Use case for listing blacklist entries."""
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.adapters.db.repositories import BlacklistRepository
 
 
-async def execute(db: AsyncSession, limit: int = 100, offset: int = 0):
+async def execute(
+    db: AsyncSession,
+    limit: int = 100,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    total_mode: str = "exact"
+):
     """List blacklist entries with pagination."""
     repo = BlacklistRepository(db)
-    return await repo.list(limit=limit, offset=offset)
+    return await repo.list(limit=limit, offset=offset, cursor=cursor, total_mode=total_mode)
 
@@ -10,7 +10,9 @@ async def execute(
     offset: int = 0,
     status: Optional[str] = None,
     keyword: Optional[str] = None,
-    parsing_run_id: Optional[str] = None
+    parsing_run_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    total_mode: str = "exact"
 ):
     """List domains queue entries with pagination."""
     import logging
@@ -23,7 +25,9 @@ async def execute(
         offset=offset,
         status=status,
         keyword=keyword,
-        parsing_run_id=parsing_run_id
+        parsing_run_id=parsing_run_id,
+        cursor=cursor,
+        total_mode=total_mode
     )
     
     logger.info(f"list_domains_queue.execute returning {len(entries)} entries, total={total}")
@@ -8,9 +8,15 @@ async def execute(
     db: AsyncSession,
     limit: int = 100,
     offset: int = 0,
-    type_filter: Optional[str] = None
+    type_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    total_mode: str = "exact",
+    summary: bool = False
 ):
-    """List moderator suppliers with pagination."""
+    """List moderator suppliers with pagination (summary=True: without checko_data)."""
     repo = ModeratorSupplierRepository(db)
-    return await repo.list(limit=limit, offset=offset, type_filter=type_filter)
+    return await repo.list(
+        limit=limit, offset=offset, type_filter=type_filter, cursor=cursor, total_mode=total_mode,
+        summary=summary
+    )
 
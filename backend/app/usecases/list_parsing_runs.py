@@ -11,7 +11,9 @@ async def execute(
     status: Optional[str] = None,
     keyword: Optional[str] = None,
     sort_by: str = "created_at",
-    sort_order: str = "desc"
+    sort_order: str = "desc",
+    cursor: Optional[str] = None,
+    total_mode: str = "exact"
 ):
     """List parsing runs with pagination, filtering, and sorting."""
     repo = ParsingRunRepository(db)
@@ -21,6 +23,8 @@ async def execute(
         status=status,
         keyword=keyword,
         sort_by=sort_by,
-        sort_order=sort_order
+        sort_order=sort_order,
+        cursor=cursor,
+        total_mode=total_mode
     )
 
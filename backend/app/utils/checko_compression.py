@@ -1,20 +1,192 @@
-"""Utilities for compressing and decompressing Checko data."""
+"""Utilities for compressing and decompressing Checko data.
+
+Stored checko_data carries its format in the first byte:
+- 0x1f: gzip (legacy rows, gzip magic 1f 8b, no extra header);
+- 0x02: zstd frame;
+- 0x03: 4-byte big-endian dictionary ID + zstd frame compressed with that
+  trained dictionary (Checko documents share keys and enum strings, so a shared
+  dictionary compresses them much better than each document on its own).
+
+New data is written with settings.CHECKO_CODEC; every format stays readable.
+Dictionaries are files checko-<id>.zdict in CHECKO_ZSTD_DICT_DIR, trained and
+applied to existing rows by app.services.checko_reencode. zstandard is optional:
+without it data is written as gzip and zstd rows cannot be read (ValueError).
+"""
 import gzip
 import json
 import logging
+import os
+import struct
+import threading
+import zlib
 from typing import Dict, Any, Optional
 
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstd = None
+    ZSTD_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+FORMAT_GZIP = 0x1f  # first byte of the gzip magic
+FORMAT_ZSTD = 0x02
+FORMAT_ZSTD_DICT = 0x03
+
+_DICT_HEADER = struct.Struct(">I")
+_dictionaries: Dict[int, Any] = {}
+_dictionaries_lock = threading.Lock()
+_local = threading.local()  # zstd (de)compressors are not thread-safe: one set per thread
+
+
+class GzipCodec:
+    """Legacy gzip codec (output is a plain gzip stream)."""
+    name = "gzip"
+
+    def encode(self, raw: bytes) -> bytes:
+        return gzip.compress(raw)
+
+    def decode(self, payload: bytes) -> bytes:
+        return gzip.decompress(payload)
+
+
+class ZstdCodec:
+    """zstd codec, optionally with a trained dictionary."""
+
+    def __init__(self, level: int = 9, dict_id: int = 0):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is not installed")
+        self.level = level
+        self.dict_id = dict_id
+        self.name = f"zstd-dict:{dict_id}" if dict_id else "zstd"
+
+    def _compressor(self):
+        cache = _local.__dict__.setdefault("compressors", {})
+        key = (self.level, self.dict_id)
+        if key not in cache:
+            dict_data = load_dictionary(self.dict_id) if self.dict_id else None
+            cache[key] = zstd.ZstdCompressor(level=self.level, dict_data=dict_data)
+        return cache[key]
+
+    def encode(self, raw: bytes) -> bytes:
+        frame = self._compressor().compress(raw)
+        if self.dict_id:
+            return bytes([FORMAT_ZSTD_DICT]) + _DICT_HEADER.pack(self.dict_id) + frame
+        return bytes([FORMAT_ZSTD]) + frame
+
+
+def _decompressor(dict_id: int):
+    cache = _local.__dict__.setdefault("decompressors", {})
+    if dict_id not in cache:
+        dict_data = load_dictionary(dict_id) if dict_id else None
+        cache[dict_id] = zstd.ZstdDecompressor(dict_data=dict_data)
+    return cache[dict_id]
+
+
+def dictionary_path(dict_id: int, dict_dir: Optional[str] = None) -> str:
+    """Path of the dictionary file checko-<dict_id>.zdict."""
+    from app.config import settings
+    return os.path.join(dict_dir or settings.CHECKO_ZSTD_DICT_DIR, f"checko-{dict_id}.zdict")
+
+
+def load_dictionary(dict_id: int):
+    """Trained zstd dictionary by ID (loaded from CHECKO_ZSTD_DICT_DIR once).
+
+    Raises:
+        ValueError: If the dictionary file is missing or its ID does not match
+    """
+    with _dictionaries_lock:
+        if dict_id in _dictionaries:
+            return _dictionaries[dict_id]
+        path = dictionary_path(dict_id)
+        try:
+            with open(path, "rb") as f:
+                dict_data = zstd.ZstdCompressionDict(f.read())
+        except OSError as e:
+            raise ValueError(f"Checko zstd dictionary {dict_id} is not available: {e}")
+        if dict_data.dict_id() != dict_id:
+            raise ValueError(f"Dictionary {path} has ID {dict_data.dict_id()}, expected {dict_id}")
+        _dictionaries[dict_id] = dict_data
+        return dict_data
+
+
+def get_codec(name: Optional[str] = None):
+    """Codec for writing: `name` or settings.CHECKO_CODEC (gzip if zstandard is missing)."""
+    from app.config import settings
+    name = (name or settings.CHECKO_CODEC or "gzip").strip().lower()
+    if name == "zstd":
+        if ZSTD_AVAILABLE:
+            dict_id = settings.CHECKO_ZSTD_DICT_ID
+            if dict_id:
+                try:
+                    load_dictionary(dict_id)
+                except ValueError as e:
+                    logger.warning(f"{e}; writing zstd without dictionary")
+                    dict_id = 0
+            return ZstdCodec(level=settings.CHECKO_ZSTD_LEVEL, dict_id=dict_id)
+        logger.warning("CHECKO_CODEC=zstd but zstandard is not installed, writing gzip")
+    elif name != "gzip":
+        logger.warning(f"Unknown CHECKO_CODEC={name!r}, writing gzip")
+    return GzipCodec()
+
+
+def payload_format(payload: bytes) -> str:
+    """Format name of stored data: gzip, zstd, zstd-dict:<id> or unknown."""
+    if not payload:
+        return "unknown"
+    head = payload[0]
+    if head == FORMAT_GZIP:
+        return "gzip"
+    if head == FORMAT_ZSTD:
+        return "zstd"
+    if head == FORMAT_ZSTD_DICT and len(payload) > _DICT_HEADER.size:
+        return f"zstd-dict:{_DICT_HEADER.unpack_from(payload, 1)[0]}"
+    return "unknown"
+
+
+def encode_payload(raw: bytes, codec=None) -> bytes:
+    """Compress serialized JSON with `codec` (default: get_codec())."""
+    return (codec or get_codec()).encode(raw)
+
+
+def decode_payload(payload: bytes) -> bytes:
+    """Decompress stored data of any supported format.
+
+    Raises:
+        ValueError: If the format is unknown or the data cannot be decompressed
+    """
+    if not payload:
+        raise ValueError("Empty Checko data")
+    head = payload[0]
+    try:
+        if head == FORMAT_GZIP:
+            return gzip.decompress(payload)
+        if head in (FORMAT_ZSTD, FORMAT_ZSTD_DICT):
+            if not ZSTD_AVAILABLE:
+                raise ValueError("Checko data is zstd-compressed but zstandard is not installed")
+            if head == FORMAT_ZSTD:
+                return _decompressor(0).decompress(payload[1:])
+            dict_id = _DICT_HEADER.unpack_from(payload, 1)[0]
+            return _decompressor(dict_id).decompress(payload[1 + _DICT_HEADER.size:])
+    except ValueError:
+        raise
+    except (gzip.BadGzipFile, EOFError, OSError, zlib.error, struct.error) as e:
+        raise ValueError(f"Cannot decompress Checko data: {e}")
+    except Exception as e:
+        # zstd.ZstdError
+        raise ValueError(f"Cannot decompress Checko data: {type(e).__name__}: {e}")
+    raise ValueError(f"Unknown Checko data format: first byte 0x{head:02x}")
+
 
 def compress_checko_data(data: Dict[str, Any]) -> bytes:
-    """Compress Checko data using gzip.
+    """Compress Checko data with the configured codec.
     
     Args:
         data: Dictionary containing Checko data
         
     Returns:
-        Compressed bytes (gzip)
+        Compressed bytes (format-tagged, see module docstring)
         
     Raises:
         ValueError: If data cannot be serialized to JSON
@@ -23,8 +195,7 @@ def compress_checko_data(data: Dict[str, Any]) -> bytes:
         # Serialize to JSON string
         json_str = json.dumps(data, ensure_ascii=False)
         
-        # Compress using gzip
-        compressed = gzip.compress(json_str.encode('utf-8'))
+        compressed = encode_payload(json_str.encode('utf-8'))
         
         logger.debug(f"Compressed Checko data: {len(json_str)} bytes -> {len(compressed)} bytes "
                     f"({100 * (1 - len(compressed) / len(json_str)):.1f}% reduction)")
@@ -36,10 +207,10 @@ def compress_checko_data(data: Dict[str, Any]) -> bytes:
 
 
 def decompress_checko_data(compressed: bytes) -> Dict[str, Any]:
-    """Decompress Checko data from gzip.
+    """Decompress Checko data (any stored format).
     
     Args:
-        compressed: Compressed bytes (gzip)
+        compressed: Compressed bytes
         
     Returns:
         Dictionary containing Checko data
@@ -48,8 +219,7 @@ def decompress_checko_data(compressed: bytes) -> Dict[str, Any]:
         ValueError: If data cannot be decompressed or parsed
     """
     try:
-        # Decompress from gzip
-        json_str = gzip.decompress(compressed).decode('utf-8')
+        json_str = decode_payload(compressed).decode('utf-8')
         
         # Parse JSON
         data = json.loads(json_str)
@@ -57,19 +227,19 @@ def decompress_checko_data(compressed: bytes) -> Dict[str, Any]:
         logger.debug(f"Decompressed Checko data: {len(compressed)} bytes -> {len(json_str)} bytes")
         
         return data
-    except (gzip.BadGzipFile, UnicodeDecodeError, json.JSONDecodeError) as e:
+    except (ValueError, UnicodeDecodeError) as e:
         logger.error(f"Failed to decompress Checko data: {e}")
         raise ValueError(f"Cannot decompress or parse Checko data: {e}")
 
 
 def compress_checko_data_string(data_str: str) -> bytes:
-    """Compress Checko data string using gzip.
+    """Compress Checko data string with the configured codec.
     
     Args:
         data_str: JSON string containing Checko data
         
     Returns:
-        Compressed bytes (gzip)
+        Compressed bytes (format-tagged, see module docstring)
         
     Raises:
         ValueError: If data_str is not valid JSON
@@ -79,7 +249,7 @@ def compress_checko_data_string(data_str: str) -> bytes:
         json.loads(data_str)
         
         # Compress
-        compressed = gzip.compress(data_str.encode('utf-8'))
+        compressed = encode_payload(data_str.encode('utf-8'))
         
         logger.debug(f"Compressed Checko data string: {len(data_str)} bytes -> {len(compressed)} bytes "
                     f"({100 * (1 - len(compressed) / len(data_str)):.1f}% reduction)")
@@ -91,10 +261,10 @@ def compress_checko_data_string(data_str: str) -> bytes:
 
 
 def decompress_checko_data_to_string(compressed: bytes) -> str:
-    """Decompress Checko data from gzip to JSON string.
+    """Decompress Checko data (any stored format) to JSON string.
     
     Args:
-        compressed: Compressed bytes (gzip)
+        compressed: Compressed bytes
         
     Returns:
         JSON string containing Checko data
@@ -103,8 +273,7 @@ def decompress_checko_data_to_string(compressed: bytes) -> str:
         ValueError: If data cannot be decompressed
     """
     try:
-        # Decompress from gzip
-        json_str = gzip.decompress(compressed).decode('utf-8')
+        json_str = decode_payload(compressed).decode('utf-8')
         
         # Validate JSON by parsing
         json.loads(json_str)
@@ -112,13 +281,6 @@ def decompress_checko_data_to_string(compressed: bytes) -> str:
         logger.debug(f"Decompressed Checko data to string: {len(compressed)} bytes -> {len(json_str)} bytes")
         
         return json_str
-    except (gzip.BadGzipFile, UnicodeDecodeError, json.JSONDecodeError) as e:
+    except (ValueError, UnicodeDecodeError) as e:
         logger.error(f"Failed to decompress Checko data string: {e}")
         raise ValueError(f"Cannot decompress Checko data: {e}")
-
-
-
-
-
-
-
@@ -0,0 +1,14 @@
+"""Domain name helpers shared by the domain info cache and the blacklist index."""
+from urllib.parse import urlparse
+
+
+def normalize_domain(domain: str) -> str:
+    """'https://WWW.Example.ru:443/contacts' -> 'example.ru'."""
+    value = (domain or "").strip().lower()
+    if "://" in value:
+        value = urlparse(value).netloc
+    value = value.split("/", 1)[0].split("?", 1)[0]
+    value = value.rsplit("@", 1)[-1].split(":", 1)[0].rstrip(".")
+    if value.startswith("www."):
+        value = value[4:]
+    return value
@@ -0,0 +1,41 @@
+-- Durable parsing job queue (replaces in-process BackgroundTasks)
+-- Migration: 016_parsing_jobs.sql
+-- Date: 2026-10-18
+--
+-- Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED and keep a lease
+-- (locked_until) alive with heartbeats. Jobs whose lease expired are re-queued
+-- so a crashed worker's jobs are picked up by another backend replica.
+
+CREATE TABLE IF NOT EXISTS parsing_jobs (
+    id SERIAL PRIMARY KEY,
+    run_id VARCHAR(64) NOT NULL UNIQUE,
+    keyword VARCHAR(255) NOT NULL,
+    depth INTEGER NOT NULL DEFAULT 10,
+    source VARCHAR(32) NOT NULL DEFAULT 'google',
+    status VARCHAR(32) NOT NULL DEFAULT 'queued',  -- queued, running, completed, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    locked_by VARCHAR(128),
+    locked_until TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Claim query: queued jobs ordered by availability
+CREATE INDEX IF NOT EXISTS idx_parsing_jobs_claim
+    ON parsing_jobs (available_at, id)
+    WHERE status = 'queued';
+
+-- Lease reaping and per-source concurrency counting
+CREATE INDEX IF NOT EXISTS idx_parsing_jobs_running
+    ON parsing_jobs (locked_until, source)
+    WHERE status = 'running';
+
+GRANT ALL PRIVILEGES ON SEQUENCE parsing_jobs_id_seq TO postgres;
+GRANT ALL PRIVILEGES ON SEQUENCE parsing_jobs_id_seq TO PUBLIC;
+
+COMMENT ON TABLE parsing_jobs IS 'Durable queue of parsing runs claimed by backend workers';
+COMMENT ON COLUMN parsing_jobs.locked_until IS 'Lease expiry; extended by worker heartbeats';
@@ -0,0 +1,50 @@
+-- Recognition cache in the (text_hash, model) layout of RecognitionCacheModel
+-- Migration: 017_recognition_cache.sql
+-- Date: 2026-10-18
+--
+-- create_recognition_cache.sql created a file_hash-keyed table that nothing used.
+-- The cache is keyed by SHA-256 of the extracted text + prompt version + model
+-- (see app.services.recognition_cache), so the unused layout is replaced.
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'recognition_cache' AND column_name = 'file_hash'
+    ) THEN
+        DROP VIEW IF EXISTS recognition_cache_stats;
+        DROP TABLE recognition_cache;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS recognition_cache (
+    id SERIAL PRIMARY KEY,
+    text_hash VARCHAR(64) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    result_json TEXT NOT NULL,
+    usage_json TEXT,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    last_accessed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Lookup key
+CREATE UNIQUE INDEX IF NOT EXISTS idx_recognition_cache_hash_model
+    ON recognition_cache (text_hash, model);
+
+-- TTL expiration
+CREATE INDEX IF NOT EXISTS idx_recognition_cache_created_at
+    ON recognition_cache (created_at);
+
+-- LRU eviction
+CREATE INDEX IF NOT EXISTS idx_recognition_cache_last_accessed
+    ON recognition_cache (last_accessed_at);
+
+GRANT ALL PRIVILEGES ON SEQUENCE recognition_cache_id_seq TO postgres;
+GRANT ALL PRIVILEGES ON SEQUENCE recognition_cache_id_seq TO PUBLIC;
+
+COMMENT ON TABLE recognition_cache IS 'Read-through cache of Groq item-name recognition results';
+COMMENT ON COLUMN recognition_cache.text_hash IS 'SHA256 of prompt version + model + extracted document text';
+COMMENT ON COLUMN recognition_cache.result_json IS 'JSON array of extracted item names';
+COMMENT ON COLUMN recognition_cache.usage_json IS 'Token usage of the original (uncached) Groq call';
+COMMENT ON COLUMN recognition_cache.last_accessed_at IS 'Last cache hit, drives LRU eviction';
@@ -0,0 +1,32 @@
+-- Background recognition of uploaded request positions
+-- Migration: 018_recognition_jobs.sql
+-- Date: 2026-10-18
+--
+-- POST /cabinet/requests/{id}/positions/upload?mode=job returns a job id at once;
+-- the job reports its stage, progress and partial results here and is polled via
+-- GET /cabinet/recognition-jobs/{id}.
+
+CREATE TABLE IF NOT EXISTS recognition_jobs (
+    id VARCHAR(64) PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    request_id INTEGER NOT NULL,
+    filename VARCHAR(500),
+    engine VARCHAR(32) NOT NULL DEFAULT 'auto',
+    status VARCHAR(32) NOT NULL DEFAULT 'queued',  -- queued, running, completed, failed
+    stage VARCHAR(32),  -- extract, llm, normalize, keys, done
+    progress INTEGER NOT NULL DEFAULT 0,
+    partial_result_json TEXT,
+    result_json TEXT,
+    error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_recognition_jobs_user_created
+    ON recognition_jobs (user_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_recognition_jobs_request
+    ON recognition_jobs (request_id);
+
+COMMENT ON TABLE recognition_jobs IS 'Background recognition jobs for uploaded request positions';
@@ -0,0 +1,30 @@
+-- Domain-level cache of Domain Info Parser results (INN, emails)
+-- Migration: 019_domain_info_cache.sql
+-- Date: 2026-10-18
+--
+-- The same supplier domains come back across keywords and parsing runs; every
+-- /domain-parser/extract-batch used to crawl all of them again. Results are cached
+-- by normalized domain together with the extractor version that produced them
+-- (see app.services.domain_info_cache).
+
+CREATE TABLE IF NOT EXISTS domain_info_cache (
+    domain VARCHAR(255) PRIMARY KEY,
+    inn VARCHAR(12),
+    emails_json TEXT NOT NULL DEFAULT '[]',
+    source_urls_json TEXT NOT NULL DEFAULT '[]',
+    extractor_version VARCHAR(32) NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    extracted_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP,
+    last_accessed_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Expiration cleanup
+CREATE INDEX IF NOT EXISTS idx_domain_info_cache_expires_at
+    ON domain_info_cache (expires_at);
+
+COMMENT ON TABLE domain_info_cache IS 'Cached Domain Info Parser results by normalized domain';
+COMMENT ON COLUMN domain_info_cache.domain IS 'Lowercase host without scheme, port and www.';
+COMMENT ON COLUMN domain_info_cache.source_urls_json IS 'JSON array of pages the data was found on';
+COMMENT ON COLUMN domain_info_cache.extractor_version IS 'EXTRACTOR_VERSION of domain_info_parser/extractors.py; other versions are misses';
+COMMENT ON COLUMN domain_info_cache.expires_at IS 'NULL = never expires; empty results get a shorter TTL';
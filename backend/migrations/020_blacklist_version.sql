@@ -0,0 +1,31 @@
+-- Version counter of the blacklist table
+-- Migration: 020_blacklist_version.sql
+-- Date: 2026-10-18
+--
+-- Processes keep the blacklist in memory as a domain suffix index
+-- (see app.services.blacklist_index) and reload it when this counter changes.
+-- The trigger bumps it on every statement that changes blacklist, whichever
+-- code path (API, SQL console, scripts) made the change.
+
+CREATE TABLE IF NOT EXISTS blacklist_version (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO blacklist_version (id, version) VALUES (1, 0)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_blacklist_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE blacklist_version SET version = version + 1, updated_at = NOW() WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_blacklist_version ON blacklist;
+CREATE TRIGGER trg_blacklist_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON blacklist
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_blacklist_version();
+
+COMMENT ON TABLE blacklist_version IS 'Single-row change counter of blacklist, bumped by trg_blacklist_version';
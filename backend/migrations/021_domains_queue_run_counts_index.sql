@@ -0,0 +1,13 @@
+-- Index for per-run result counts of the parsing runs listing
+-- Migration: 021_domains_queue_run_counts_index.sql
+-- Date: 2026-10-18
+--
+-- GET /parsing/runs counts results of all runs on the page with one
+-- GROUP BY parsing_run_id, source, status over domains_queue
+-- (DomainQueueRepository.result_counts). With this index the aggregate is
+-- answered by an index-only scan instead of reading the table rows.
+
+CREATE INDEX IF NOT EXISTS idx_domains_queue_run_source_status
+    ON domains_queue (parsing_run_id, source, status);
+
+COMMENT ON INDEX idx_domains_queue_run_source_status IS 'Covers result counts by run, source and status (parsing runs listing)';
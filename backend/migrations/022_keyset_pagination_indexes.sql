@@ -0,0 +1,30 @@
+-- Indexes for keyset (cursor) pagination of the large listings
+-- Migration: 022_keyset_pagination_indexes.sql
+-- Date: 2026-10-18
+--
+-- Listings continue after the last row of the previous page with
+-- WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC
+-- (app.adapters.db.pagination) instead of OFFSET. These indexes serve that
+-- condition and order directly, for both directions.
+
+CREATE INDEX IF NOT EXISTS idx_domains_queue_created_at_id
+    ON domains_queue (created_at, id);
+
+-- Results of one run (the most common domains queue filter)
+CREATE INDEX IF NOT EXISTS idx_domains_queue_run_created_at_id
+    ON domains_queue (parsing_run_id, created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_parsing_runs_created_at_id
+    ON parsing_runs (created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_moderator_suppliers_created_at_id
+    ON moderator_suppliers (created_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_blacklist_added_at_domain
+    ON blacklist (added_at, domain);
+
+-- Fresh planner statistics: approximate totals read pg_class.reltuples
+ANALYZE domains_queue;
+ANALYZE parsing_runs;
+ANALYZE moderator_suppliers;
+ANALYZE blacklist;
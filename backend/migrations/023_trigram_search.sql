@@ -0,0 +1,54 @@
+-- Trigram indexes for substring search (moderator search, /search)
+-- Migration: 023_trigram_search.sql
+-- Date: 2026-10-18
+--
+-- Search filters use ILIKE '%text%' (domains queue keyword filter, parsing runs
+-- keyword filter over request title and raw_keys_json, GET /search). B-tree
+-- indexes cannot serve a leading wildcard, so each keystroke was a sequential
+-- scan over millions of domains_queue rows. pg_trgm GIN indexes serve ILIKE
+-- for patterns of 3+ characters; shorter queries use prefix matching on
+-- lower(column) with text_pattern_ops indexes (see SearchRepository).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- start_parsing wrote raw_keys_json with ASCII escapes ("\u0442\u0440..."), which
+-- substring search on Cyrillic keys never matches. Re-encode those rows as
+-- plain UTF-8 JSON (jsonb::text); rows that are not valid JSON are left as is.
+DO $$
+DECLARE
+    rec RECORD;
+BEGIN
+    FOR rec IN SELECT id, raw_keys_json FROM parsing_requests WHERE raw_keys_json LIKE '%\\u%' LOOP
+        BEGIN
+            UPDATE parsing_requests SET raw_keys_json = (rec.raw_keys_json::jsonb)::text WHERE id = rec.id;
+        EXCEPTION WHEN others THEN
+            NULL;
+        END;
+    END LOOP;
+END $$;
+
+-- domains_queue: keyword and domain
+CREATE INDEX IF NOT EXISTS idx_domains_queue_keyword_trgm
+    ON domains_queue USING gin (keyword gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_domains_queue_domain_trgm
+    ON domains_queue USING gin (domain gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_domains_queue_keyword_lower_prefix
+    ON domains_queue (lower(keyword) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_domains_queue_domain_lower_prefix
+    ON domains_queue (lower(domain) text_pattern_ops);
+
+-- keywords
+CREATE INDEX IF NOT EXISTS idx_keywords_keyword_trgm
+    ON keywords USING gin (keyword gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_keywords_keyword_lower_prefix
+    ON keywords (lower(keyword) text_pattern_ops);
+
+-- parsing_requests: title and the request keys (raw_keys_json holds the key list)
+CREATE INDEX IF NOT EXISTS idx_parsing_requests_title_trgm
+    ON parsing_requests USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_parsing_requests_raw_keys_trgm
+    ON parsing_requests USING gin (raw_keys_json gin_trgm_ops);
+
+COMMENT ON INDEX idx_domains_queue_keyword_trgm IS 'Serves keyword ILIKE ''%text%'' (domains queue filter, /search)';
+COMMENT ON INDEX idx_domains_queue_domain_trgm IS 'Serves domain ILIKE ''%text%'' (/search)';
+COMMENT ON INDEX idx_parsing_requests_raw_keys_trgm IS 'Serves raw_keys_json ILIKE ''%key%'' (parsing runs keyword filter, /search)';
@@ -0,0 +1,214 @@
+"""Однопроходное извлечение ИНН и email со страниц (текст + HTML).
+
+Раньше extract_inn прогонял по тексту и HTML каждой страницы десятки регулярок
+с re.DOTALL (вида "реквизит.*?ИНН"), которые компилировались на каждом вызове и
+могли долго откатываться на больших страницах. Теперь:
+
+- все 10/12-значные числа (и сгруппированные 1234 567890 / 1234 5678 9012)
+  находятся одним линейным проходом по строке;
+- каждый кандидат оценивается по окну фиксированного размера вокруг него:
+  метка ИНН/INN, пара ИНН/КПП, ОГРН/КПП рядом, meta/data-атрибуты, ключи JSON,
+  штрафы за контекст телефонов и номеров заказов;
+- ИНН с неверной контрольной суммой отбрасываются.
+
+CPU на страницу ограничен: O(длина страницы) + O(1) на кандидата.
+"""
+import re
+from typing import Iterator, List, Optional, Tuple
+
+# Версия логики извлечения: при изменении результаты в domain_info_cache бэкенда
+# (app.services.domain_info_cache) считаются устаревшими
+EXTRACTOR_VERSION = "2"
+
+# Метки (в т.ч. "ИНН" в UTF-8, ошибочно декодированном как latin-1)
+_INN_LABEL = r'(?:\bинн\b|\binn\b|\xd0[\x98\xb8]\xd0[\x9d\xbd]\xd0[\x9d\xbd])'
+_KPP_LABEL = r'(?:\bкпп\b|\bkpp\b|\xd0[\x9a\xba]\xd0[\x9f\xbf]\xd0[\x9f\xbf])'
+_OGRN_LABEL = r'(?:\bогрнип\b|\bогрн\b|\bogrn\b)'
+
+_DIGIT_RUN_RE = re.compile(r'\d+')
+_TAG_RE = re.compile(r'<[^<>]{0,300}>')
+
+# Контекст перед числом (окно без тегов): "ИНН: ", "ИНН/КПП ", "ИНН организации - "
+_LABEL_BEFORE_RE = re.compile(_INN_LABEL + r'[^\d]{0,25}$', re.IGNORECASE)
+# Метка ИНН сразу после числа: "7703412988 (ИНН)"
+_LABEL_AFTER_RE = re.compile(r'^[^\d]{0,20}' + _INN_LABEL, re.IGNORECASE)
+_LABEL_NEAR_RE = re.compile(_INN_LABEL, re.IGNORECASE)
+_REQUISITES_NEAR_RE = re.compile(_KPP_LABEL + '|' + _OGRN_LABEL + r'|реквизит', re.IGNORECASE)
+# ИНН/КПП парой: "7703412988/772001001" или "КПП 772001001 ИНН 7703412988"
+_KPP_AFTER_RE = re.compile(r'^\s{0,3}[/\\,;]?\s{0,3}\d{9}(?!\d)')
+_KPP_BEFORE_RE = re.compile(_KPP_LABEL + r'[^\d]{0,20}\d{9}[^\d]{0,20}$', re.IGNORECASE)
+
+# Сырой HTML перед числом: data-inn="", <meta name="inn" content="">, <span itemprop="taxID">,
+# "inn": "", companyInn =
+_ATTR_BEFORE_RE = re.compile(
+    r'(?:data-(?:company-)?inn\s*=\s*'
+    r'|(?:name|property|itemprop)\s*=\s*["\'](?:inn|taxid)["\'][^<>]{0,80}content\s*=\s*'
+    r'|itemprop\s*=\s*["\']taxid["\'][^<>]{0,80}>\s*'
+    r'|["\']?(?:inn|company_?inn|tax_?id)["\']?\s*[:=]\s*)["\']?$',
+    re.IGNORECASE,
+)
+# <meta content="7703412988" name="inn">
+_ATTR_AFTER_RE = re.compile(r'^["\'][^<>]{0,80}(?:name|property|itemprop)\s*=\s*["\'](?:inn|taxid)["\']', re.IGNORECASE)
+
+# Телефоны, номера заказов, артикулы
+_NOISE_BEFORE_RE = re.compile(
+    r'(?<!\w)(?:тел|phone|факс|fax|заказ|order|артикул|арт\.|sku|№|#|id)[^\d]{0,6}$|(?:\+\s*7|(?<!\d)8)[\s(\-]{0,2}$',
+    re.IGNORECASE,
+)
+
+_BEFORE_WINDOW = 80
+_AFTER_WINDOW = 40
+
+# Баллы контекста
+SCORE_ATTRIBUTE = 70
+SCORE_LABEL_BEFORE = 60
+SCORE_LABEL_NEAR = 40
+SCORE_LABEL_AFTER = 45  # метка после номера ("5012345601 (ИНН)") не ниже MIN_INN_SCORE
+SCORE_KPP_PAIR = 25
+SCORE_REQUISITES = 15
+PENALTY_NOISE = -50
+PENALTY_GROUPED = -20  # "1234 567890" без метки - скорее телефон или номер документа
+
+MIN_INN_SCORE = 40  # кандидат ниже порога не считается ИНН
+CONFIDENT_INN_SCORE = 60  # найден в тексте с таким баллом - HTML не сканируем
+
+_INN10_WEIGHTS = (2, 4, 10, 3, 5, 9, 4, 6, 8)
+_INN12_WEIGHTS_11 = (7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+_INN12_WEIGHTS_12 = (3, 7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_MAILTO_RE = re.compile(r'mailto:([^"\'\s>]+)', re.IGNORECASE)
+_EMAIL_EXCLUDE = ('example', 'test', 'domain', 'email', 'yoursite', 'yourdomain')
+# logo@2x.png и т.п. из srcset
+_EMAIL_FILE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp')
+
+
+def _control_digit(digits: str, weights: Tuple[int, ...]) -> int:
+    return sum(int(d) * w for d, w in zip(digits, weights)) % 11 % 10
+
+
+def inn_checksum_valid(inn: str) -> bool:
+    """Проверить контрольные цифры ИНН (10 цифр - юрлицо, 12 - ИП/физлицо)."""
+    if not inn.isdigit() or inn.startswith('00'):
+        return False
+    if len(inn) == 10:
+        return _control_digit(inn, _INN10_WEIGHTS) == int(inn[9])
+    if len(inn) == 12:
+        return (
+            _control_digit(inn, _INN12_WEIGHTS_11) == int(inn[10])
+            and _control_digit(inn, _INN12_WEIGHTS_12) == int(inn[11])
+        )
+    return False
+
+
+def _digit_candidates(s: str) -> Iterator[Tuple[str, int, int, bool]]:
+    """(цифры, начало, конец, сгруппировано) для 10/12-значных чисел строки."""
+    runs = [(m.start(), m.end()) for m in _DIGIT_RUN_RE.finditer(s)]
+    for i, (start, end) in enumerate(runs):
+        length = end - start
+        if length in (10, 12):
+            yield s[start:end], start, end, False
+            continue
+        if length != 4:
+            continue
+        # 1234 567890 / 1234-5678-9012: группы через один пробел или дефис
+        groups = [(start, end)]
+        for next_start, next_end in runs[i + 1:i + 3]:
+            gap_start = groups[-1][1]
+            if next_start - gap_start != 1 or s[gap_start] not in ' -\u00a0':
+                break
+            groups.append((next_start, next_end))
+            sizes = [e - b for b, e in groups]
+            if sizes in ([4, 6], [4, 4, 4]):
+                yield ''.join(s[b:e] for b, e in groups), start, next_end, True
+                break
+
+
+def _score(s: str, start: int, end: int, grouped: bool, is_html: bool) -> int:
+    raw_before = s[max(0, start - _BEFORE_WINDOW):start]
+    raw_after = s[end:end + _AFTER_WINDOW]
+    if is_html:
+        before = _TAG_RE.sub(' ', raw_before)
+        after = _TAG_RE.sub(' ', raw_after)
+    else:
+        before, after = raw_before, raw_after
+
+    score = 0
+    if is_html and (_ATTR_BEFORE_RE.search(raw_before) or _ATTR_AFTER_RE.match(raw_after)):
+        score += SCORE_ATTRIBUTE
+    elif _LABEL_BEFORE_RE.search(before):
+        score += SCORE_LABEL_BEFORE
+    elif _LABEL_AFTER_RE.match(after):
+        score += SCORE_LABEL_AFTER
+    elif _LABEL_NEAR_RE.search(before[-40:]) or _LABEL_NEAR_RE.search(after):
+        score += SCORE_LABEL_NEAR
+
+    if _KPP_AFTER_RE.match(after) or _KPP_BEFORE_RE.search(before):
+        score += SCORE_KPP_PAIR
+    if _REQUISITES_NEAR_RE.search(before) or _REQUISITES_NEAR_RE.search(after):
+        score += SCORE_REQUISITES
+    if _NOISE_BEFORE_RE.search(before):
+        score += PENALTY_NOISE
+    if grouped:
+        score += PENALTY_GROUPED
+    return score
+
+
+def _scan(s: str, is_html: bool) -> List[Tuple[str, int]]:
+    out = []
+    for inn, start, end, grouped in _digit_candidates(s):
+        if inn_checksum_valid(inn):
+            out.append((inn, _score(s, start, end, grouped, is_html)))
+    return out
+
+
+def inn_candidates(text: str, html: str = "") -> List[Tuple[str, int]]:
+    """Кандидаты ИНН с верной контрольной суммой и их баллы (лучшие первыми).
+
+    HTML сканируется, только если в тексте нет уверенного кандидата.
+    """
+    best = {}
+    order = []
+
+    def _merge(found: List[Tuple[str, int]]) -> None:
+        for inn, score in found:
+            if inn not in best:
+                order.append(inn)
+                best[inn] = score
+            elif score > best[inn]:
+                best[inn] = score
+
+    _merge(_scan(text or "", is_html=False))
+    if html and max(best.values(), default=0) < CONFIDENT_INN_SCORE:
+        _merge(_scan(html, is_html=True))
+    # При равных баллах - первый найденный (текст раньше HTML)
+    return sorted(((inn, best[inn]) for inn in order), key=lambda item: -item[1])
+
+
+def extract_inn(text: str, html: str = "") -> Optional[str]:
+    """Лучший кандидат ИНН с баллом не ниже MIN_INN_SCORE или None."""
+    candidates = inn_candidates(text, html)
+    if candidates and candidates[0][1] >= MIN_INN_SCORE:
+        return candidates[0][0]
+    return None
+
+
+def extract_emails(text: str) -> List[str]:
+    """Извлечь email адреса из текста (без шаблонных адресов и имен файлов)."""
+    filtered = set()
+    for email in _EMAIL_RE.findall(text or ""):
+        email_lower = email.lower()
+        if any(pattern in email_lower for pattern in _EMAIL_EXCLUDE):
+            continue
+        if email_lower.endswith(_EMAIL_FILE_SUFFIXES):
+            continue
+        filtered.add(email)
+    return list(filtered)
+
+
+def extract_emails_from_html(html: str) -> List[str]:
+    """Извлечь email адреса из ссылок mailto: в HTML."""
+    if not html:
+        return []
+    cleaned = [email.split("?")[0] for email in _MAILTO_RE.findall(html)]
+    return extract_emails(" ".join(cleaned))
@@ -1,5 +1,4 @@
 """Domain Info Parser - извлекает ИНН и email с веб-страниц."""
-import re
 import asyncio
 from typing import Optional, Dict, List
 from urllib.parse import urljoin, urlparse
@@ -7,24 +6,78 @@ import logging
 
 from playwright.async_api import async_playwright, Browser, Page, TimeoutError as PlaywrightTimeout
 from learning_engine import LearningEngine
+from extractors import MIN_INN_SCORE, extract_emails, extract_emails_from_html, inn_candidates
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Популярные пути страниц с реквизитами/контактами (проверяются HTTP-пробой до открытия в браузере)
+COMMON_PATHS = [
+    '/pages/requisites/', '/requisites/', '/requisites',
+    '/company/', '/company', '/about/', '/about',
+    '/contacts/', '/contacts', '/politics/', '/politics',
+    '/legal/', '/legal', '/details/', '/details',
+    '/o-kompanii.html', '/o-kompanii/', '/about/contacts/',
+    '/service/legal/', '/kontakty.html', '/kontakty/',
+    '/contacts/kontakty', '/contacts/contacts', '/info/',
+    '/company/info/', '/about/company/', '/requisites/info/',
+    '/docs/requisites/', '/download/requisites/', '/files/requisites/',
+    '/upload/requisites/', '/media/requisites/', '/assets/docs/',
+    '/contacts/details/',
+]
+
+# Когда прекращать обход страниц домена
+STOP_POLICIES = ("never", "inn", "inn_and_email")
+
+# Статусы, которые не говорят о существовании страницы (защита от ботов, перегрузка)
+_INCONCLUSIVE_STATUSES = {401, 403, 429, 503}
+
+_PROBE_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
 
 class DomainInfoParser:
     """Парсер для извлечения ИНН и email с доменов."""
     
-    def __init__(self, headless: bool = True, timeout: int = 15000):
+    def __init__(
+        self,
+        headless: bool = True,
+        timeout: int = 15000,
+        stop_policy: str = "inn_and_email",
+        probe_concurrency: int = 10,
+        probe_timeout: float = 5.0,
+    ):
         """
         Args:
             headless: Запускать браузер в headless режиме
             timeout: Таймаут загрузки страницы в миллисекундах
+            stop_policy: Когда прекращать обход страниц: "inn_and_email" (найдены ИНН и email),
+                "inn" (найден ИНН) или "never" (обходить все найденные страницы)
+            probe_concurrency: Сколько популярных URL проверять HTTP-запросами одновременно
+            probe_timeout: Таймаут HTTP-пробы одного URL в секундах
         """
+        if stop_policy not in STOP_POLICIES:
+            raise ValueError(f"stop_policy must be one of {STOP_POLICIES}, got {stop_policy!r}")
         self.headless = headless
         self.timeout = timeout
+        self.stop_policy = stop_policy
+        self.probe_concurrency = max(1, probe_concurrency)
+        self.probe_timeout = probe_timeout
         self.browser: Optional[Browser] = None
         self.playwright = None
+        self.http_client = None
         self.learning_engine = LearningEngine()
 
     def _build_priority_urls(self, domain: str, base_url: str) -> List[str]:
@@ -64,9 +117,23 @@ class DomainInfoParser:
         # Используем обычный запуск браузера вместо COMET CDP
         self.browser = await self.playwright.chromium.launch(headless=True)
         logger.info("✅ Браузер запущен (Playwright)")
+        if HTTPX_AVAILABLE and self.http_client is None:
+            # Один пул соединений на все домены (keep-alive между пробами одного сайта)
+            self.http_client = httpx.AsyncClient(
+                follow_redirects=True,
+                verify=False,
+                timeout=self.probe_timeout,
+                headers=_PROBE_HEADERS,
+                limits=httpx.Limits(max_connections=self.probe_concurrency * 4, max_keepalive_connections=self.probe_concurrency * 2),
+            )
+        elif not HTTPX_AVAILABLE:
+            logger.warning("⚠️ httpx не установлен: популярные URL будут проверяться браузером")
         
     async def close(self):
         """Закрыть браузер."""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
         if self.browser:
             await self.browser.close()
         if self.playwright:
@@ -74,186 +141,22 @@ class DomainInfoParser:
         logger.info("✅ Браузер закрыт")
     
     def extract_inn(self, text: str, html: str = "") -> Optional[str]:
-        """Извлечь ИНН из текста и HTML с улучшенными паттернами."""
-        # Расширенные паттерны для поиска ИНН с контекстом
-        inn_patterns = [
-            # КРИТИЧНО: Формат ИНН/КПП с косой чертой (самый частый случай!)
-            r'ИНН[/\s]*КПП[:\s]*(\d{10})[/\s]+\d{9}',  # ИНН/КПП: 7703412988/772001001
-            r'ИНН[/\s]*КПП[:\s\n]+(\d{10})[\s/]+\d{9}',  # ИНН/КПП 7703412988/772001001
-            r'(?:ИНН|INN)[/\s]*(?:КПП|KPP)[:\s]*(\d{10})[/\s]+\d{9}',  # INN/KPP: 7703412988/772001001
-            
-            # Прямое упоминание ИНН (с учетом пробелов и переносов)
-            r'ИНН[:\s\n]+(\d{10}|\d{12})',
-            r'INN[:\s\n]+(\d{10}|\d{12})',
-            r'инн[:\s\n]+(\d{10}|\d{12})',
-            
-            # С разделителями
-            r'ИНН[:\s\n]+(\d{4}[\s\-\n]?\d{6})',  # ИНН: 1234 567890
-            r'ИНН[:\s\n]+(\d{4}[\s\-\n]?\d{4}[\s\-\n]?\d{4})',  # ИНН: 1234 5678 9012
-            
-            # В таблицах/реквизитах
-            r'(?:реквизит|requisite|details|юридическ).*?ИНН[:\s\n]*(\d{10}|\d{12})',
-            r'(?:реквизит|requisite|details|legal).*?INN[:\s\n]*(\d{10}|\d{12})',
-            
-            # Рядом с ОГРН/КПП
-            r'(?:ОГРН|OGRN)[:\s\n]+\d+.*?ИНН[:\s\n]*(\d{10}|\d{12})',
-            r'(?:КПП|KPP)[:\s\n]+\d+.*?ИНН[:\s\n]*(\d{10}|\d{12})',
-            
-            # В контактах/о компании
-            r'(?:о компании|about|контакт|contact|company).*?ИНН[:\s\n]*(\d{10}|\d{12})',
-            
-            # В футере
-            r'(?:footer|подвал).*?ИНН[:\s\n]*(\d{10}|\d{12})',
-        ]
-        
-        # Ищем с явным упоминанием ИНН в тексте
-        for pattern in inn_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-            for match in matches:
-                # Убираем пробелы, дефисы и переносы
-                clean_match = re.sub(r'[\s\-\n]', '', match)
-                if len(clean_match) in [10, 12]:
-                    logger.info(f"Found INN with pattern in text: {clean_match}")
-                    return clean_match
-        
-        # Ищем в HTML (если предоставлен)
-        if html:
-            # Поиск в meta-тегах
-            meta_patterns = [
-                r'<meta[^>]*name=["\']inn["\'][^>]*content=["\'](\d{10}|\d{12})["\']',
-                r'<meta[^>]*property=["\']inn["\'][^>]*content=["\'](\d{10}|\d{12})["\']',
-                r'<meta[^>]*content=["\'](\d{10}|\d{12})["\'][^>]*name=["\']inn["\']',
-            ]
-            
-            for pattern in meta_patterns:
-                matches = re.findall(pattern, html, re.IGNORECASE)
-                if matches:
-                    logger.info(f"Found INN in meta tag: {matches[0]}")
-                    return matches[0]
-            
-            # Поиск в data-атрибутах
-            data_patterns = [
-                r'data-inn=["\'](\d{10}|\d{12})["\']',
-                r'data-company-inn=["\'](\d{10}|\d{12})["\']',
-            ]
-            
-            for pattern in data_patterns:
-                matches = re.findall(pattern, html, re.IGNORECASE)
-                if matches:
-                    logger.info(f"Found INN in data attribute: {matches[0]}")
-                    return matches[0]
-            
-            # Поиск в HTML с явным упоминанием ИНН
-            for pattern in inn_patterns:
-                matches = re.findall(pattern, html, re.IGNORECASE | re.DOTALL)
-                for match in matches:
-                    clean_match = re.sub(r'[\s\-\n]', '', match)
-                    if len(clean_match) in [10, 12]:
-                        logger.info(f"Found INN with pattern in HTML: {clean_match}")
-                        return clean_match
-            
-            # Поиск в JavaScript-контенте (переменные, объекты, JSON)
-            js_patterns = [
-                r'["\']inn["\']\s*:\s*["\']?(\d{10}|\d{12})["\']?',  # "inn": "7820067929"
-                r'inn\s*=\s*["\']?(\d{10}|\d{12})["\']?',  # inn = "7820067929"
-                r'companyInn["\']?\s*:\s*["\']?(\d{10}|\d{12})["\']?',  # companyInn: "7820067929"
-                r'data\.inn\s*=\s*["\']?(\d{10}|\d{12})["\']?',  # data.inn = "7820067929"
-                r'"tax_id"\s*:\s*"(\d{10}|\d{12})"',  # "tax_id": "7820067929"
-                r'"company_id"\s*:\s*"(\d{10}|\d{12})"',  # "company_id": "7820067929"
-                r'"ogrn"\s*:\s*"(\d{13})"[^}]*"inn"\s*:\s*"(\d{10}|\d{12})"',  # ОГРН + ИНН в JSON
-                r'"kpp"\s*:\s*"\d{9}"[^}]*"inn"\s*:\s*"(\d{10}|\d{12})"',  # КПП + ИНН в JSON
-                r'ИНН\s*[:\=]\s*["\']?(\d{10}|\d{12})["\']?',  # ИНН: "7820067929"
-                r'ИНН\s*[:\=]\s*(\d{10}|\d{12})',  # ИНН: 7820067929
-            ]
-            
-            for pattern in js_patterns:
-                matches = re.findall(pattern, html, re.IGNORECASE)
-                if matches:
-                    logger.info(f"Found INN in JavaScript content: {matches[0]}")
-                    return matches[0]
-            
-            # УБРАЛ: АГРЕССИВНЫЙ ПОИСК - искал любые 10/12-значные числа в HTML рядом со словами ИНН/INN
-# УБРАЛ: context_patterns - искал числа в контексте реквизитов без явного "ИНН"
-        
-        # Если не нашли с явным упоминанием, ищем 10 или 12 цифр подряд
-        # но только если они окружены пробелами или знаками препинания ИЛИ рядом с ИНН
-        # БОЛЕЕ СТРОГИЙ ПОДХОД: не берем просто числа из HTML без контекста
-        general_pattern = r'(?<!\d)(\d{10}|\d{12})(?!\d)'
-        matches = re.findall(general_pattern, text)
-        
-        # Фильтруем: исключаем телефоны и другие числа
-        for match in matches:
-            # Проверяем, что это не телефон (не начинается с 7, 8, 9)
-            if len(match) == 10 and not match.startswith(('7', '8', '9')):
-                # ДОП. ПРОВЕРКА: ищем "ИНН" рядом с этим числом в тексте
-                inn_context = re.search(r'.{0,30}' + re.escape(match) + '.{0,30}', text, re.IGNORECASE)
-                if inn_context and ('ИНН' in inn_context.group() or 'INN' in inn_context.group()):
-                    logger.info(f"Found INN with context in text: {match}")
-                    return match
-            elif len(match) == 12:
-                # Для 12-значных ИНН (ИП) проверяем, что не начинается с 79 (телефон)
-                if not match.startswith('79'):
-                    # ДОП. ПРОВЕРКА: ищем "ИНН" рядом с этим числом в тексте
-                    inn_context = re.search(r'.{0,30}' + re.escape(match) + '.{0,30}', text, re.IGNORECASE)
-                    if inn_context and ('ИНН' in inn_context.group() or 'INN' in inn_context.group()):
-                        logger.info(f"Found INN with context in text: {match}")
-                        return match
-        
-        # Дополнительный поиск: ищем 10-значные числа рядом с 13-значными (ОГРН) - ТОЛЬКО с контекстом ИНН
-        # УБРАЛ: ogrn_inn_pattern - искал любые числа рядом с ОГРН
-        
-        # Поиск в HTML с возможной проблемой кодировки
-        if html:
-            # Ищем ИНН рядом со словом ИНН (даже если кириллица неправильно декодирована)
-            # Ищем паттерны: ИНН + 10 цифр ИЛИ 10 цифр + ИНН
-            inn_context_patterns = [
-                r'(?:\xd0\x98\xd0\x9d\xd0\x9d|\xd0\x98\xd0\xbd\xd0\xbd|\xd0\xb8\xd0\xbd\xd0\xbd|\xd0\x98\xd0\xbd\xd0\xbd|\xd0\x98\xd0\x9d\xd0\x9d)[^\d]{0,20}(\d{10})',  # Неправильно декодированное "ИНН"
-                r'(\d{10})[^\d]{0,20}(?:\xd0\x98\xd0\x9d\xd0\x9d|\xd0\x98\xd0\xbd\xd0\xbd|\xd0\xb8\xd0\xbd\xd0\xbd|\xd0\x98\xd0\xbd\xd0\xbd|\xd0\x98\xd0\x9d\xd0\x9d)',  # Число перед "ИНН"
-                r'(?:\xd0\x9a\xd0\x9a\xd0\x9f|\xd0\xba\xd0\xba\xd0\xbf)[^\d]{0,20}\d{9}[^\d]{0,20}(\d{10})',  # КПП + ИНН
-                r'(\d{10})[^\d]{0,20}\d{9}[^\d]{0,20}(?:\xd0\x9a\xd0\x9a\xd0\x9f|\xd0\xba\xd0\xba\xd0\xbf)',  # ИНН + КПП
-            ]
-            
-            for pattern in inn_context_patterns:
-                matches = re.findall(pattern, html, re.IGNORECASE)
-                for match in matches:
-                    if isinstance(match, tuple):
-                        match = match[0] if match[0] else match[1]
-                    if len(match) == 10 and not match.startswith(('7', '8', '9')):
-                        logger.info(f"Found INN with context in HTML: {match}")
-                        return match
-            
-            # Если не нашли с контекстом, НЕ ищем любые 10-значные числа в HTML
-            # Это исключает ID элементов и другие технические числа
-            # ИНН должен быть найден только с контекстом "ИНН" или на контактных страницах
-        
+        """Извлечь ИНН из текста и HTML (см. extractors: кандидаты, контекст, контрольная сумма)."""
+        candidates = inn_candidates(text, html)
+        if candidates and candidates[0][1] >= MIN_INN_SCORE:
+            inn, score = candidates[0]
+            logger.info(f"Found INN: {inn} (score={score}, candidates={len(candidates)})")
+            return inn
         logger.info("No INN found in text")
         return None
     
     def extract_emails(self, text: str) -> List[str]:
         """Извлечь email адреса из текста."""
-        pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(pattern, text)
-        
-        # Фильтруем: исключаем общие email-адреса типа example@example.com
-        filtered = []
-        exclude_patterns = ['example', 'test', 'domain', 'email', 'yoursite', 'yourdomain']
-        
-        for email in emails:
-            email_lower = email.lower()
-            if not any(pattern in email_lower for pattern in exclude_patterns):
-                filtered.append(email)
-        
-        return list(set(filtered))  # Убираем дубликаты
+        return extract_emails(text)
     
     def extract_emails_from_html(self, html: str) -> List[str]:
         """Извлечь email адреса из HTML (включая mailto)."""
-        if not html:
-            return []
-
-        mailto_pattern = r'mailto:([^"\'\s>]+)'
-        emails = re.findall(mailto_pattern, html, re.IGNORECASE)
-        cleaned = [email.split("?")[0] for email in emails]
-        return list(set(self.extract_emails(" ".join(cleaned))))
+        return extract_emails_from_html(html)
 
     async def goto_with_fallback(self, page: Page, url: str) -> None:
         """Открыть страницу, при ошибке HTTPS попробовать HTTP."""
@@ -326,6 +229,78 @@ class DomainInfoParser:
         
         return list(set(contact_urls))[:5]  # Максимум 5 страниц
     
+    def should_stop(self, result: Dict) -> bool:
+        """Достаточно ли найдено данных по stop_policy, чтобы не открывать остальные страницы."""
+        if self.stop_policy == "inn":
+            return bool(result['inn'])
+        if self.stop_policy == "inn_and_email":
+            return bool(result['inn']) and bool(result['emails'])
+        return False
+
+    async def _probe_url(self, url: str, semaphore: asyncio.Semaphore) -> Optional[str]:
+        """
+        Проверить URL HTTP-запросом (HEAD, при необходимости GET без чтения тела).
+
+        Returns:
+            Итоговый URL (после редиректов), если страница существует; "" если ее нет;
+            None если ответ не позволяет судить (сетевая ошибка, защита от ботов)
+        """
+        async with semaphore:
+            try:
+                response = await self.http_client.head(url)
+                if response.status_code in (405, 501) or response.status_code in _INCONCLUSIVE_STATUSES:
+                    # HEAD не поддерживается или отфильтрован - повторяем GET, тело не читаем
+                    async with self.http_client.stream("GET", url) as response:
+                        pass
+            except Exception as e:
+                logger.debug(f"  ⏭️ Проба не удалась {url}: {str(e)[:50]}")
+                return None
+        if response.status_code in _INCONCLUSIVE_STATUSES:
+            return None
+        if response.status_code >= 400:
+            return ""
+        return str(response.url)
+
+    async def probe_common_paths(self, page: Page, base_url: str, skip_urls: List[str]) -> List[str]:
+        """
+        Найти существующие страницы из COMMON_PATHS.
+
+        URL проверяются параллельными HTTP-запросами через общий httpx-клиент, в браузере
+        потом открываются только живые страницы. Если HTTP-проба ничего не может сказать
+        о сайте (все запросы заблокированы или упали), проверяем пути браузером, как раньше.
+        """
+        candidates = [urljoin(base_url, path) for path in COMMON_PATHS]
+        candidates = [url for url in dict.fromkeys(candidates) if url not in skip_urls]
+        if not candidates:
+            return []
+
+        if self.http_client is not None:
+            semaphore = asyncio.Semaphore(self.probe_concurrency)
+            probes = await asyncio.gather(*(self._probe_url(url, semaphore) for url in candidates))
+            if any(probe is not None for probe in probes):
+                base_netloc = urlparse(base_url).netloc
+                live = [
+                    final_url for final_url in probes
+                    # Редирект на другой домен или на главную - не страница с реквизитами
+                    if final_url and urlparse(final_url).netloc == base_netloc
+                    and urlparse(final_url).path.strip('/') != ''
+                ]
+                logger.info(f"  ✅ HTTP-проба: {len(live)} из {len(candidates)} страниц существуют")
+                return list(dict.fromkeys(live))
+            logger.info("  ⚠️ HTTP-проба не дала ответа, проверяем пути браузером")
+
+        live = []
+        for test_url in candidates:
+            try:
+                response = await page.goto(test_url, wait_until='domcontentloaded', timeout=10000)
+                # Проверяем статус ответа
+                if response and response.ok:
+                    live.append(page.url)
+                    logger.info(f"  ✅ Найдена страница: {test_url}")
+            except Exception as e:
+                logger.debug(f"  ⏭️ Пропуск {test_url}: {str(e)[:50]}")
+        return list(dict.fromkeys(live))
+
     async def parse_domain(self, domain: str) -> Dict:
         """
         Парсить домен и извлечь ИНН и email.
@@ -381,83 +356,26 @@ class DomainInfoParser:
                 result['emails'].extend(emails)
                 logger.info(f"  ✅ Email найден на главной: {emails}")
             
-            # ВСЕГДА ищем на контактных страницах для более точных данных
-            logger.info(f"  → Поиск контактных страниц...")
-            contact_urls = await self.find_contact_pages(page, base_url)
-            priority_urls = self._build_priority_urls(domain, base_url)
-            if priority_urls:
-                logger.info(f"  🎓 Найдено приоритетных URL из обучения: {len(priority_urls)}")
-                contact_urls = priority_urls + [url for url in contact_urls if url not in priority_urls]
-            
-            # ВСЕГДА пробуем популярные URL для надежности
-            if not contact_urls or True:  # Всегда true для надежности
-                logger.info(f"  → Пробуем популярные URL...")
-                common_paths = [
-                    '/pages/requisites/', '/requisites/', '/requisites', 
-                    '/company/', '/company', '/about/', '/about',
-                    '/contacts/', '/contacts', '/politics/', '/politics',
-                    '/legal/', '/legal', '/details/', '/details',
-                    '/o-kompanii.html', '/o-kompanii/', '/about/contacts/',
-                    '/service/legal/', '/kontakty.html', '/kontakty/',
-                    '/contacts/kontakty', '/contacts/contacts', '/info/',
-                    '/company/info/', '/about/company/', '/requisites/info/',
-                    '/docs/requisites/', '/download/requisites/', '/files/requisites/',
-                    '/upload/requisites/', '/media/requisites/', '/assets/docs/',
-                    '/contacts/details/', '/about/', '/contacts/details/'  # Добавленные пути - дублирую для надежности
-                ]
-                for path in common_paths:
-                    test_url = urljoin(base_url, path)
-                    if test_url in contact_urls:
-                        continue
-                    try:
-                        response = await page.goto(test_url, wait_until='domcontentloaded', timeout=10000)
-                        # Проверяем статус ответа
-                        if response and response.ok:
-                            contact_urls.append(page.url)
-                            logger.info(f"  ✅ Найдена страница: {path}")
-                            # НЕ break - проверяем все страницы для надежности
-                    except Exception as e:
-                        logger.debug(f"  ⏭️ Пропуск {path}: {str(e)[:50]}")
-                        pass  # Страница не существует, пробуем следующую
-                
+            if self.should_stop(result):
+                logger.info(f"  ⏹️ ИНН и email найдены на главной, остальные страницы не открываем")
+            else:
+                # Ищем на контактных страницах для более точных данных
+                logger.info(f"  → Поиск контактных страниц...")
+                contact_urls = await self.find_contact_pages(page, base_url)
+                priority_urls = self._build_priority_urls(domain, base_url)
+                if priority_urls:
+                    logger.info(f"  🎓 Найдено приоритетных URL из обучения: {len(priority_urls)}")
+                    contact_urls = priority_urls + [url for url in contact_urls if url not in priority_urls]
                 contact_urls = list(dict.fromkeys(contact_urls))
 
-                for contact_url in contact_urls:
-                    # Всегда ищем на контактных страницах, даже если ИНН уже найден
-                    # Может быть более релевантная информация
-                    try:
-                        logger.info(f"  → Загрузка: {contact_url}")
-                        await page.goto(contact_url, wait_until='domcontentloaded', timeout=self.timeout)
-                        result['source_urls'].append(page.url)
-                        
-                        contact_text = await self.get_page_text(page)
-                        contact_html = await page.content()
-                        
-                        # Ищем ИНН с приоритетом на контактных страницах
-                        contact_inn = self.extract_inn(contact_text, contact_html)
-                        if contact_inn and not inn:
-                            # Если ИНН еще не был найден, используем его
-                            inn = contact_inn
-                            result['inn'] = inn
-                            logger.info(f"  ✅ ИНН найден на контактной странице: {inn}")
-                        elif contact_inn and inn:
-                            # Если ИНН уже был найден, но на контактной странице есть другой,
-                            # приоритет отдаем контактной странице (там более точная информация)
-                            inn = contact_inn
-                            result['inn'] = inn
-                            logger.info(f"  ✅ Обновлен ИНН с контактной страницы: {inn}")
-                        
-                        if not emails:
-                            new_emails = self.extract_emails(contact_text)
-                            new_emails.extend(self.extract_emails_from_html(contact_html))
-                            if new_emails:
-                                result['emails'].extend(new_emails)
-                                logger.info(f"  ✅ Email найден на контактной странице: {new_emails}")
-                        
-                    except PlaywrightTimeout:
-                        logger.warning(f"  ⏱️ Таймаут загрузки: {contact_url}")
-                    except Exception as e:
-                        logger.warning(f"  ⚠️ Ошибка загрузки {contact_url}: {e}")
+                visited = set()
+                inn = await self._scan_contact_pages(page, contact_urls, result, inn, emails, visited)
+
+                # Популярные URL пробуем, только если найденных страниц не хватило
+                if not self.should_stop(result):
+                    logger.info(f"  → Пробуем популярные URL...")
+                    common_urls = await self.probe_common_paths(page, base_url, contact_urls)
+                    inn = await self._scan_contact_pages(page, common_urls, result, inn, emails, visited)
             
             # Убираем дубликаты email
             result['emails'] = list(set(result['emails']))
@@ -482,6 +400,58 @@ class DomainInfoParser:
         
         return result
     
+    async def _scan_contact_pages(
+        self,
+        page: Page,
+        contact_urls: List[str],
+        result: Dict,
+        inn: Optional[str],
+        emails: List[str],
+        visited: set,
+    ) -> Optional[str]:
+        """Открыть контактные страницы и дополнить result; возвращает текущий ИНН."""
+        for contact_url in contact_urls:
+            if contact_url in visited:
+                continue
+            if self.should_stop(result):
+                logger.info(f"  ⏹️ Данные найдены (stop_policy={self.stop_policy}), остальные страницы не открываем")
+                break
+            visited.add(contact_url)
+            try:
+                logger.info(f"  → Загрузка: {contact_url}")
+                await page.goto(contact_url, wait_until='domcontentloaded', timeout=self.timeout)
+                result['source_urls'].append(page.url)
+                
+                contact_text = await self.get_page_text(page)
+                contact_html = await page.content()
+                
+                # Ищем ИНН с приоритетом на контактных страницах
+                contact_inn = self.extract_inn(contact_text, contact_html)
+                if contact_inn and not inn:
+                    # Если ИНН еще не был найден, используем его
+                    inn = contact_inn
+                    result['inn'] = inn
+                    logger.info(f"  ✅ ИНН найден на контактной странице: {inn}")
+                elif contact_inn and inn:
+                    # Если ИНН уже был найден, но на контактной странице есть другой,
+                    # приоритет отдаем контактной странице (там более точная информация)
+                    inn = contact_inn
+                    result['inn'] = inn
+                    logger.info(f"  ✅ Обновлен ИНН с контактной страницы: {inn}")
+                
+                if not emails:
+                    new_emails = self.extract_emails(contact_text)
+                    new_emails.extend(self.extract_emails_from_html(contact_html))
+                    if new_emails:
+                        result['emails'].extend(new_emails)
+                        logger.info(f"  ✅ Email найден на контактной странице: {new_emails}")
+                
+            except PlaywrightTimeout:
+                logger.warning(f"  ⏱️ Таймаут загрузки: {contact_url}")
+            except Exception as e:
+                logger.warning(f"  ⚠️ Ошибка загрузки {contact_url}: {e}")
+        return inn
+
     async def parse_domains(self, domains: List[str]) -> List[Dict]:
         """
         Парсить список доменов.
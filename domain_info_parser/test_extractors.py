@@ -0,0 +1,30 @@
+"""Regression cases for INN context scoring (extractors._score)."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from extractors import extract_inn
+
+
+@pytest.mark.parametrize("text", [
+    "ИНН 5012345601",
+    "ИНН: 5012345601, КПП 501201001",
+    # Метка после номера
+    "5012345601 (ИНН)",
+    "ООО Ромашка 5012345601 ИНН",
+    "5012345601 — ИНН организации",
+])
+def test_inn_with_label(text):
+    assert extract_inn(text) == "5012345601"
+
+
+@pytest.mark.parametrize("text", [
+    "тел 5012345601",
+    "Артикул 5012345601",
+    "5012345601",
+])
+def test_number_without_inn_context(text):
+    assert extract_inn(text) is None
@@ -0,0 +1,117 @@
+"""Long-lived Domain Info Parser worker (one browser, bounded pool of pages).
+
+Protocol: JSON lines over stdin/stdout.
+    request:  {"id": "<job id>", "domain": "example.ru"}
+    response: {"id": "<job id>", "result": {domain, inn, emails, source_urls, error}}
+On startup the worker writes {"event": "ready"}. Domains are processed concurrently
+(at most --concurrency pages at once) and each result is written as soon as it is
+ready, so responses may come in a different order than requests.
+
+The backend (app.services.domain_parser_worker) starts this script once with the
+system Python (where Playwright is installed) instead of one process per domain.
+
+    python worker.py --concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# stdout is the protocol channel (UTF-8 bytes, independent of the console code page):
+# everything else (prints, logs) goes to stderr
+_protocol_out = sys.stdout.buffer
+sys.stdout = sys.stderr
+
+from parser import DomainInfoParser, STOP_POLICIES  # noqa: E402
+
+logger = logging.getLogger("domain_info_worker")
+
+
+class DomainParserWorker:
+    """Serves parse requests from stdin with one shared DomainInfoParser."""
+
+    def __init__(self, concurrency: int = 4, timeout: int = 15000, domain_timeout: float = 120.0,
+                 stop_policy: str = "inn_and_email"):
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.domain_timeout = domain_timeout
+        self.parser = DomainInfoParser(headless=True, timeout=timeout, stop_policy=stop_policy)
+        self._restart_lock = asyncio.Lock()
+        self._tasks = set()
+
+    def _write(self, message: dict) -> None:
+        _protocol_out.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+        _protocol_out.flush()
+
+    async def _ensure_browser(self) -> None:
+        """Restart browser if it crashed."""
+        async with self._restart_lock:
+            if self.parser.browser is not None and self.parser.browser.is_connected():
+                return
+            logger.warning("Браузер недоступен, перезапуск...")
+            try:
+                await self.parser.close()
+            except Exception:
+                pass
+            await self.parser.start()
+
+    async def _handle(self, job_id: str, domain: str) -> None:
+        async with self.semaphore:
+            try:
+                await self._ensure_browser()
+                result = await asyncio.wait_for(self.parser.parse_domain(domain), timeout=self.domain_timeout)
+            except asyncio.TimeoutError:
+                result = {"domain": domain, "inn": None, "emails": [], "source_urls": [],
+                          "error": f"Domain parser timeout ({int(self.domain_timeout)}s)"}
+            except Exception as e:
+                result = {"domain": domain, "inn": None, "emails": [], "source_urls": [], "error": str(e)}
+        self._write({"id": job_id, "result": result})
+
+    async def run(self) -> None:
+        await self.parser.start()
+        loop = asyncio.get_running_loop()
+        self._write({"event": "ready"})
+        try:
+            while True:
+                # Blocking read in a thread: pipe readers are not portable to Windows event loops
+                line = await loop.run_in_executor(None, sys.stdin.buffer.readline)
+                if not line:
+                    break  # stdin closed: backend went away
+                try:
+                    request = json.loads(line)
+                    job_id, domain = str(request["id"]), str(request["domain"])
+                except Exception as e:
+                    logger.warning(f"Некорректный запрос: {line[:200]!r} ({e})")
+                    continue
+                task = asyncio.create_task(self._handle(job_id, domain))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            await self.parser.close()
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Domain Info Parser worker")
+    arg_parser.add_argument("--concurrency", type=int, default=4, help="Max pages parsed at once")
+    arg_parser.add_argument("--timeout", type=int, default=15000, help="Page load timeout, ms")
+    arg_parser.add_argument("--domain-timeout", type=float, default=120.0, help="Max seconds per domain")
+    arg_parser.add_argument("--stop-policy", choices=STOP_POLICIES, default="inn_and_email",
+                            help="When to stop opening pages of a domain")
+    args = arg_parser.parse_args()
+
+    worker = DomainParserWorker(
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        domain_timeout=args.domain_timeout,
+        stop_policy=args.stop_policy,
+    )
+    asyncio.run(worker.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -122,7 +122,8 @@ function ParsingRunDetailsPage() {
     legalCasesSum: null as number | null,
     legalCasesAsPlaintiff: null as number | null,
     legalCasesAsDefendant: null as number | null,
-    checkoData: null as string | null,
+    // undefined = not loaded: omitted from the update, stored Checko data is kept
+    checkoData: null as string | null | undefined,
   })
   const [searchQuery, setSearchQuery] = useState("")
   const [sortBy, setSortBy] = useState<"domain" | "urls">("urls")
@@ -836,7 +837,9 @@ function ParsingRunDetailsPage() {
           legalCasesSum: supplier.legalCasesSum ?? null,
           legalCasesAsPlaintiff: supplier.legalCasesAsPlaintiff ?? null,
           legalCasesAsDefendant: supplier.legalCasesAsDefendant ?? null,
-          checkoData: supplier.checkoData ?? null,
+          // Cached list rows carry only hasCheckoData: leave stored Checko data untouched
+          // unless it is reloaded from Checko in the dialog
+          checkoData: undefined,
         })
       } else {
         setSupplierForm({
@@ -2216,5 +2219,5 @@ export default function ParsingRunDetailsPageWithAuth() {
     </AuthGuard>
   )
 }
-
-
+
+
@@ -58,7 +58,8 @@ export function CheckoInfoDialog({ inn, onDataLoaded }: CheckoInfoDialogProps) {
         legalCasesSum: data.legalCasesSum ?? null,
         legalCasesAsPlaintiff: data.legalCasesAsPlaintiff ?? null,
         legalCasesAsDefendant: data.legalCasesAsDefendant ?? null,
-        checkoData: data.checkoData || null,
+        // undefined (not null) if Checko sent no raw data: the update then keeps stored data
+        checkoData: data.checkoData || undefined,
       }
       
       console.log('[Checko] Loaded data:', updates)
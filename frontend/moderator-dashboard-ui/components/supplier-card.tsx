@@ -1,6 +1,6 @@
 "use client"
 
-import { useState } from "react"
+import { useEffect, useState } from "react"
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 import { Badge } from "@/components/ui/badge"
 import { Button } from "@/components/ui/button"
@@ -28,10 +28,11 @@ import {
   formatOKVEDCode,
   calculateReliabilityRating,
   calculateReliabilityScore,
+  parseCheckoData,
   ratingToStars,
   type ReliabilityLevel,
 } from "@/lib/format-utils"
-import { addToBlacklist, getCheckoData, updateSupplier } from "@/lib/api"
+import { addToBlacklist, getCheckoData, getSupplierCheckoData, updateSupplier } from "@/lib/api"
 import { toast } from "sonner"
 import { Edit, Ban, Tag, Globe, Phone, MapPin, Mail, Star, RefreshCw, ExternalLink, CheckCircle2 } from "lucide-react"
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, Legend } from "recharts"
@@ -114,17 +115,32 @@ export function SupplierCard({ supplier, onSupplierUpdate }: SupplierCardProps)
   const [blacklistReason, setBlacklistReason] = useState("")
   const [loadingCheckoData, setLoadingCheckoData] = useState(false)
   
-  // Parse checkoData if available
-  let checkoData: CheckoData | null = null
-  if (supplier.checkoData) {
-    try {
-      checkoData = JSON.parse(supplier.checkoData)
-    } catch (error) {
-      console.error("Failed to parse checkoData:", error)
-      console.error("checkoData value:", supplier.checkoData?.substring(0, 100))
-      checkoData = null
+  // Checko data: inline checkoData if the supplier has it, otherwise loaded from
+  // /suppliers/{id}/checko-data when hasCheckoData is set (lists omit the blob)
+  const [checkoData, setCheckoData] = useState<CheckoData | null>(() =>
+    parseCheckoData<CheckoData>(supplier.checkoData),
+  )
+
+  useEffect(() => {
+    if (supplier.checkoData) {
+      setCheckoData(parseCheckoData<CheckoData>(supplier.checkoData))
+      return
     }
-  }
+    setCheckoData(null)
+    if (!supplier.hasCheckoData) return
+
+    let cancelled = false
+    getSupplierCheckoData(supplier.id)
+      .then((data) => {
+        if (!cancelled) setCheckoData(data as CheckoData)
+      })
+      .catch((error) => {
+        console.error("Failed to load checkoData:", error)
+      })
+    return () => {
+      cancelled = true
+    }
+  }, [supplier.id, supplier.checkoData, supplier.hasCheckoData])
   
   // Normalize OKVED data (can be object or array)
   const normalizedOKVED: OKVED[] = (() => {
@@ -161,9 +177,13 @@ export function SupplierCard({ supplier, onSupplierUpdate }: SupplierCardProps)
   const chartData = prepareChartData(supplier, checkoData)
   
   // Initialize selectedYear with the last (newest) year
-  const [selectedYear, setSelectedYear] = useState<string | null>(
-    chartData.length > 0 ? chartData[chartData.length - 1].year : null
-  )
+  const newestChartYear = chartData.length > 0 ? chartData[chartData.length - 1].year : null
+  const [selectedYear, setSelectedYear] = useState<string | null>(newestChartYear)
+
+  // Checko data may arrive after the first render: select the newest year then
+  useEffect(() => {
+    if (!selectedYear && newestChartYear) setSelectedYear(newestChartYear)
+  }, [selectedYear, newestChartYear])
   
   // Check if Checko data exists and is fresh (less than 24 hours old)
   const hasFreshCheckoData = checkoData && checkoData.timestamp && 
@@ -248,7 +268,7 @@ export function SupplierCard({ supplier, onSupplierUpdate }: SupplierCardProps)
         legalCasesSum: checkoResponse.legalCasesSum ?? null,
         legalCasesAsPlaintiff: checkoResponse.legalCasesAsPlaintiff ?? null,
         legalCasesAsDefendant: checkoResponse.legalCasesAsDefendant ?? null,
-        checkoData: checkoResponse.checkoData || null,
+        checkoData: checkoResponse.checkoData || undefined,
       })
 
       toast.success("Данные Checko успешно загружены и обновлены")
@@ -625,6 +625,11 @@ export async function deleteSupplier(supplierId: number): Promise<void> {
   })
 }
 
+// Полные данные Checko (список поставщиков их не содержит); кэшируются браузером по ETag
+export async function getSupplierCheckoData(supplierId: number): Promise<Record<string, unknown>> {
+  return apiFetch<Record<string, unknown>>(`/moderator/suppliers/${supplierId}/checko-data`)
+}
+
 // Keywords API
 export async function getKeywords(): Promise<{
   keywords: KeywordDTO[]
@@ -1014,6 +1019,41 @@ export async function uploadCabinetRequestPositionsWithEngine(
   )
 }
 
+export type CabinetRecognitionJobDTO = {
+  job_id: string
+  request_id: number
+  filename: string | null
+  engine: string
+  status: "queued" | "running" | "completed" | "failed"
+  stage: "extract" | "llm" | "normalize" | "keys" | "done" | null
+  progress: number
+  partial_result: { text_chars?: number; names?: string[] } | null
+  result: { names: string[]; parsing_keys: string[]; groq: Record<string, string> } | null
+  error: string | null
+  created_at: string | null
+  updated_at: string | null
+  finished_at: string | null
+}
+
+export async function startCabinetRequestPositionsRecognitionJob(
+  requestId: number,
+  file: File,
+  engine: "auto" | "structured" | "ocr" | "docling" = "auto",
+): Promise<{ job_id: string; status: string; status_url: string }> {
+  const form = new FormData()
+  form.append("file", file, file.name)
+
+  const qs = `engine=${encodeURIComponent(engine)}&mode=job`
+  return apiFetch(`/cabinet/requests/${encodeURIComponent(String(requestId))}/positions/upload?${qs}`, {
+    method: "POST",
+    body: form,
+  })
+}
+
+export async function getCabinetRecognitionJob(jobId: string): Promise<CabinetRecognitionJobDTO> {
+  return apiFetch<CabinetRecognitionJobDTO>(`/cabinet/recognition-jobs/${encodeURIComponent(jobId)}`)
+}
+
 export async function getCabinetRequestSuppliers(requestId: number): Promise<CabinetRequestSupplierDTO[]> {
   return apiFetch<CabinetRequestSupplierDTO[]>(`/cabinet/requests/${encodeURIComponent(String(requestId))}/suppliers`)
 }
@@ -38,7 +38,8 @@ export function getCachedSuppliers(): SupplierDTO[] | null {
 export function setCachedSuppliers(suppliers: SupplierDTO[]): void {
   try {
     // Exclude checkoData from cache to avoid localStorage quota exceeded
-    // checkoData is too large (can be 300KB+ per supplier) and causes QuotaExceededError
+    // checkoData is too large (can be 300KB+ per supplier) and causes QuotaExceededError.
+    // List rows keep hasCheckoData; full data is loaded with getSupplierCheckoData
     const suppliersWithoutCheckoData = suppliers.map(supplier => {
       const { checkoData, ...supplierWithoutCheckoData } = supplier
       return supplierWithoutCheckoData
@@ -122,6 +122,22 @@ interface SupplierForReliability {
   legalCasesSum?: number | null
 }
 
+/**
+ * Parse Checko JSON as stored in SupplierDTO.checkoData.
+ * Supplier lists carry only hasCheckoData; the full data comes from getSupplierCheckoData.
+ * Returns null if the value is missing or not valid JSON
+ */
+export function parseCheckoData<T = CheckoDataForReliability>(raw: string | null | undefined): T | null {
+  if (!raw) return null
+  try {
+    return JSON.parse(raw) as T
+  } catch (error) {
+    console.error("Failed to parse checkoData:", error)
+    console.error("checkoData value:", raw.substring(0, 100))
+    return null
+  }
+}
+
 /**
  * Calculate reliability score based on Checko data
  * Implements transparent logic for reliability assessment
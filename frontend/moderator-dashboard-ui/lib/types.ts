@@ -27,6 +27,7 @@ export interface SupplierDTO {
   legalCasesAsPlaintiff?: number | null
   legalCasesAsDefendant?: number | null
   checkoData?: string | null
+  hasCheckoData?: boolean | null // в списке вместо checkoData
   
   createdAt: string
   updatedAt: string
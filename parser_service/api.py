@@ -2,11 +2,13 @@
 import asyncio
 import sys
 import logging
+import json
 import httpx
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Set, Any
+from typing import List, Optional, Dict, Any
 
 # CRITICAL: Set event loop policy BEFORE any other imports
 # This must be the very first thing to avoid NotImplementedError on Windows
@@ -16,6 +18,9 @@ if sys.platform == 'win32':
 from src.models import ParsedSupplier, ParseRequest, ParseResponse
 from src.config import settings
 from src.simple_ocr_wrapper import smart_extract_text
+from src.ocr_pool import OcrQueueFull, get_ocr_pool, ocr_pools, shutdown_ocr_pools
+from src.parser import Parser
+from src.browser_pool import BrowserPoolTimeout, get_browser_pool
 
 # Configure logging
 logging.basicConfig(
@@ -66,20 +71,97 @@ class ParseResponse(BaseModel):
     parsing_logs: Optional[Dict[str, Any]] = None  # Structured parsing logs with links found by each engine
 
 
+class BatchParseItem(BaseModel):
+    """One keyword of a batch; depth/source default to the batch values."""
+    keyword: str
+    depth: Optional[int] = None
+    source: Optional[str] = None
+    run_id: Optional[str] = None
+
+
+class BatchParseRequest(BaseModel):
+    """Request model for multi-keyword parsing."""
+    keywords: List[str] = []  # shorthand for items with default depth/source
+    items: List[BatchParseItem] = []
+    depth: int = 10
+    source: str = "google"
+    concurrency: Optional[int] = None  # capped by PARSE_BATCH_MAX_CONCURRENCY / browser pool size
+    format: str = "ndjson"  # "ndjson" or "sse"
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "ok"}
 
 
+@app.on_event("startup")
+async def start_browser_pool():
+    """Warm up browser pool so the first /parse does not pay the launch cost."""
+    if not settings.BROWSER_POOL_WARM_ON_STARTUP:
+        return
+    try:
+        await get_browser_pool().start()
+    except Exception as e:
+        # Chrome may not be up yet - the pool starts lazily on first request
+        logger.warning(f"Browser pool warm-up failed, will retry on first request: {e}")
+
+
+@app.on_event("shutdown")
+async def stop_browser_pool():
+    await get_browser_pool().close()
+
+
+@app.on_event("startup")
+async def preload_ocr_pool():
+    """Start OCR workers and load models so the first OCR does not pay the model load."""
+    if not settings.OCR_PRELOAD_ON_STARTUP:
+        return
+    try:
+        await asyncio.to_thread(get_ocr_pool("easyocr").start)
+    except Exception as e:
+        logger.warning(f"OCR worker pool preload failed, workers start on first request: {e}")
+
+
+@app.on_event("shutdown")
+async def stop_ocr_pools():
+    shutdown_ocr_pools()
+
+
+@app.get("/browser-pool/stats")
+async def browser_pool_stats():
+    """Browser pool slots, usage counters and recycle stats."""
+    return get_browser_pool().stats()
+
+
+@app.get("/ocr/stats")
+async def ocr_pool_stats():
+    """OCR worker pools: workers, queue, rejections and latency percentiles."""
+    return {name: pool.stats() for name, pool in ocr_pools().items()}
+
+
+@app.get("/ocr/health")
+async def ocr_pool_health():
+    """Round-trip a no-op task through every started OCR worker pool."""
+    pools = ocr_pools()
+    checks = {}
+    for name, pool in pools.items():
+        checks[name] = await asyncio.to_thread(pool.health)
+    return {"ok": all(c.get("ok") for c in checks.values()), "pools": checks}
+
+
 @app.post("/ocr/extract-text")
 async def ocr_extract_text(file: UploadFile = File(...)):
     content = await file.read()
     if not content:
         raise HTTPException(status_code=400, detail="Empty file")
     try:
-        text = smart_extract_text(file.filename or "file", content) or ""
+        with get_ocr_pool("easyocr").request():
+            # Blocking OCR (waits for pool workers) must not run on the event loop
+            text = await asyncio.to_thread(smart_extract_text, file.filename or "file", content) or ""
         return {"text": text}
+    except OcrQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OCR failed: {e}")
 
@@ -114,9 +196,7 @@ async def get_html_via_cdp(request: GetHtmlRequest):
     """
     import traceback
     import logging
-    import asyncio
     import sys
-    from concurrent.futures import ThreadPoolExecutor
     
     logger = logging.getLogger(__name__)
     
@@ -124,171 +204,34 @@ async def get_html_via_cdp(request: GetHtmlRequest):
         logger.info(f"=== GET HTML REQUEST === URL: {request.url}")
         logger.info(f"Platform: {sys.platform}, is Windows: {sys.platform == 'win32'}")
         
-        # On Windows, run in a separate thread with asyncio.run() to avoid NotImplementedError
-        if sys.platform == 'win32':
-            logger.info("Using Windows-specific HTML fetching in separate thread with asyncio.run()")
-            
-            def get_html_in_thread(url_param, chrome_cdp_url_param):
-                """Run HTML fetching in a separate thread with its own event loop."""
-                import asyncio
-                import sys
-                
-                # Set event loop policy for this thread
-                if sys.platform == 'win32':
-                    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-                
-                # Import here AFTER setting policy
-                import httpx
-                from playwright.async_api import async_playwright
-                from src.parser import Parser
-                
-                async def get_html_async():
-                    """Async function to get HTML via Chrome CDP."""
-                    import logging
-                    thread_logger = logging.getLogger(__name__)
-                    thread_logger.info(f"Starting get_html_async() for URL: {url_param}")
-                    
-                    # Get WebSocket URL from Chrome CDP
-                    thread_logger.info("Getting Chrome CDP WebSocket URL...")
-                    async with httpx.AsyncClient(timeout=5.0, trust_env=False) as client:
-                        response = await client.get(f"{chrome_cdp_url_param}/json/version")
-                        if response.status_code != 200:
-                            raise Exception(f"Chrome CDP returned status {response.status_code}")
-                        cdp_info = response.json()
-                        ws_url = cdp_info.get("webSocketDebuggerUrl")
-                        if not ws_url:
-                            raise Exception("No webSocketDebuggerUrl in CDP response")
-                        thread_logger.info(f"Got WebSocket URL: {ws_url}")
-                    
-                    # Start Playwright and connect to Chrome
-                    thread_logger.info("Starting Playwright...")
-                    playwright = await async_playwright().start()
-                    thread_logger.info("Playwright started, connecting to Chrome CDP...")
-                    connect_errors = []
-                    for connect_endpoint in (ws_url, chrome_cdp_url_param):
-                        try:
-                            thread_logger.info(f"Connecting to Chrome CDP via {connect_endpoint}...")
-                            browser = await playwright.chromium.connect_over_cdp(connect_endpoint, timeout=60000)
-                            break
-                        except Exception as connect_err:
-                            connect_errors.append((connect_endpoint, connect_err))
-                            thread_logger.warning(f"CDP connect failed for {connect_endpoint}: {connect_err}")
-                            await asyncio.sleep(1)
-                    else:
-                        error_summary = "; ".join([f"{endpoint}: {err}" for endpoint, err in connect_errors])
-                        raise Exception(f"All CDP connection attempts failed: {error_summary}")
-                    thread_logger.info("Connected to Chrome CDP successfully!")
-                    
-                    try:
-                        # Get browser contexts
-                        contexts = browser.contexts
-                        thread_logger.info(f"Found {len(contexts)} browser context(s)")
-                        
-                        # Select context based on profile index
-                        from src.config import settings
-                        profile_index = settings.CHROME_PROFILE_INDEX
-                        
-                        if len(contexts) == 0:
-                            thread_logger.warning("No existing contexts found, creating new context")
-                            context = await browser.new_context(
-                                viewport={"width": 1920, "height": 1080}
-                            )
-                        else:
-                            if 0 <= profile_index < len(contexts):
-                                context = contexts[profile_index]
-                                thread_logger.info(f"Using profile context at index {profile_index}")
-                            else:
-                                thread_logger.warning(f"Profile index {profile_index} out of range, using first context")
-                                context = contexts[0]
-                        
-                        # Set HTTP headers
-                        await context.set_extra_http_headers({
-                            'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                        })
-                        
-                        async def block_heavy_resources(route, request):
-                            if request.resource_type in {"image", "media", "font"}:
-                                await route.abort()
-                            else:
-                                await route.continue_()
-
-                        await context.route("**/*", block_heavy_resources)
-
-                        # Create page and navigate
-                        page = await context.new_page()
-                        try:
-                            thread_logger.info(f"Navigating to URL: {url_param}")
-                            await page.goto(url_param, wait_until="domcontentloaded", timeout=settings.page_load_timeout)
-                            
-                            # Simulate human behavior (small delay)
-                            await asyncio.sleep(0.3)
-                            
-                            # Get page content
-                            html = await page.content()
-                            title = await page.title()
-                            
-                            thread_logger.info(f"Successfully fetched HTML from {url_param}, length: {len(html)} chars")
-                            
-                            return {
-                                "url": url_param,
-                                "html": html,
-                                "title": title,
-                                "success": True,
-                                "error": None
-                            }
-                        finally:
-                            await page.close()
-                    finally:
-                        # Don't close browser, just disconnect
-                        await browser.close()
-                        await playwright.stop()
-                
-                # Use asyncio.run() to create a new event loop
-                return asyncio.run(get_html_async())
-            
-            # Run in a separate thread
-            current_loop = asyncio.get_running_loop()
-            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="get-html")
-            try:
-                logger.info("Running HTML fetching in separate thread with asyncio.run() (Windows)...")
-                result = await current_loop.run_in_executor(
-                    executor,
-                    get_html_in_thread,
-                    request.url,
-                    settings.CHROME_CDP_URL
-                )
-            finally:
-                executor.shutdown(wait=False)
-        else:
-            # Non-Windows: run normally
-            parser = Parser(settings.CHROME_CDP_URL)
-            await parser.connect_browser()
-            try:
-                # Use parse_page but only get HTML
-                page = await parser.context.new_page() if parser.context else await parser.browser.new_page()
+        pool = get_browser_pool()
+
+        async def get_html_async():
+            """Fetch HTML on a pooled context (runs on the pool's loop)."""
+            async with pool.lease() as lease:
+                page = await lease.new_page()
+
                 async def block_heavy_resources(route, request):
                     if request.resource_type in {"image", "media", "font"}:
                         await route.abort()
                     else:
                         await route.continue_()
+
                 await page.route("**/*", block_heavy_resources)
-                try:
-                    await page.goto(request.url, wait_until="domcontentloaded", timeout=settings.page_load_timeout)
-                    await asyncio.sleep(0.3)  # Small delay
-                    html = await page.content()
-                    title = await page.title()
-                    result = {
-                        "url": request.url,
-                        "html": html,
-                        "title": title,
-                        "success": True,
-                        "error": None
-                    }
-                finally:
-                    await page.close()
-            finally:
-                await parser.close()
+                await page.goto(request.url, wait_until="domcontentloaded", timeout=settings.page_load_timeout)
+                await asyncio.sleep(0.3)  # Small delay
+                html = await page.content()
+                title = await page.title()
+                logger.info(f"Successfully fetched HTML from {request.url}, length: {len(html)} chars")
+                return {
+                    "url": request.url,
+                    "html": html,
+                    "title": title,
+                    "success": True,
+                    "error": None
+                }
+
+        result = await pool.run(get_html_async())
         
         return GetHtmlResponse(**result)
         
@@ -318,367 +261,75 @@ async def get_html_via_cdp(request: GetHtmlRequest):
         )
 
 
-# Track running parse requests to prevent duplicates
-_running_parse_requests = set()
-# Create lock lazily to avoid issues with event loop
-_parse_lock = None
+# In-flight parses keyed by keyword/depth/source/run_id. A duplicate request awaits
+# the same task instead of getting an empty response (single-flight). run_id is part
+# of the key because the parse reports status and logs to that run: different runs
+# for the same keyword parse separately. Only touched from the app's event loop, so
+# no lock is needed.
+_inflight_parses: Dict[str, asyncio.Task] = {}
+
+
+def _parse_request_key(keyword: str, depth: int, source: Optional[str], run_id: Optional[str]) -> str:
+    return f"{keyword.strip().lower()}_{depth}_{str(source or 'google').strip().lower()}_{run_id or ''}"
+
+
+async def _run_pooled_parse(keyword: str, depth: int, source: str, run_id: Optional[str]):
+    """Parse one keyword on the browser pool; returns (suppliers, parsing_logs)."""
+    pool = get_browser_pool()
+    parser = Parser(settings.CHROME_CDP_URL, browser_pool=pool)
+    result_tuple = await pool.run(parser.parse_keyword(
+        keyword=keyword,
+        depth=depth,
+        source=source,
+        run_id=run_id
+    ))
+    # Handle both return formats (tuple with logs or just suppliers)
+    if isinstance(result_tuple, tuple) and len(result_tuple) == 2:
+        suppliers, parsing_logs = result_tuple
+    else:
+        suppliers = result_tuple if result_tuple else []
+        parsing_logs = {}
+    # Parser returns src.models.ParsedSupplier - convert to the response model
+    suppliers = [ParsedSupplier(**s.model_dump(include=set(ParsedSupplier.model_fields))) for s in suppliers]
+    return suppliers, parsing_logs
+
+
+async def parse_shared(keyword: str, depth: int, source: str, run_id: Optional[str] = None):
+    """Run a parse, joining an identical one already in flight."""
+    request_key = _parse_request_key(keyword, depth, source, run_id)
+    task = _inflight_parses.get(request_key)
+    if task is None:
+        task = asyncio.create_task(_run_pooled_parse(keyword, depth, source, run_id))
+        _inflight_parses[request_key] = task
+        task.add_done_callback(lambda _t: _inflight_parses.pop(request_key, None))
+        logger.info(f"[PARSE] Started '{request_key}' (in flight: {len(_inflight_parses)})")
+    else:
+        logger.info(f"[PARSE] Joining in-flight parse '{request_key}'")
+    # shield: a disconnected caller must not cancel a parse other callers await
+    return await asyncio.shield(task)
 
-def get_parse_lock():
-    """Get or create the parse lock."""
-    global _parse_lock
-    if _parse_lock is None:
-        try:
-            _parse_lock = asyncio.Lock()
-        except RuntimeError:
-            # If no event loop is running, create a new one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            _parse_lock = asyncio.Lock()
-    return _parse_lock
 
 @app.post("/parse", response_model=ParseResponse)
 async def parse_keyword(request: ParseRequest):
     """Parse suppliers for a keyword."""
     import traceback
     import logging
-    import asyncio
     import sys
-    from concurrent.futures import ThreadPoolExecutor
     
     logger = logging.getLogger(__name__)
     
-    # Create request key for duplicate detection (without timestamp - same key for same request)
-    request_key = f"{request.keyword}_{request.depth}_{request.source}"
-    
-    # CRITICAL: Use lock to prevent race conditions
-    parse_lock = get_parse_lock()
-    async with parse_lock:
-        # CRITICAL: Prevent duplicate execution using request_key
-        if request_key in _running_parse_requests:
-            logger.warning(f"[DUPLICATE DETECTED] Parse request for '{request_key}' is already running, skipping duplicate call")
-            # Return empty response for duplicate
-            return ParseResponse(
-                keyword=request.keyword,
-                suppliers=[],
-                total_found=0
-            )
-        
-        # Mark request as running IMMEDIATELY to prevent race conditions
-        _running_parse_requests.add(request_key)
-        logger.info(f"[DUPLICATE CHECK] Marked request '{request_key}' as running (total running: {len(_running_parse_requests)})")
-    
     try:
         logger.info(f"=== PARSE REQUEST === keyword: {request.keyword}, depth: {request.depth}, source: '{request.source}'")
         logger.info(f"Platform: {sys.platform}, is Windows: {sys.platform == 'win32'}")
         
-        # On Windows, run parsing in a separate thread with asyncio.run() to avoid NotImplementedError
-        # This is EXACTLY the same approach as test_browser_connection.py
-        if sys.platform == 'win32':
-            logger.info("Using Windows-specific parsing in separate thread with asyncio.run()")
-            def run_parsing_in_thread(keyword_param, depth_param, source_param, chrome_cdp_url_param, run_id_param=None):
-                """Run parsing in a separate thread with its own event loop using asyncio.run().
-                
-                This function runs ALL parsing operations in ONE asyncio.run() call,
-                just like test_browser_connection.py does. This ensures all Playwright
-                operations happen in the same event loop with the correct policy.
-                """
-                import asyncio
-                import sys
-                
-                # Set event loop policy for this thread (same as test_browser_connection.py)
-                # MUST be done BEFORE importing/using Playwright
-                if sys.platform == 'win32':
-                    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-                
-                # Import here AFTER setting policy to ensure Playwright uses correct policy
-                import httpx
-                from playwright.async_api import async_playwright
-                from src.engines import YandexEngine, GoogleEngine
-                from src.parser import Parser
-                from typing import Set, Dict
-                
-                async def parse_async():
-                    """Async function to run ALL parsing operations in one event loop."""
-                    import logging
-                    thread_logger = logging.getLogger(__name__)
-                    thread_logger.info("Starting parse_async() in thread with asyncio.run()")
-                    
-                    from src.config import settings
-
-                    thread_logger.info("Starting Playwright...")
-                    playwright = await async_playwright().start()
-
-                    browser = None
-                    context = None
-
-                    # Safe default: isolate browser. Only attach to user's Chrome if explicitly enabled.
-                    if not getattr(settings, "USE_CHROME_CDP", False):
-                        thread_logger.info("Launching isolated Chromium (USE_CHROME_CDP is disabled)")
-                        browser = await playwright.chromium.launch(headless=getattr(settings, "HEADLESS", True))
-                        context = await browser.new_context(viewport={"width": 1280, "height": 720})
-                    else:
-                        # Get WebSocket URL from Chrome CDP (same as test_browser_connection.py)
-                        thread_logger.info("Getting Chrome CDP WebSocket URL...")
-                        async with httpx.AsyncClient(timeout=5.0, trust_env=False) as client:
-                            response = await client.get(f"{chrome_cdp_url_param}/json/version")
-                            if response.status_code != 200:
-                                raise Exception(f"Chrome CDP returned status {response.status_code}")
-                            cdp_info = response.json()
-                            ws_url = cdp_info.get("webSocketDebuggerUrl")
-                            if not ws_url:
-                                raise Exception("No webSocketDebuggerUrl in CDP response")
-                            thread_logger.info(f"Got WebSocket URL: {ws_url}")
-
-                        thread_logger.info("Playwright started, connecting to Chrome CDP...")
-                        browser = await playwright.chromium.connect_over_cdp(ws_url, timeout=60000)
-                        thread_logger.info("Connected to Chrome CDP successfully!")
-                    
-                    try:
-                        if context is None:
-                            # CDP branch: get existing contexts
-                            contexts = browser.contexts
-                            thread_logger.info(f"Found {len(contexts)} browser context(s)")
-
-                            profile_index = settings.CHROME_PROFILE_INDEX
-                            if len(contexts) == 0:
-                                thread_logger.warning("No existing contexts found, creating new context")
-                                context = await browser.new_context(viewport={"width": 800, "height": 600})
-                            else:
-                                if 0 <= profile_index < len(contexts):
-                                    context = contexts[profile_index]
-                                    thread_logger.info(f"Using profile context at index {profile_index} (profile #{profile_index + 1})")
-                                else:
-                                    thread_logger.warning(
-                                        f"Profile index {profile_index} is out of range (0-{len(contexts)-1}), "
-                                        f"using first context (profile #1)"
-                                    )
-                                    context = contexts[0]
-                        
-                        # Set HTTP headers
-                        await context.set_extra_http_headers({
-                            'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                        })
-                        
-                        # Now run the actual parsing logic
-                        parser = Parser(chrome_cdp_url_param)
-                        # Set browser, playwright, and context directly to avoid re-connecting
-                        parser.browser = browser
-                        parser.playwright = playwright
-                        parser.context = context
-                        parser._playwright_started = True
-                        
-                        # Engines already imported above
-                        
-                        # Use depth directly from request parameter
-                        depth = depth_param
-                        thread_logger.info(f"Using depth={depth} for parsing (requested: {depth_param})")
-                        
-                        # Prepare query
-                        query = f"{keyword_param} купить"
-                        
-                        # Normalize source parameter (lowercase, strip whitespace)
-                        source_normalized = str(source_param).lower().strip() if source_param else "google"
-                        thread_logger.info(f"=== CREATING PAGES === Query: {query}, source (original): '{source_param}', source (normalized): '{source_normalized}', depth: {depth}")
-                        
-                        # Collect links from search engines with source tracking
-                        # Use dict to track which source(s) found each URL
-                        collected_links: Dict[str, Set[str]] = {}  # URL -> set of sources (google, yandex)
-                        
-                        # Run search engines in parallel (same approach as parser.py)
-                        tasks = []
-                        
-                        # Create pages only for requested sources - USE STRICT EQUALITY TO PREVENT DUPLICATES
-                        # Get current active page to restore focus later (if exists)
-                        current_active_page = None
-                        try:
-                            # Try to get the currently active page in the context
-                            pages = context.pages
-                            if pages:
-                                # Find the page that is currently active (has focus)
-                                for p in pages:
-                                    try:
-                                        # Check if page is still valid and active
-                                        if p.url and p.url != "about:blank":
-                                            current_active_page = p
-                                            break
-                                    except:
-                                        pass
-                        except:
-                            pass
-                        
-                        # Initialize parsing logs structure
-                        parsing_logs = {}
-                        
-                        if source_normalized == "yandex":
-                            thread_logger.info(">>> Creating ONLY Yandex page (source=yandex)")
-                            yandex_page = await context.new_page()
-                            thread_logger.info(f">>> Yandex page created")
-                            # Возвращаем фокус на предыдущую активную страницу (если она есть)
-                            if current_active_page:
-                                try:
-                                    await current_active_page.bring_to_front()
-                                except:
-                                    pass
-                            yandex_engine = YandexEngine()
-                            tasks.append(yandex_engine.parse(yandex_page, query, depth, collected_links, run_id_param, keyword_param, parsing_logs))
-                        elif source_normalized == "google":
-                            thread_logger.info(">>> Creating ONLY Google page (source=google)")
-                            google_page = await context.new_page()
-                            thread_logger.info(f">>> Google page created")
-                            # Возвращаем фокус на предыдущую активную страницу (если она есть)
-                            if current_active_page:
-                                try:
-                                    await current_active_page.bring_to_front()
-                                except:
-                                    pass
-                            google_engine = GoogleEngine()
-                            tasks.append(google_engine.parse(google_page, query, depth, collected_links, run_id_param, keyword_param, parsing_logs))
-                        elif source_normalized == "both":
-                            thread_logger.info(">>> Creating BOTH Yandex and Google pages (source=both)")
-                            yandex_page = await context.new_page()
-                            thread_logger.info(f">>> Yandex page created")
-                            google_page = await context.new_page()
-                            thread_logger.info(f">>> Google page created")
-                            # Возвращаем фокус на предыдущую активную страницу (если она есть)
-                            if current_active_page:
-                                try:
-                                    await current_active_page.bring_to_front()
-                                except:
-                                    pass
-                            yandex_engine = YandexEngine()
-                            tasks.append(yandex_engine.parse(yandex_page, query, depth, collected_links, run_id_param, keyword_param, parsing_logs))
-                            google_engine = GoogleEngine()
-                            tasks.append(google_engine.parse(google_page, query, depth, collected_links, run_id_param, keyword_param, parsing_logs))
-                        else:
-                            # Default to Google if source is invalid
-                            thread_logger.warning(f">>> Invalid source '{source_normalized}', defaulting to Google")
-                            google_page = await context.new_page()
-                            thread_logger.info(f">>> Google page created (default)")
-                            # Возвращаем фокус на предыдущую активную страницу (если она есть)
-                            if current_active_page:
-                                try:
-                                    await current_active_page.bring_to_front()
-                                except:
-                                    pass
-                            google_engine = GoogleEngine()
-                            tasks.append(google_engine.parse(google_page, query, depth, collected_links, run_id_param, keyword_param, parsing_logs))
-                        
-                        thread_logger.info(f">>> TOTAL: Created {len(tasks)} task(s) for parsing")
-                        
-                        # Wait for all search engines to complete
-                        if tasks:
-                            thread_logger.info(f">>> [LOGS] About to start periodic logs sending for run_id: {run_id_param}")
-                            # Запускаем задачи и периодически отправляем логи в backend
-                            # Создаем задачу для периодической отправки логов
-                            async def send_logs_periodically():
-                                """Периодически отправляет логи в backend во время парсинга."""
-                                send_count = 0
-                                thread_logger.info(f"Starting periodic logs sending for run_id: {run_id_param}")
-                                try:
-                                    while True:
-                                        await asyncio.sleep(2.5)  # Синхронизировано с rate limiting (2.5 сек)
-                                        if parsing_logs:
-                                            send_count += 1
-                                            thread_logger.info(f"Attempting to send logs (attempt #{send_count}) for run_id: {run_id_param}")
-                                            await parser._send_parsing_logs(run_id_param, parsing_logs)
-                                        else:
-                                            thread_logger.debug(f"No logs to send yet for run_id: {run_id_param}")
-                                except asyncio.CancelledError:
-                                    thread_logger.info(f"Periodic logs sending cancelled for run_id: {run_id_param}, total attempts: {send_count}")
-                                    raise
-                                except Exception as e:
-                                    thread_logger.error(f"Error in periodic logs sending for run_id: {run_id_param}: {e}", exc_info=True)
-                            
-                            # Запускаем задачу отправки логов в фоне
-                            logs_task = asyncio.create_task(send_logs_periodically())
-                            
-                            try:
-                                # Ждем завершения парсинга
-                                await asyncio.gather(*tasks)
-                            finally:
-                                # Отменяем задачу отправки логов и отправляем финальные логи
-                                logs_task.cancel()
-                                try:
-                                    await logs_task
-                                except asyncio.CancelledError:
-                                    pass
-                                # Отправляем финальные логи
-                                if parsing_logs:
-                                    await parser._send_parsing_logs(run_id_param, parsing_logs)
-                        
-                        # Return only collected URLs without parsing pages
-                        # Convert collected links to supplier-like format (only URLs, no page parsing)
-                        suppliers = []
-                        for url, sources in collected_links.items():  # No limit - return all collected URLs
-                            # Extract domain from URL
-                            from urllib.parse import urlparse
-                            parsed_url = urlparse(url)
-                            domain = parsed_url.netloc.replace("www.", "")
-                            
-                            # Determine source: "google", "yandex", or "both"
-                            url_source = "both" if len(sources) > 1 else list(sources)[0] if sources else "google"
-                            
-                            suppliers.append(ParsedSupplier(
-                                name=domain,  # Use domain as name since we don't parse pages
-                                domain=domain,
-                                email=None,
-                                phone=None,
-                                inn=None,
-                                source_url=url,
-                                source=url_source  # Add source information
-                            ))
-                        
-                        # Return suppliers with parsing logs
-                        return suppliers, parsing_logs
-                    finally:
-                        # Clean up
-                        if browser:
-                            await browser.close()
-                        if playwright:
-                            await playwright.stop()
-                
-                # Use asyncio.run() to create a new event loop with the correct policy
-                # This is EXACTLY the same approach as test_browser_connection.py
-                return asyncio.run(parse_async())
-            
-            # Run parsing in a separate thread
-            current_loop = asyncio.get_running_loop()
-            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parsing")
-            try:
-                logger.info("Running parsing in separate thread with asyncio.run() (Windows)...")
-                result_tuple = await current_loop.run_in_executor(
-                    executor,
-                    run_parsing_in_thread,
-                    request.keyword,
-                    request.depth,
-                    request.source,
-                    settings.CHROME_CDP_URL,
-                    request.run_id
-                )
-                # Handle both return formats (tuple with logs or just suppliers)
-                if isinstance(result_tuple, tuple) and len(result_tuple) == 2:
-                    suppliers, parsing_logs = result_tuple
-                else:
-                    suppliers = result_tuple if result_tuple else []
-                    parsing_logs = {}
-            finally:
-                executor.shutdown(wait=False)
-        else:
-            # Non-Windows: run normally
-            parser = Parser(settings.CHROME_CDP_URL)
-            result_tuple = await parser.parse_keyword(
-                keyword=request.keyword,
-                depth=request.depth,
-                source=request.source,
-                run_id=request.run_id
-            )
-            # Handle both return formats (tuple with logs or just suppliers)
-            if isinstance(result_tuple, tuple) and len(result_tuple) == 2:
-                suppliers, parsing_logs = result_tuple
-            else:
-                suppliers = result_tuple if result_tuple else []
-                parsing_logs = {}
+        # Parsing runs on a warm browser from the pool (on Windows the pool lives
+        # on its own Proactor loop thread, so no thread/asyncio.run() per request)
+        suppliers, parsing_logs = await parse_shared(
+            keyword=request.keyword,
+            depth=request.depth,
+            source=request.source,
+            run_id=request.run_id
+        )
         
         logger.info(f"Parse completed: found {len(suppliers)} suppliers")
         result = ParseResponse(
@@ -691,6 +342,12 @@ async def parse_keyword(request: ParseRequest):
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except BrowserPoolTimeout as e:
+        logger.warning(f"Browser pool exhausted in parse_keyword: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e)
+        )
     except httpx.ConnectError as e:
         # Connection error to Chrome CDP or other services
         error_message = f"Cannot connect to Chrome CDP at {settings.CHROME_CDP_URL}. Please ensure Chrome is running with --remote-debugging-port=9222. Error: {str(e)}"
@@ -739,10 +396,143 @@ async def parse_keyword(request: ParseRequest):
             status_code=500,
             detail=detail_message
         )
-    finally:
-        # Always remove from running requests, even on error
-        parse_lock = get_parse_lock()
-        async with parse_lock:
-            _running_parse_requests.discard(request_key)
-            logger.info(f"[DUPLICATE CHECK] Removed request '{request_key}' from running requests (remaining: {len(_running_parse_requests)})")
 
+
+@app.post("/parse/stream")
+async def parse_keyword_stream(request: ParseRequest):
+    """Parse one keyword and stream found URLs per search results page (NDJSON).
+
+    Events:
+        {"event": "links", "engine", "page", "links": [{"url", "domain", "source"}]}
+        {"event": "done", "keyword", "suppliers", "total_found", "parsing_logs"}
+        {"event": "error", "error"}
+
+    Unlike /parse this does not join an identical in-flight request: every
+    stream needs its own per-page events.
+    """
+    logger.info(f"=== PARSE STREAM === keyword: {request.keyword}, depth: {request.depth}, source: '{request.source}'")
+    app_loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def on_links(event: Dict[str, Any]) -> None:
+        # Called on the browser pool loop (its own thread on Windows)
+        app_loop.call_soon_threadsafe(events.put_nowait, event)
+
+    async def run_parse() -> None:
+        try:
+            pool = get_browser_pool()
+            parser = Parser(settings.CHROME_CDP_URL, browser_pool=pool)
+            suppliers, parsing_logs = await pool.run(parser.parse_keyword(
+                keyword=request.keyword,
+                depth=request.depth,
+                source=request.source,
+                run_id=request.run_id,
+                on_links=on_links,
+            ))
+            suppliers = [s.model_dump(include=set(ParsedSupplier.model_fields)) for s in suppliers]
+            await events.put({
+                "event": "done",
+                "keyword": request.keyword,
+                "suppliers": suppliers,
+                "total_found": len(suppliers),
+                "parsing_logs": parsing_logs or None,
+            })
+        except Exception as e:
+            logger.error(f"Error in parse_keyword_stream: {type(e).__name__}: {e}", exc_info=True)
+            await events.put({"event": "error", "error": f"{type(e).__name__}: {e}"})
+
+    async def stream():
+        task = asyncio.create_task(run_parse())
+        try:
+            while True:
+                event = await events.get()
+                yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+                if event["event"] in ("done", "error"):
+                    break
+        finally:
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+
+def _batch_event(payload: Dict[str, Any], stream_format: str) -> str:
+    data = json.dumps(payload, ensure_ascii=False, default=str)
+    if stream_format == "sse":
+        return f"event: {payload.get('event', 'result')}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+@app.post("/parse/batch")
+async def parse_keywords_batch(request: BatchParseRequest):
+    """Parse many keywords concurrently and stream per-keyword results.
+
+    Keywords are scheduled across the browser pool (at most `concurrency` at
+    once) and each result is written as soon as its keyword finishes, as NDJSON
+    lines or SSE events. The last event is {"event": "done", ...}.
+    """
+    items = [BatchParseItem(keyword=k) for k in request.keywords] + list(request.items)
+    items = [item for item in items if item.keyword and item.keyword.strip()]
+    if not items:
+        raise HTTPException(status_code=400, detail="No keywords to parse")
+    if len(items) > settings.PARSE_BATCH_MAX_KEYWORDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many keywords: {len(items)} (max {settings.PARSE_BATCH_MAX_KEYWORDS})"
+        )
+    stream_format = (request.format or "ndjson").strip().lower()
+    if stream_format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+
+    pool = get_browser_pool()
+    concurrency = min(
+        request.concurrency or pool.size,
+        settings.PARSE_BATCH_MAX_CONCURRENCY,
+        pool.size,
+    )
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    logger.info(f"=== PARSE BATCH === keywords: {len(items)}, concurrency: {concurrency}, format: {stream_format}")
+
+    async def parse_item(index: int, item: BatchParseItem) -> Dict[str, Any]:
+        depth = item.depth or request.depth
+        source = item.source or request.source
+        base = {"event": "result", "index": index, "keyword": item.keyword, "depth": depth, "source": source, "run_id": item.run_id}
+        async with semaphore:
+            try:
+                suppliers, parsing_logs = await parse_shared(item.keyword, depth, source, item.run_id)
+            except Exception as e:
+                logger.warning(f"Batch parse failed for '{item.keyword}': {type(e).__name__}: {e}")
+                return {**base, "status": "error", "error": f"{type(e).__name__}: {e}", "suppliers": [], "total_found": 0}
+        return {
+            **base,
+            "status": "ok",
+            "suppliers": [supplier.model_dump() for supplier in suppliers],
+            "total_found": len(suppliers),
+            "parsing_logs": parsing_logs or None,
+        }
+
+    async def stream():
+        tasks = [asyncio.create_task(parse_item(i, item)) for i, item in enumerate(items)]
+        failed = 0
+        total_found = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result["status"] == "error":
+                    failed += 1
+                total_found += result["total_found"]
+                yield _batch_event(result, stream_format)
+            yield _batch_event({
+                "event": "done",
+                "keywords": len(items),
+                "failed": failed,
+                "total_found": total_found,
+            }, stream_format)
+        finally:
+            # Client went away: drop keywords not started yet (shared parses keep running)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type, headers={"Cache-Control": "no-cache"})
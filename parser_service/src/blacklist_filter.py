@@ -0,0 +1,110 @@
+"""Blacklist filter for collected search results.
+
+URLs of blacklisted domains (and their subdomains) are skipped by the engines at
+collection time, so they are neither streamed to the backend nor returned by
+/parse. The domain list comes from the backend (GET /parsing/blacklist-index,
+backed by app.services.blacklist_index) and is kept as a reversed-label suffix
+trie: "example.ru" blacklisted matches "example.ru", "www.example.ru" and
+"shop.example.ru", but not "myexample.ru".
+
+The list is refreshed at most every BLACKLIST_REFRESH_SEC, only when the
+backend's version changed. If the backend is unreachable the last loaded list
+stays in use (empty at first start); the backend filters again before insert.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TERMINAL = ""  # key of a trie node that ends a blacklisted domain
+
+
+def _labels(url_or_host: str) -> List[str]:
+    value = (url_or_host or "").strip().lower()
+    if "://" in value:
+        value = urlparse(value).netloc
+    value = value.split("/", 1)[0].rsplit("@", 1)[-1].split(":", 1)[0]
+    return [label for label in reversed(value.split(".")) if label]
+
+
+class BlacklistFilter:
+    """Suffix trie of blacklisted domains synced from the backend."""
+
+    def __init__(self, refresh_seconds: float = 60.0):
+        self.refresh_seconds = max(0.0, float(refresh_seconds))
+        self._root: Dict[str, dict] = {}
+        self._size = 0
+        self._lock = asyncio.Lock()
+        self.version: Optional[int] = None
+        self._checked_at: Optional[float] = None
+        self.skipped = 0  # URLs skipped since start
+
+    def _rebuild(self, domains: Iterable[str]) -> None:
+        root: Dict[str, dict] = {}
+        size = 0
+        for domain in domains:
+            labels = _labels(domain)
+            if not labels:
+                continue
+            node = root
+            for label in labels:
+                node = node.setdefault(label, {})
+            if _TERMINAL not in node:
+                node[_TERMINAL] = True
+                size += 1
+        self._root, self._size = root, size
+
+    async def refresh_if_stale(self) -> None:
+        """Fetch the blacklist from the backend if refresh_seconds passed since the last check."""
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+                return
+            self._checked_at = time.monotonic()
+            params = {"version": self.version} if self.version is not None else None
+            try:
+                async with httpx.AsyncClient(base_url=settings.BACKEND_URL, timeout=5.0, trust_env=False) as client:
+                    response = await client.get("/parsing/blacklist-index", params=params)
+                    response.raise_for_status()
+                    data = response.json()
+            except Exception as e:
+                logger.warning(f"Blacklist refresh failed, keeping {self._size} domains: {type(e).__name__}: {e}")
+                return
+            if data.get("changed", True):
+                self._rebuild(data.get("domains") or [])
+                logger.info(f"Blacklist loaded: {self._size} domains, version={data.get('version')}")
+            self.version = data.get("version")
+
+    def is_blocked(self, url: str) -> bool:
+        """True if the URL's host is a blacklisted domain or its subdomain."""
+        node = self._root
+        for label in _labels(url):
+            node = node.get(label)
+            if node is None:
+                return False
+            if _TERMINAL in node:
+                self.skipped += 1
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self._size
+
+
+_filter_instance: Optional[BlacklistFilter] = None
+
+
+def get_blacklist_filter() -> BlacklistFilter:
+    """Get blacklist filter instance"""
+    global _filter_instance
+    if _filter_instance is None:
+        _filter_instance = BlacklistFilter(refresh_seconds=settings.BLACKLIST_REFRESH_SEC)
+    return _filter_instance
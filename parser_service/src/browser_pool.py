@@ -0,0 +1,382 @@
+"""Pool of warm browser contexts shared by parsing requests.
+
+Instead of launching (or CDP-attaching) Chromium for every /parse call, the
+service keeps BROWSER_POOL_SIZE slots alive for its whole lifetime. A request
+checks out a slot, opens its engine pages through the lease and checks the slot
+back in; the lease closes its pages on check-in.
+
+Slots are health-checked on checkout and recycled (browser relaunched) after
+BROWSER_POOL_MAX_PAGES pages or when the JS heap of a leased page grows over
+BROWSER_POOL_MAX_HEAP_MB.
+
+With USE_CHROME_CDP=True all slots share one CDP connection and the selected
+profile context of the user's Chrome - the pool only bounds how many requests
+work in that window at once and never closes the user's browser.
+
+On Windows Playwright needs a Proactor event loop, so the pool runs on one
+dedicated long-lived loop thread and coroutines are submitted with run().
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Dict, List, Optional
+
+import httpx
+from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+EXTRA_HTTP_HEADERS = {
+    'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+}
+
+# usedJSHeapSize is Chromium-only; 0 if unavailable
+_JS_HEAP_SCRIPT = "() => (performance && performance.memory) ? performance.memory.usedJSHeapSize : 0"
+
+
+class BrowserPoolTimeout(Exception):
+    """No browser slot became free within BROWSER_POOL_ACQUIRE_TIMEOUT."""
+
+
+class BrowserSlot:
+    """One warm browser context (own Chromium, or the shared CDP profile context)."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
+        self.pages_served = 0
+        self.peak_heap_bytes = 0
+        self.recycles = 0
+        self.started_at: Optional[float] = None
+        self.busy = False
+
+    def is_healthy(self) -> bool:
+        return self.browser is not None and self.context is not None and self.browser.is_connected()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "busy": self.busy,
+            "healthy": self.is_healthy(),
+            "pages_served": self.pages_served,
+            "peak_heap_mb": round(self.peak_heap_bytes / (1024 * 1024), 1),
+            "recycles": self.recycles,
+            "uptime_sec": int(time.time() - self.started_at) if self.started_at else None,
+        }
+
+
+class BrowserLease:
+    """Checked-out slot. Pages opened through new_page() are closed on check-in."""
+
+    def __init__(self, slot: BrowserSlot):
+        self.slot = slot
+        self.pages: List[Page] = []
+
+    @property
+    def browser(self) -> Browser:
+        return self.slot.browser
+
+    @property
+    def context(self) -> BrowserContext:
+        return self.slot.context
+
+    async def new_page(self) -> Page:
+        page = await self.slot.context.new_page()
+        self.pages.append(page)
+        self.slot.pages_served += 1
+        return page
+
+    async def release_pages(self) -> None:
+        """Sample JS heap of leased pages and close them."""
+        for page in self.pages:
+            try:
+                if page.is_closed():
+                    continue
+                heap = await page.evaluate(_JS_HEAP_SCRIPT)
+                self.slot.peak_heap_bytes = max(self.slot.peak_heap_bytes, int(heap or 0))
+            except Exception:
+                pass
+            try:
+                await page.close()
+            except Exception as e:
+                logger.debug(f"Error closing leased page: {e}")
+        self.pages.clear()
+
+
+class BrowserPool:
+    """Fixed-size pool of warm browser slots with checkout/checkin."""
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_pages: int = 200,
+        max_heap_mb: int = 512,
+        acquire_timeout: float = 300.0,
+        use_cdp: bool = False,
+        cdp_url: str = "http://127.0.0.1:9222",
+        headless: bool = True,
+        dedicated_loop: Optional[bool] = None,
+    ):
+        self.size = max(1, int(size))
+        self.max_pages = max(0, int(max_pages))
+        self.max_heap_bytes = max(0, int(max_heap_mb)) * 1024 * 1024
+        self.acquire_timeout = float(acquire_timeout)
+        self.use_cdp = use_cdp
+        self.cdp_url = cdp_url
+        self.headless = headless
+        self.dedicated_loop = (sys.platform == "win32") if dedicated_loop is None else dedicated_loop
+
+        self._slots: List[BrowserSlot] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._playwright = None
+        self._cdp_browser: Optional[Browser] = None
+        self._cdp_lock: Optional[asyncio.Lock] = None
+        self._started = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._waiting = 0
+        self._total_leases = 0
+
+    @classmethod
+    def from_settings(cls) -> "BrowserPool":
+        return cls(
+            size=settings.BROWSER_POOL_SIZE,
+            max_pages=settings.BROWSER_POOL_MAX_PAGES,
+            max_heap_mb=settings.BROWSER_POOL_MAX_HEAP_MB,
+            acquire_timeout=settings.BROWSER_POOL_ACQUIRE_TIMEOUT,
+            use_cdp=settings.USE_CHROME_CDP,
+            cdp_url=settings.CHROME_CDP_URL,
+            headless=settings.HEADLESS,
+        )
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    # ---- event loop dispatch -------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Loop the pool (and all Playwright objects) lives on."""
+        if self._loop is not None:
+            return self._loop
+        if not self.dedicated_loop:
+            self._loop = asyncio.get_running_loop()
+            return self._loop
+
+        ready = threading.Event()
+
+        def _loop_main():
+            loop = asyncio.ProactorEventLoop() if sys.platform == "win32" else asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self._loop = loop
+            ready.set()
+            loop.run_forever()
+
+        self._loop_thread = threading.Thread(target=_loop_main, name="browser-pool", daemon=True)
+        self._loop_thread.start()
+        ready.wait()
+        logger.info("Browser pool runs on dedicated event loop thread")
+        return self._loop
+
+    async def run(self, coro: Awaitable[Any]) -> Any:
+        """Await coro on the pool's loop (dedicated thread on Windows)."""
+        loop = self._ensure_loop()
+        if loop is asyncio.get_running_loop():
+            return await coro
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        return await asyncio.wrap_future(future)
+
+    # ---- lifecycle -----------------------------------------------------------
+
+    async def start(self) -> None:
+        """Start Playwright and warm up all slots."""
+        await self.run(self._start())
+
+    async def close(self) -> None:
+        """Close all slots and stop Playwright."""
+        if self._loop is None:
+            return
+        await self.run(self._close())
+        if self._loop_thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5)
+            self._loop_thread = None
+            self._loop = None
+
+    async def _start(self) -> None:
+        if self._started:
+            return
+        self._idle = asyncio.Queue()
+        self._cdp_lock = asyncio.Lock()
+        self._playwright = await async_playwright().start()
+        self._slots = [BrowserSlot(i) for i in range(self.size)]
+        for slot in self._slots:
+            try:
+                await self._open_slot(slot)
+            except Exception as e:
+                # Slot stays unhealthy and is reopened on first checkout
+                logger.warning(f"Browser pool slot {slot.index} warm-up failed: {e}")
+            self._idle.put_nowait(slot)
+        self._started = True
+        logger.info(f"Browser pool started: size={self.size}, mode={'cdp' if self.use_cdp else 'chromium'}")
+
+    async def _close(self) -> None:
+        for slot in self._slots:
+            await self._close_slot(slot)
+        if self._cdp_browser is not None:
+            try:
+                # For CDP this only disconnects; user's Chrome keeps running
+                await self._cdp_browser.close()
+            except Exception as e:
+                logger.debug(f"Error disconnecting from Chrome CDP: {e}")
+            self._cdp_browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"Error stopping Playwright: {e}")
+            self._playwright = None
+        self._slots = []
+        self._started = False
+        logger.info("Browser pool closed")
+
+    # ---- slots ---------------------------------------------------------------
+
+    async def _resolve_cdp_endpoint(self) -> str:
+        async with httpx.AsyncClient(timeout=5.0, trust_env=False) as client:
+            response = await client.get(f"{self.cdp_url}/json/version")
+            if response.status_code != 200:
+                raise Exception(
+                    f"Chrome CDP returned status {response.status_code}. "
+                    f"Make sure Chrome is running with --remote-debugging-port=9222"
+                )
+            return response.json().get("webSocketDebuggerUrl") or self.cdp_url
+
+    async def _get_cdp_browser(self) -> Browser:
+        """Shared CDP connection, reconnected if it dropped."""
+        async with self._cdp_lock:
+            if self._cdp_browser is None or not self._cdp_browser.is_connected():
+                endpoint = await self._resolve_cdp_endpoint()
+                logger.info(f"Browser pool connecting to Chrome CDP at {endpoint}")
+                self._cdp_browser = await self._playwright.chromium.connect_over_cdp(endpoint, timeout=60000)
+            return self._cdp_browser
+
+    async def _open_slot(self, slot: BrowserSlot) -> None:
+        if self.use_cdp:
+            browser = await self._get_cdp_browser()
+            contexts = browser.contexts
+            profile_index = settings.CHROME_PROFILE_INDEX
+            if not contexts:
+                logger.warning("No existing browser contexts found, creating new one")
+                context = await browser.new_context(viewport={"width": 800, "height": 600})
+            elif 0 <= profile_index < len(contexts):
+                context = contexts[profile_index]
+            else:
+                logger.warning(
+                    f"Profile index {profile_index} is out of range (0-{len(contexts)-1}), "
+                    f"using first context (profile #1)"
+                )
+                context = contexts[0]
+        else:
+            browser = await self._playwright.chromium.launch(headless=self.headless)
+            context = await browser.new_context(viewport={"width": 1280, "height": 720})
+        await context.set_extra_http_headers(EXTRA_HTTP_HEADERS)
+
+        slot.browser = browser
+        slot.context = context
+        slot.pages_served = 0
+        slot.peak_heap_bytes = 0
+        slot.started_at = time.time()
+
+    async def _close_slot(self, slot: BrowserSlot) -> None:
+        # Shared CDP context belongs to the user's Chrome - never close it
+        if not self.use_cdp and slot.browser is not None:
+            try:
+                await slot.browser.close()
+            except Exception as e:
+                logger.debug(f"Error closing browser of slot {slot.index}: {e}")
+        slot.browser = None
+        slot.context = None
+
+    def _needs_recycle(self, slot: BrowserSlot) -> Optional[str]:
+        if self.max_pages and slot.pages_served >= self.max_pages:
+            return f"served {slot.pages_served} pages"
+        if self.max_heap_bytes and slot.peak_heap_bytes >= self.max_heap_bytes:
+            return f"JS heap {slot.peak_heap_bytes // (1024 * 1024)} MB"
+        return None
+
+    async def _recycle(self, slot: BrowserSlot, reason: str) -> None:
+        logger.info(f"Recycling browser pool slot {slot.index}: {reason}")
+        await self._close_slot(slot)
+        slot.recycles += 1
+        await self._open_slot(slot)
+
+    # ---- checkout / checkin --------------------------------------------------
+
+    @asynccontextmanager
+    async def lease(self):
+        """Check out a healthy slot for the duration of the block.
+
+        Must be used on the pool's loop (wrap the caller with run()).
+        """
+        if not self._started:
+            await self._start()
+
+        self._waiting += 1
+        try:
+            slot: BrowserSlot = await asyncio.wait_for(self._idle.get(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise BrowserPoolTimeout(
+                f"No free browser in pool (size={self.size}) after {self.acquire_timeout:.0f}s"
+            )
+        finally:
+            self._waiting -= 1
+
+        lease = BrowserLease(slot)
+        slot.busy = True
+        try:
+            if not slot.is_healthy():
+                await self._recycle(slot, "health check failed")
+            self._total_leases += 1
+            yield lease
+        finally:
+            await lease.release_pages()
+            reason = self._needs_recycle(slot)
+            if reason:
+                try:
+                    await self._recycle(slot, reason)
+                except Exception as e:
+                    # Reopened on next checkout by the health check
+                    logger.warning(f"Failed to recycle browser pool slot {slot.index}: {e}")
+            slot.busy = False
+            self._idle.put_nowait(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self._started,
+            "size": self.size,
+            "mode": "cdp" if self.use_cdp else "chromium",
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "waiting": self._waiting,
+            "total_leases": self._total_leases,
+            "slots": [slot.to_dict() for slot in self._slots],
+        }
+
+
+# Singleton instance (started from api.py startup event)
+_pool_instance: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get browser pool instance"""
+    global _pool_instance
+    if _pool_instance is None:
+        _pool_instance = BrowserPool.from_settings()
+    return _pool_instance
@@ -22,8 +22,30 @@ class Settings(BaseSettings):
     page_load_timeout: int = 30000  # 30 seconds
     navigation_timeout: int = 60000  # 60 seconds
     
+    # Browser pool (warm browsers reused across /parse requests)
+    BROWSER_POOL_SIZE: int = 2  # concurrent browser slots
+    BROWSER_POOL_MAX_PAGES: int = 200  # recycle slot after N pages (0 = never)
+    BROWSER_POOL_MAX_HEAP_MB: int = 512  # recycle slot when page JS heap exceeds this (0 = never)
+    BROWSER_POOL_ACQUIRE_TIMEOUT: float = 300.0  # seconds to wait for a free slot
+    BROWSER_POOL_WARM_ON_STARTUP: bool = True
+
+    # POST /parse/batch
+    PARSE_BATCH_MAX_KEYWORDS: int = 200
+    PARSE_BATCH_MAX_CONCURRENCY: int = 4  # also capped by BROWSER_POOL_SIZE
+
+    # OCR worker pool (process pool, one resident OCR model per worker; pages of PDFs run in parallel)
+    OCR_PAGE_WORKERS: int = 4  # 0 = OCR in the service process, pages one by one
+    OCR_PRELOAD_ON_STARTUP: bool = False  # start workers and load EasyOCR models at service start
+    OCR_MAX_PENDING_REQUESTS: int = 16  # /ocr/extract-text requests in flight before 429 (0 = unlimited)
+    OCR_THREADS_PER_WORKER: int = 0  # torch/BLAS threads per worker, 0 = cpu_count // workers
+    OCR_PAGE_ZOOM: float = 2.0  # page render scale for OCR (2.0 = 144 dpi)
+    PDF_TEXT_LAYER_MIN_CHARS: int = 20  # page with a shorter text layer (and images) is OCR'ed
+
     # Backend URL for status updates
     BACKEND_URL: str = "http://127.0.0.1:8000"
+    # Blacklisted domains are skipped at collection time (list from backend /parsing/blacklist-index)
+    BLACKLIST_FILTER_ENABLED: bool = True
+    BLACKLIST_REFRESH_SEC: float = 60.0
     
     model_config = SettingsConfigDict(
         env_file=".env",
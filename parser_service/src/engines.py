@@ -2,12 +2,14 @@
 import asyncio
 import logging
 import time
-from typing import Set, List, Optional, Dict, Any
-from datetime import datetime
+import urllib.parse
+from typing import Set, List, Optional, Dict, Any, Awaitable, Callable
 from playwright.async_api import Page
+from .blacklist_filter import get_blacklist_filter
+from .config import settings
+from .parsing_stats import ParsingStats
 from .human_behavior import (
     human_pause,
-    very_human_behavior,
     light_human_behavior,
     wait_for_captcha,
     apply_stealth,
@@ -15,6 +17,20 @@ from .human_behavior import (
 
 logger = logging.getLogger(__name__)
 
+# Callback for streaming results: (engine, page number, URLs new for this engine on that page,
+# url -> {"title", "rank"})
+PageLinksCallback = Callable[[str, int, List[str], Dict[str, Dict[str, Any]]], Awaitable[None]]
+
+# Collects href attribute (raw, e.g. Google "/url?q=..."), text and DOM position of
+# every matched link in ONE round trip instead of nth(i).get_attribute per link
+_EXTRACT_LINKS_JS = """
+(els) => els.map((a, i) => ({
+    href: a.getAttribute('href'),
+    title: ((a.innerText || a.textContent || '') + '').trim().replace(/\\s+/g, ' ').slice(0, 300),
+    rank: i + 1,
+}))
+"""
+
 
 class SearchEngine:
     """Base class for search engines."""
@@ -22,7 +38,7 @@ class SearchEngine:
     def __init__(self, name: str):
         self.name = name
     
-    async def parse(self, page: Page, query: str, depth: int, collected_links: Dict[str, Set[str]], run_id: Optional[str] = None, keyword: Optional[str] = None, parsing_logs: Optional[Dict[str, Any]] = None):
+    async def parse(self, page: Page, query: str, depth: int, collected_links: Dict[str, Set[str]], run_id: Optional[str] = None, keyword: Optional[str] = None, parsing_logs: Optional[ParsingStats] = None, on_page_links: Optional[PageLinksCallback] = None):
         """Parse search results and collect links.
         
         Args:
@@ -32,9 +48,36 @@ class SearchEngine:
             collected_links: Dictionary to store collected links (URL -> set of sources)
             run_id: Optional run ID for status updates
             keyword: Optional keyword for logging
-            parsing_logs: Optional dictionary to store structured parsing logs
+            parsing_logs: Optional ParsingStats shared by all engines of the parse
+            on_page_links: Optional callback awaited after each results page with
+                the URLs this engine found for the first time on that page
         """
         raise NotImplementedError
+    
+    async def extract_links(self, elems) -> List[Dict[str, Any]]:
+        """Return [{"href", "title", "rank"}] for all elements of a locator in one evaluation.
+
+        Falls back to reading the elements one by one if the bulk evaluation fails.
+        """
+        try:
+            return await elems.evaluate_all(_EXTRACT_LINKS_JS)
+        except Exception as e:
+            logger.warning(f"{self.name}: Bulk link extraction failed, reading links one by one: {e}")
+        links: List[Dict[str, Any]] = []
+        try:
+            count = await elems.count()
+        except Exception as e:
+            logger.warning(f"{self.name}: Cannot count link elements: {e}")
+            return links
+        for i in range(count):
+            try:
+                elem = elems.nth(i)
+                href = await elem.get_attribute("href")
+                title = " ".join(((await elem.text_content()) or "").split())[:300]
+                links.append({"href": href, "title": title, "rank": i + 1})
+            except Exception as e:
+                logger.debug(f"{self.name}: Error extracting link {i}: {e}")
+        return links
 
 
 class YandexEngine(SearchEngine):
@@ -43,7 +86,7 @@ class YandexEngine(SearchEngine):
     def __init__(self):
         super().__init__("YANDEX")
     
-    async def parse(self, page: Page, query: str, depth: int, collected_links: Dict[str, Set[str]], run_id: Optional[str] = None, keyword: Optional[str] = None, parsing_logs: Optional[Dict[str, Any]] = None):
+    async def parse(self, page: Page, query: str, depth: int, collected_links: Dict[str, Set[str]], run_id: Optional[str] = None, keyword: Optional[str] = None, parsing_logs: Optional[ParsingStats] = None, on_page_links: Optional[PageLinksCallback] = None):
         """Parse Yandex search results."""
         start_time = time.time()
         logger.info(f"{self.name}: Начало парсинга '{query}'")
@@ -51,16 +94,10 @@ class YandexEngine(SearchEngine):
         
         initial_count = len(collected_links)
         
-        # Initialize parsing logs for this engine
-        if parsing_logs is not None:
-            if "yandex" not in parsing_logs:
-                parsing_logs["yandex"] = {
-                    "links_by_page": {},
-                    "total_links": 0,
-                    "last_links": [],  # Last 20 links found
-                    "pages_processed": 0
-                }
-            yandex_logs = parsing_logs["yandex"]
+        # Stats of this engine (O(1) updates, serialized by Parser for backend)
+        yandex_stats = parsing_logs.engine("yandex") if parsing_logs is not None else None
+        # Blacklisted domains are skipped before collection (list refreshed by Parser)
+        blacklist = get_blacklist_filter() if settings.BLACKLIST_FILTER_ENABLED else None
         
         # Set additional headers for Yandex
         await page.set_extra_http_headers({
@@ -138,49 +175,49 @@ class YandexEngine(SearchEngine):
             
             logger.info(f"{self.name}: Found {count} link elements on page {n}")
             
-            for i in range(count):
-                try:
-                    href = await elems.nth(i).get_attribute("href")
-                    if href and href.startswith("http") and ".ru" in href:
-                        # Exclude Yandex internal links
-                        if "yandex.ru/search" in href or "yandex.ru/_crpd" in href:
-                            continue
-                        # Exclude other search engines
-                        if any(domain in href.lower() for domain in ["google", "youtube", "yandex"]):
-                            continue
-                        clean_url = href.split("?")[0].split("#")[0]
-                        # Track source for each URL
-                        is_new_url = clean_url not in collected_links
-                        if is_new_url:
-                            collected_links[clean_url] = set()
-                        collected_links[clean_url].add("yandex")
-                        logger.debug(f"{self.name}: Added link: {clean_url} (source: yandex)")
-                        
-                        # Add to parsing logs
-                        if parsing_logs is not None and "yandex" in parsing_logs:
-                            yandex_logs = parsing_logs["yandex"]
-                            is_first_link = yandex_logs["total_links"] == 0
-                            if n not in yandex_logs["links_by_page"]:
-                                yandex_logs["links_by_page"][n] = 0
-                            yandex_logs["links_by_page"][n] += 1
-                            yandex_logs["total_links"] = len([url for url, sources in collected_links.items() if "yandex" in sources])
-                            # Keep last 20 links
-                            if clean_url not in yandex_logs["last_links"]:
-                                yandex_logs["last_links"].append(clean_url)
-                                if len(yandex_logs["last_links"]) > 20:
-                                    yandex_logs["last_links"].pop(0)
-                            # Логирование первой ссылки для проверки обновления логов
-                            if is_first_link:
-                                logger.info(f"{self.name}: First link found and added to logs: {clean_url}, page: {n}")
-                except Exception as e:
-                    logger.debug(f"{self.name}: Error extracting link {i}: {e}")
-                    pass
+            page_links: List[str] = []
+            page_meta: Dict[str, Dict[str, Any]] = {}
+            # Filtering runs in Python on the bulk-extracted hrefs
+            for link in await self.extract_links(elems):
+                href = link.get("href")
+                if not (href and href.startswith("http") and ".ru" in href):
+                    continue
+                # Exclude Yandex internal links
+                if "yandex.ru/search" in href or "yandex.ru/_crpd" in href:
+                    continue
+                # Exclude other search engines
+                if any(domain in href.lower() for domain in ["google", "youtube", "yandex"]):
+                    continue
+                clean_url = href.split("?")[0].split("#")[0]
+                if blacklist is not None and blacklist.is_blocked(clean_url):
+                    continue
+                # Track source for each URL
+                is_new_url = clean_url not in collected_links
+                if is_new_url:
+                    collected_links[clean_url] = set()
+                is_new_for_engine = "yandex" not in collected_links[clean_url]
+                if is_new_for_engine:
+                    page_links.append(clean_url)
+                    page_meta[clean_url] = {"title": link.get("title"), "rank": link.get("rank")}
+                collected_links[clean_url].add("yandex")
+                logger.debug(f"{self.name}: Added link: {clean_url} (source: yandex)")
+                
+                # Add to parsing stats
+                if yandex_stats is not None:
+                    is_first_link = yandex_stats.total_links == 0
+                    yandex_stats.record_link(n, clean_url, is_new_for_engine)
+                    # Логирование первой ссылки для проверки обновления логов
+                    if is_first_link and is_new_for_engine:
+                        logger.info(f"{self.name}: First link found and added to logs: {clean_url}, page: {n}")
             
             logger.info(f"{self.name}: Total collected so far: {len(collected_links)}")
             
+            if on_page_links is not None and page_links:
+                await on_page_links("yandex", n, page_links, page_meta)
+            
             # Update pages processed in logs
-            if parsing_logs is not None and "yandex" in parsing_logs:
-                parsing_logs["yandex"]["pages_processed"] = n
+            if yandex_stats is not None:
+                yandex_stats.pages_processed = n
             
             if n < depth:
                 await human_pause(2, 4)
@@ -197,7 +234,7 @@ class GoogleEngine(SearchEngine):
     def __init__(self):
         super().__init__("GOOGLE")
     
-    async def parse(self, page: Page, query: str, depth: int, collected_links: Dict[str, Set[str]], run_id: Optional[str] = None, keyword: Optional[str] = None, parsing_logs: Optional[Dict[str, Any]] = None):
+    async def parse(self, page: Page, query: str, depth: int, collected_links: Dict[str, Set[str]], run_id: Optional[str] = None, keyword: Optional[str] = None, parsing_logs: Optional[ParsingStats] = None, on_page_links: Optional[PageLinksCallback] = None):
         """Parse Google search results."""
         start_time = time.time()
         logger.info(f"{self.name}: Начало парсинга '{query}'")
@@ -205,16 +242,10 @@ class GoogleEngine(SearchEngine):
         
         initial_count = len(collected_links)
         
-        # Initialize parsing logs for this engine
-        if parsing_logs is not None:
-            if "google" not in parsing_logs:
-                parsing_logs["google"] = {
-                    "links_by_page": {},
-                    "total_links": 0,
-                    "last_links": [],  # Last 20 links found
-                    "pages_processed": 0
-                }
-            google_logs = parsing_logs["google"]
+        # Stats of this engine (O(1) updates, serialized by Parser for backend)
+        google_stats = parsing_logs.engine("google") if parsing_logs is not None else None
+        # Blacklisted domains are skipped before collection (list refreshed by Parser)
+        blacklist = get_blacklist_filter() if settings.BLACKLIST_FILTER_ENABLED else None
         
         print(f"[GOOGLE] Opening search page for: {query}")
         logger.info(f"{self.name}: Opening Google search for '{query}'")
@@ -290,57 +321,57 @@ class GoogleEngine(SearchEngine):
             print(f"[DEBUG] {self.name}: Found {count} total links on page")
             logger.info(f"{self.name}: Found {count} total links on page")
             
-            for i in range(count):
-                try:
-                    href = await elems.nth(i).get_attribute("href")
-                    if href:
-                        # Clean href - remove Google redirect parameters
-                        if href.startswith("/url?q="):
-                            import urllib.parse
-                            parsed = urllib.parse.parse_qs(urllib.parse.urlparse(href).query)
-                            if "q" in parsed:
-                                href = parsed["q"][0]
-                        
-                        # Filter: must be http/https, contain .ru, not be Google/Youtube
-                        if (href and href.startswith("http") and 
-                            ".ru" in href and 
-                            "google" not in href.lower() and
-                            "youtube" not in href.lower()):
-                            clean_href = href.split("&")[0].split("?")[0]
-                            # Track source for each URL
-                            is_new_url = clean_href not in collected_links
-                            if is_new_url:
-                                collected_links[clean_href] = set()
-                            collected_links[clean_href].add("google")
-                            print(f"[FOUND] {self.name}: {clean_href}")
-                            logger.info(f"{self.name}: Found link: {clean_href} (source: google)")
-                            
-                            # Add to parsing logs
-                            if parsing_logs is not None and "google" in parsing_logs:
-                                google_logs = parsing_logs["google"]
-                                is_first_link = google_logs["total_links"] == 0
-                                if n not in google_logs["links_by_page"]:
-                                    google_logs["links_by_page"][n] = 0
-                                google_logs["links_by_page"][n] += 1
-                                google_logs["total_links"] = len([url for url, sources in collected_links.items() if "google" in sources])
-                                # Keep last 20 links
-                                if clean_href not in google_logs["last_links"]:
-                                    google_logs["last_links"].append(clean_href)
-                                    if len(google_logs["last_links"]) > 20:
-                                        google_logs["last_links"].pop(0)
-                                # Логирование первой ссылки для проверки обновления логов
-                                if is_first_link:
-                                    logger.info(f"{self.name}: First link found and added to logs: {clean_href}, page: {n}")
-                except Exception as e:
-                    logger.debug(f"Error extracting link {i}: {e}")
-                    pass
+            page_links: List[str] = []
+            page_meta: Dict[str, Dict[str, Any]] = {}
+            # Filtering runs in Python on the bulk-extracted hrefs
+            for link in await self.extract_links(elems):
+                href = link.get("href")
+                if not href:
+                    continue
+                # Clean href - remove Google redirect parameters
+                if href.startswith("/url?q="):
+                    parsed = urllib.parse.parse_qs(urllib.parse.urlparse(href).query)
+                    if "q" in parsed:
+                        href = parsed["q"][0]
+                
+                # Filter: must be http/https, contain .ru, not be Google/Youtube
+                if not (href and href.startswith("http") and
+                        ".ru" in href and
+                        "google" not in href.lower() and
+                        "youtube" not in href.lower()):
+                    continue
+                clean_href = href.split("&")[0].split("?")[0]
+                if blacklist is not None and blacklist.is_blocked(clean_href):
+                    continue
+                # Track source for each URL
+                is_new_url = clean_href not in collected_links
+                if is_new_url:
+                    collected_links[clean_href] = set()
+                is_new_for_engine = "google" not in collected_links[clean_href]
+                if is_new_for_engine:
+                    page_links.append(clean_href)
+                    page_meta[clean_href] = {"title": link.get("title"), "rank": link.get("rank")}
+                collected_links[clean_href].add("google")
+                print(f"[FOUND] {self.name}: {clean_href}")
+                logger.info(f"{self.name}: Found link: {clean_href} (source: google)")
+                
+                # Add to parsing stats
+                if google_stats is not None:
+                    is_first_link = google_stats.total_links == 0
+                    google_stats.record_link(n, clean_href, is_new_for_engine)
+                    # Логирование первой ссылки для проверки обновления логов
+                    if is_first_link and is_new_for_engine:
+                        logger.info(f"{self.name}: First link found and added to logs: {clean_href}, page: {n}")
             
             print(f"[INFO] {self.name}: Total links collected so far: {len(collected_links)}")
             logger.info(f"{self.name}: Total links collected so far: {len(collected_links)}")
             
+            if on_page_links is not None and page_links:
+                await on_page_links("google", n, page_links, page_meta)
+            
             # Update pages processed in logs
-            if parsing_logs is not None and "google" in parsing_logs:
-                parsing_logs["google"]["pages_processed"] = n
+            if google_stats is not None:
+                google_stats.pages_processed = n
             
             if n < depth:
                 next_btn = page.locator("a#pnnext")
@@ -17,6 +17,7 @@ class ParsedSupplier(BaseModel):
     keywords: List[str] = []
     confidence: float = 0.0
     source: Optional[str] = None
+    source_url: Optional[str] = None
     parsed_at: datetime = datetime.now()
 
 
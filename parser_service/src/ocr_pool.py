@@ -0,0 +1,367 @@
+"""Managed pool of OCR worker processes with resident models.
+
+OCR models (EasyOCR, PP-Structure) take seconds and hundreds of MB to load. They
+used to be built lazily in the service process on first use, so the first OCR
+after a deploy was slow and concurrent uploads loaded duplicate models. Now each
+model kind ("easyocr", "paddle") has one pool of OCR_PAGE_WORKERS spawned
+processes; every worker loads the model once (pool initializer) and keeps it for
+its whole life. With OCR_PRELOAD_ON_STARTUP the workers are started and the
+models loaded when the service starts.
+
+Multi-page PDFs are OCR'ed page-parallel: workers get the path of a temporary
+copy of the PDF plus a page index and rasterize only that page themselves, so
+nothing is rendered up front.
+
+Documents are admitted with request(): at most OCR_MAX_PENDING_REQUESTS may be
+in flight (processing or queued), beyond that OcrQueueFull is raised (HTTP 429).
+
+OCR_PAGE_WORKERS=0 runs OCR in the calling process (the old behaviour).
+"""
+import importlib
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Model kind -> "module:function" that loads the model in a worker
+POOL_PRELOADS = {
+    "easyocr": "src.simple_ocr_wrapper:preload_ocr_reader",
+    "paddle": "src.paddle_ocr_wrapper:get_table_engine",
+}
+
+
+class OcrQueueFull(Exception):
+    """Too many OCR requests in flight; the client should retry later."""
+
+
+def _worker_init(preload: str, threads: int) -> None:
+    """Pool initializer: limit math threads, then load the OCR model once per worker."""
+    if threads > 0:
+        # Must be set before torch/paddle are imported, hence the import by name below
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            os.environ.setdefault(var, str(threads))
+    module_name, _, func_name = preload.partition(":")
+    try:
+        module = importlib.import_module(module_name)
+        getattr(module, func_name)()
+    except Exception as e:
+        # Do not break the pool: the page function retries the load and reports the error per page
+        logging.getLogger(__name__).error(f"OCR worker preload {preload} failed: {type(e).__name__}: {e}")
+    torch = sys.modules.get("torch")
+    if threads > 0 and torch is not None:
+        try:
+            torch.set_num_threads(threads)
+        except Exception:
+            pass
+
+
+def _ping() -> int:
+    """No-op task: forces a worker to start (and preload its model), returns its pid."""
+    return os.getpid()
+
+
+def _percentiles(samples: Iterable[float]) -> Dict[str, Optional[float]]:
+    values = sorted(samples)
+    if not values:
+        return {"count": 0, "avg": None, "p50": None, "p95": None, "max": None}
+    return {
+        "count": len(values),
+        "avg": round(sum(values) / len(values), 3),
+        "p50": round(values[len(values) // 2], 3),
+        "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+        "max": round(values[-1], 3),
+    }
+
+
+@contextmanager
+def pdf_tempfile(pdf_bytes: bytes) -> Iterator[str]:
+    """Write PDF bytes to a temporary file that workers can open by path."""
+    fd, path = tempfile.mkstemp(prefix="ocr_", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_bytes)
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class OcrWorkerPool:
+    """Fixed number of OCR worker processes, each holding one preloaded model."""
+
+    def __init__(
+        self,
+        name: str,
+        preload: str,
+        workers: int = 4,
+        threads_per_worker: int = 0,
+        max_pending: int = 16,
+        latency_window: int = 500,
+    ):
+        self.name = name
+        self.preload = preload  # "module:function" that loads the model in a worker
+        self.workers = max(0, int(workers))
+        if threads_per_worker <= 0 and self.workers:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+        self.threads_per_worker = max(0, int(threads_per_worker))
+        self.max_pending = max(0, int(max_pending))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._worker_pids: set = set()
+        # Metrics
+        self.requests_pending = 0  # admitted documents not finished yet
+        self.requests_done = 0
+        self.rejected = 0
+        self.tasks_done = 0  # pages / images
+        self.tasks_failed = 0
+        self.pool_restarts = 0
+        self._request_seconds: deque = deque(maxlen=latency_window)
+        self._task_seconds: deque = deque(maxlen=latency_window)
+
+    @classmethod
+    def from_settings(cls, name: str) -> "OcrWorkerPool":
+        return cls(
+            name=name,
+            preload=POOL_PRELOADS[name],
+            workers=settings.OCR_PAGE_WORKERS,
+            threads_per_worker=settings.OCR_THREADS_PER_WORKER,
+            max_pending=settings.OCR_MAX_PENDING_REQUESTS,
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: OCR libraries are not fork-safe and the parent may run an event loop
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_worker_init,
+                    initargs=(self.preload, self.threads_per_worker),
+                )
+                self._started_at = time.time()
+                self._worker_pids = set()
+                logger.info(
+                    f"OCR worker pool '{self.name}' started: workers={self.workers}, "
+                    f"threads_per_worker={self.threads_per_worker}"
+                )
+            return self._executor
+
+    def _reset(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._started_at = None
+            self._worker_pids = set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self, timeout: float = 600.0) -> None:
+        """Start all workers and wait until each has loaded its model (blocking)."""
+        if self.workers == 0:
+            return
+        started = time.monotonic()
+        executor = self._get_executor()
+        # Workers are spawned on demand: one ping per worker while none is idle yet
+        futures = [executor.submit(_ping) for _ in range(self.workers)]
+        for future in futures:
+            self._worker_pids.add(future.result(timeout=timeout))
+        logger.info(
+            f"OCR worker pool '{self.name}' preloaded: {len(self._worker_pids)} workers "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        """Admit one OCR request (document); raises OcrQueueFull when too many are in flight."""
+        with self._lock:
+            if self.max_pending and self.requests_pending >= self.max_pending:
+                self.rejected += 1
+                raise OcrQueueFull(f"OCR queue is full ({self.requests_pending} requests in flight)")
+            self.requests_pending += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.requests_pending -= 1
+                self.requests_done += 1
+                self._request_seconds.append(time.monotonic() - started)
+
+    def _task_finished(self, started: float, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.tasks_done += 1
+                self._task_seconds.append(time.monotonic() - started)
+            else:
+                self.tasks_failed += 1
+
+    def _pool_broken(self, e: Exception) -> None:
+        # A worker died (usually OOM): pending tasks fail, next call gets a fresh pool
+        logger.error(f"OCR worker pool '{self.name}' broken, restarting: {e}")
+        self.pool_restarts += 1
+        self._reset()
+
+    def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(*args) on a worker (in-process with workers=0) and return its result."""
+        started = time.monotonic()
+        try:
+            if self.workers == 0:
+                result = fn(*args)
+            else:
+                result = self._get_executor().submit(fn, *args).result()
+        except BrokenProcessPool as e:
+            self._task_finished(started, ok=False)
+            self._pool_broken(e)
+            raise
+        except Exception:
+            self._task_finished(started, ok=False)
+            raise
+        self._task_finished(started, ok=True)
+        return result
+
+    def map_pages(self, fn: Callable[[str, int], Any], pdf_path: str, pages: Iterable[int]) -> Dict[int, Any]:
+        """Run fn(pdf_path, page_index) for every page; returns {page_index: result}.
+
+        Pages that failed are logged and left out of the result.
+        """
+        pages = list(pages)
+        results: Dict[int, Any] = {}
+        if not pages:
+            return results
+
+        if self.workers == 0:
+            for page_index in pages:
+                try:
+                    results[page_index] = self.run(fn, pdf_path, page_index)
+                except Exception as e:
+                    logger.warning(f"OCR of page {page_index + 1} failed: {type(e).__name__}: {e}")
+            return results
+
+        executor = self._get_executor()
+        started = time.monotonic()
+        futures = {executor.submit(fn, pdf_path, page_index): page_index for page_index in pages}
+        broken: Optional[Exception] = None
+        for future in as_completed(futures):
+            page_index = futures[future]
+            try:
+                results[page_index] = future.result()
+                # Pages run in parallel: time from submit is page latency incl. queueing
+                self._task_finished(started, ok=True)
+            except BrokenProcessPool as e:
+                self._task_finished(started, ok=False)
+                broken = e
+            except Exception as e:
+                self._task_finished(started, ok=False)
+                logger.warning(f"OCR of page {page_index + 1} failed: {type(e).__name__}: {e}")
+        if broken is not None:
+            self._pool_broken(broken)
+        return results
+
+    def health(self, timeout: float = 10.0) -> Dict[str, Any]:
+        """Round-trip a no-op task through the pool (does not start a stopped pool)."""
+        if self.workers == 0:
+            return {"ok": True, "mode": "in-process"}
+        with self._lock:
+            executor = self._executor
+        if executor is None:
+            return {"ok": True, "mode": "pool", "started": False}
+        started = time.monotonic()
+        try:
+            pid = executor.submit(_ping).result(timeout=timeout)
+        except Exception as e:
+            return {"ok": False, "mode": "pool", "started": True, "error": f"{type(e).__name__}: {e}"}
+        self._worker_pids.add(pid)
+        return {"ok": True, "mode": "pool", "started": True, "ping_seconds": round(time.monotonic() - started, 3)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            executor = self._executor
+            processes = getattr(executor, "_processes", None) or {}
+            return {
+                "name": self.name,
+                "workers": self.workers,
+                "threads_per_worker": self.threads_per_worker,
+                "started": executor is not None,
+                "uptime_sec": int(time.time() - self._started_at) if self._started_at else None,
+                "workers_alive": sum(1 for p in processes.values() if p.is_alive()),
+                "max_pending": self.max_pending,
+                "requests_pending": self.requests_pending,
+                "requests_done": self.requests_done,
+                "rejected": self.rejected,
+                "tasks_done": self.tasks_done,
+                "tasks_failed": self.tasks_failed,
+                "pool_restarts": self.pool_restarts,
+                "request_latency_sec": _percentiles(self._request_seconds),
+                "task_latency_sec": _percentiles(self._task_seconds),
+            }
+
+    def shutdown(self) -> None:
+        self._reset()
+
+
+_pools: Dict[str, OcrWorkerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_ocr_pool(name: str) -> OcrWorkerPool:
+    """Get OCR worker pool instance for a model kind"""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = OcrWorkerPool.from_settings(name)
+        return pool
+
+
+def ocr_pools() -> Dict[str, OcrWorkerPool]:
+    """Pools created so far, by model kind."""
+    with _pools_lock:
+        return dict(_pools)
+
+
+def shutdown_ocr_pools() -> None:
+    for pool in ocr_pools().values():
+        pool.shutdown()
+
+
+def page_text_layer(page: Any) -> Optional[str]:
+    """Text layer of a PyMuPDF page, or None when the page has to be OCR'ed.
+
+    A page counts as digital when its text layer has PDF_TEXT_LAYER_MIN_CHARS or
+    more characters; a few characters over a scan (stamps, page numbers) do not.
+    Pages without images keep whatever text they have, there is nothing to OCR.
+    """
+    text = (page.get_text() or "").strip()
+    if len(text) >= settings.PDF_TEXT_LAYER_MIN_CHARS:
+        return text
+    try:
+        has_images = bool(page.get_images())
+    except Exception:
+        has_images = True
+    return None if has_images else text
+
+
+def render_pdf_page(pdf_path: str, page_index: int, zoom: Optional[float] = None) -> bytes:
+    """Rasterize one page of a PDF file to PNG bytes (called inside pool workers)."""
+    import fitz  # PyMuPDF
+
+    zoom = settings.OCR_PAGE_ZOOM if zoom is None else zoom
+    doc = fitz.open(pdf_path)
+    try:
+        pix = doc.load_page(page_index).get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        return pix.tobytes("png")
+    finally:
+        doc.close()
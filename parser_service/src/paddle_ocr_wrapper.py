@@ -2,7 +2,6 @@
 PaddleOCR + PP-Structure wrapper for smart document parsing.
 Supports PDF, images with table/layout recognition.
 """
-import os
 import logging
 from io import BytesIO
 from typing import List, Dict, Any, Optional
@@ -12,6 +11,8 @@ try:
 except ImportError as e:
     raise ImportError("Install paddleocr: pip install paddleocr") from e
 
+from src.ocr_pool import get_ocr_pool, page_text_layer, pdf_tempfile, render_pdf_page
+
 logger = logging.getLogger(__name__)
 
 # Global instance to avoid reloading models
@@ -26,10 +27,67 @@ def get_table_engine() -> PPStructure:
         logger.info("PaddleOCR PP-StructureV3 initialized")
     return _table_engine
 
+def _result_tables(result: Any, page_num: int) -> List[Dict[str, Any]]:
+    """Table items of a PP-Structure result."""
+    tables = []
+    for item in result:
+        if item.get('type') == 'table':
+            table_data = {
+                'page': page_num,
+                'bbox': item.get('bbox', []),
+                'html': item.get('html', ''),
+                'res': item.get('res', []),
+                'confidence': item.get('confidence', 0.0)
+            }
+            tables.append(table_data)
+            logger.info(f"Table found on page {page_num}: {len(table_data.get('res', []))} cells")
+    return tables
+
+def _text_layer_tables(page: Any, page_num: int) -> List[Dict[str, Any]]:
+    """Tables of a digital PDF page from its text layer (PyMuPDF find_tables, no OCR)."""
+    tables = []
+    for table in page.find_tables().tables:
+        cells = []
+        for row, values in zip(table.rows, table.extract()):
+            for bbox, text in zip(row.cells, values):
+                if bbox is None or not text:
+                    continue
+                # Row's y for every cell: tables_to_text groups cells into rows by bbox[1]
+                cells.append({'bbox': [bbox[0], row.bbox[1], bbox[2], bbox[3]], 'text': str(text)})
+        tables.append({
+            'page': page_num,
+            'bbox': list(table.bbox),
+            'html': '',
+            'res': cells,
+            'confidence': 1.0
+        })
+        logger.info(f"Table found in text layer of page {page_num}: {len(cells)} cells")
+    return tables
+
+def extract_tables_from_pdf_page(pdf_path: str, page_index: int) -> List[Dict[str, Any]]:
+    """
+    Extract tables from one page of a PDF file (runs in an OCR worker pool worker).
+    
+    Args:
+        pdf_path: Path to the PDF file
+        page_index: 0-based page number
+        
+    Returns:
+        List of table dictionaries of the page
+    """
+    from PIL import Image
+    
+    # Render page to image (higher DPI for better OCR)
+    image = Image.open(BytesIO(render_pdf_page(pdf_path, page_index)))
+    return _result_tables(get_table_engine()(image), page_index + 1)
+
 def extract_tables_from_pdf(pdf_bytes: bytes) -> List[Dict[str, Any]]:
     """
     Extract tables from PDF bytes using PaddleOCR PP-Structure.
     
+    Digital pages are read from the text layer; scanned pages are processed in
+    parallel by the OCR worker pool.
+    
     Args:
         pdf_bytes: PDF file content
         
@@ -41,38 +99,31 @@ def extract_tables_from_pdf(pdf_bytes: bytes) -> List[Dict[str, Any]]:
     except ImportError as e:
         raise ImportError("Install PyMuPDF: pip install pymupdf") from e
     
-    # Convert PDF pages to images
     doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    engine = get_table_engine()
-    all_tables = []
+    page_count = len(doc)
+    page_tables: Dict[int, List[Dict[str, Any]]] = {}
+    ocr_pages = []
+    try:
+        for page_num in range(page_count):
+            page = doc.load_page(page_num)
+            if page_text_layer(page) is not None:
+                try:
+                    page_tables[page_num] = _text_layer_tables(page, page_num + 1)
+                    continue
+                except Exception as e:
+                    logger.warning(f"Text layer table detection failed on page {page_num + 1}, using OCR: {e}")
+            ocr_pages.append(page_num)
+    finally:
+        doc.close()
     
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        # Render page to image (higher DPI for better OCR)
-        pix = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))
-        img_data = pix.tobytes("png")
-        
-        # Convert to PIL Image
-        from PIL import Image
-        image = Image.open(BytesIO(img_data))
-        
-        # Run PP-Structure
-        result = engine(image)
-        
-        # Extract tables from result
-        for item in result:
-            if item.get('type') == 'table':
-                table_data = {
-                    'page': page_num + 1,
-                    'bbox': item.get('bbox', []),
-                    'html': item.get('html', ''),
-                    'res': item.get('res', []),
-                    'confidence': item.get('confidence', 0.0)
-                }
-                all_tables.append(table_data)
-                logger.info(f"Table found on page {page_num + 1}: {len(table_data.get('res', []))} cells")
+    if ocr_pages:
+        pool = get_ocr_pool("paddle")
+        with pdf_tempfile(pdf_bytes) as pdf_path:
+            page_tables.update(pool.map_pages(extract_tables_from_pdf_page, pdf_path, ocr_pages))
     
-    doc.close()
+    all_tables = []
+    for page_num in range(page_count):
+        all_tables.extend(page_tables.get(page_num) or [])
     return all_tables
 
 def extract_tables_from_image(image_bytes: bytes) -> List[Dict[str, Any]]:
@@ -89,22 +140,7 @@ def extract_tables_from_image(image_bytes: bytes) -> List[Dict[str, Any]]:
     
     image = Image.open(BytesIO(image_bytes))
     engine = get_table_engine()
-    result = engine(image)
-    
-    tables = []
-    for item in result:
-        if item.get('type') == 'table':
-            table_data = {
-                'page': 1,
-                'bbox': item.get('bbox', []),
-                'html': item.get('html', ''),
-                'res': item.get('res', []),
-                'confidence': item.get('confidence', 0.0)
-            }
-            tables.append(table_data)
-            logger.info(f"Table found in image: {len(table_data.get('res', []))} cells")
-    
-    return tables
+    return _result_tables(engine(image), 1)
 
 def tables_to_text(tables: List[Dict[str, Any]]) -> str:
     """
@@ -190,7 +226,7 @@ def is_digital_pdf(pdf_bytes: bytes) -> bool:
 def test_paddle_ocr():
     """Test PaddleOCR installation and basic functionality."""
     try:
-        engine = get_table_engine()
+        get_table_engine()
         logger.info("[OK] PaddleOCR PP-Structure initialized successfully")
         return True
     except Exception as e:
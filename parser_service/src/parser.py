@@ -8,6 +8,7 @@ import logging
 
 from src.config import settings
 from src.models import ParsedSupplier
+from src.parsing_stats import ParsingStats
 from src.utils import (
     extract_domain,
     extract_emails,
@@ -23,55 +24,74 @@ logger = logging.getLogger(__name__)
 class Parser:
     """Main parser class."""
     
-    def __init__(self, chrome_cdp_url: str):
+    def __init__(self, chrome_cdp_url: str, browser_pool=None):
         self.chrome_cdp_url = chrome_cdp_url
+        # Optional src.browser_pool.BrowserPool: when set, parse_keyword checks out
+        # a warm context instead of connecting and closing a browser per call
+        self.browser_pool = browser_pool
         self.browser: Optional[Browser] = None
         self.playwright = None
         self._playwright_started = False
         self.context = None
         self._playwright_loop = None  # Store event loop for Windows thread
         self._last_logs_send_time: Dict[str, float] = {}  # run_id -> timestamp для rate limiting
+        self._logs_client: Optional[httpx.AsyncClient] = None
     
-    async def _send_parsing_logs(self, run_id: Optional[str], parsing_logs: Dict[str, Any]) -> None:
-        """Отправляет parsing_logs в backend для инкрементального обновления.
+    def _get_logs_client(self) -> httpx.AsyncClient:
+        """Keep-alive client for parsing log updates (one per parse, closed in _run_engines)."""
+        if self._logs_client is None:
+            self._logs_client = httpx.AsyncClient(base_url=settings.BACKEND_URL, timeout=5.0, trust_env=False)
+        return self._logs_client
+    
+    async def _close_logs_client(self) -> None:
+        if self._logs_client is not None:
+            try:
+                await self._logs_client.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing logs client: {e}")
+            self._logs_client = None
+    
+    async def _send_parsing_logs(self, run_id: Optional[str], parsing_stats: ParsingStats, force: bool = False) -> None:
+        """Отправляет в backend только изменения parsing_logs с последней подтверждённой отправки.
+        
+        Delta (PATCH) несёт base_seq/seq: backend применяет её ровно один раз. Если backend
+        сообщает о расхождении (409) или не знает PATCH, отправляется полный снимок (PUT).
         
         Args:
             run_id: ID запуска парсинга
-            parsing_logs: Словарь с логами парсинга (только для текущего запуска)
+            parsing_stats: ParsingStats текущего запуска
+            force: Игнорировать rate limiting (финальная отправка)
         """
-        if not run_id or not parsing_logs:
+        if not run_id or not parsing_stats or not parsing_stats.has_changes():
             return
         
         # Rate limiting: отправляем не чаще раза в 2.5 секунды (синхронизировано с интервалом отправки)
         import time
-        import json
         current_time = time.time()
         last_send_time = self._last_logs_send_time.get(run_id, 0)
-        if current_time - last_send_time < 2.5:
+        if not force and current_time - last_send_time < 2.5:
             return
         
-        # Логирование размера логов перед отправкой
-        logs_size = len(json.dumps(parsing_logs, ensure_ascii=False))
-        logger.info(f"Sending parsing logs to backend for run_id: {run_id}, size: {logs_size} bytes")
-        
+        url = f"/parsing/runs/{run_id}/logs"
+        payload, checkpoint = parsing_stats.delta()
         try:
-            backend_url = settings.BACKEND_URL
-            url = f"{backend_url}/parsing/runs/{run_id}/logs"
-            
-            async with httpx.AsyncClient(timeout=5.0, trust_env=False) as client:
-                response = await client.put(
-                    url,
-                    json={"parsing_logs": parsing_logs},
-                    headers={"Content-Type": "application/json"}
-                )
-                if response.status_code == 200:
-                    self._last_logs_send_time[run_id] = current_time
-                    logger.info(f"Successfully sent parsing logs to backend for run_id: {run_id}, size: {logs_size} bytes")
-                else:
-                    response_text = response.text[:200] if hasattr(response, 'text') else str(response.status_code)
-                    logger.warning(f"Failed to send parsing logs to backend for run_id: {run_id}, status: {response.status_code}, response: {response_text}, logs_size: {logs_size} bytes")
+            client = self._get_logs_client()
+            response = await client.patch(url, json=payload)
+            if response.status_code in (404, 405, 409):
+                # Backend lost track of our sequence (or is an old version) - resend full snapshot
+                logger.info(f"Delta logs rejected ({response.status_code}) for run_id: {run_id}, sending full snapshot")
+                response = await client.put(url, json={
+                    "parsing_logs": parsing_stats.to_dict(), "seq": checkpoint["seq"], "epoch": parsing_stats.epoch,
+                })
+            if response.status_code == 200:
+                parsing_stats.ack(checkpoint)
+                self._last_logs_send_time[run_id] = current_time
+                logger.debug(f"Sent parsing logs seq={checkpoint['seq']} for run_id: {run_id}")
+            else:
+                response_text = response.text[:200]
+                logger.warning(f"Failed to send parsing logs to backend for run_id: {run_id}, status: {response.status_code}, response: {response_text}")
         except Exception as e:
-            logger.warning(f"Error sending parsing logs to backend for run_id: {run_id}, error: {e}, logs_size: {logs_size} bytes", exc_info=True)
+            logger.warning(f"Error sending parsing logs to backend for run_id: {run_id}, error: {e}")
     
     async def connect_browser(self):
         """Connect to a browser.
@@ -265,20 +285,32 @@ class Parser:
         finally:
             await page.close()
     
-    async def parse_keyword(self, keyword: str, depth: int = 10, source: str = "google", run_id: Optional[str] = None) -> List[dict]:
+    async def parse_keyword(self, keyword: str, depth: int = 10, source: str = "google", run_id: Optional[str] = None, on_links=None) -> List[dict]:
         """Parse suppliers for a keyword.
         
         Args:
             keyword: Search keyword
             max_urls: Maximum number of URLs to parse (used as depth for search pages)
             source: Source for parsing - "google", "yandex", or "both" (default: "google")
+            on_links: Optional async callback receiving a {"event": "links", ...} dict
+                after every search results page (used by /parse/stream)
         """
-        import asyncio
         import logging
-        from src.engines import YandexEngine, GoogleEngine
         
         logger = logging.getLogger(__name__)
         
+        if self.browser_pool is not None:
+            # Warm context from the pool; pages are closed on check-in, browser stays up
+            async with self.browser_pool.lease() as lease:
+                logger.info(f"Using pooled browser slot {lease.slot.index} for keyword: {keyword}")
+                self.browser = lease.browser
+                self.context = lease.context
+                try:
+                    return await self._run_engines(lease.new_page, keyword, depth, source, run_id, on_links)
+                finally:
+                    self.browser = None
+                    self.context = None
+        
         try:
             # Connect to browser first (if not already connected)
             if not self.browser or not self.playwright:
@@ -288,20 +320,6 @@ class Parser:
             else:
                 logger.info(f"Using existing browser connection for keyword: {keyword}")
             
-            # Use depth directly from parameter
-            logger.info(f"Parsing with depth={depth} (type: {type(depth)}), source={source}")
-            if depth != int(depth) or depth < 1:
-                logger.warning(f"Invalid depth value: {depth}, using 1")
-                depth = 1
-            depth = int(depth)  # Ensure it's an integer
-            
-            # Prepare query (add "купить" as in old parser)
-            query = f"{keyword} купить"
-            
-            # Collect links from search engines with source tracking
-            # Use dict to track which source(s) found each URL
-            collected_links: Dict[str, Set[str]] = {}  # URL -> set of sources (google, yandex)
-            
             # Get browser contexts - CRITICAL: use existing browser's contexts
             # This ensures we use the SAME browser window that user sees
             contexts = self.browser.contexts
@@ -346,126 +364,9 @@ class Parser:
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
             })
             
-            # Normalize source parameter (lowercase, strip whitespace)
-            source_normalized = str(source).lower().strip() if source else "google"
-            logger.info(f"Source (original): '{source}', source (normalized): '{source_normalized}'")
-            
-            # Run search engines in parallel
-            tasks = []
-            
-            # Initialize parsing logs structure
-            parsing_logs = {}
-            
-            # Create pages only for requested sources (use elif to ensure only one branch executes)
-            # Note: Playwright automatically activates new pages, but we don't call bring_to_front()
-            # Pages will only be brought to front if CAPTCHA is detected (in wait_for_captcha())
-            if source_normalized == "yandex":
-                logger.info("Creating Yandex page only (source=yandex)")
-                yandex_page = await self.context.new_page()
-                # Don't bring to front - page will be activated only if CAPTCHA is detected
-                yandex_engine = YandexEngine()
-                tasks.append(yandex_engine.parse(yandex_page, query, depth, collected_links, run_id, keyword, parsing_logs))
-            elif source_normalized == "google":
-                logger.info("Creating Google page only (source=google)")
-                google_page = await self.context.new_page()
-                # Don't bring to front - page will be activated only if CAPTCHA is detected
-                google_engine = GoogleEngine()
-                tasks.append(google_engine.parse(google_page, query, depth, collected_links, run_id, keyword, parsing_logs))
-            elif source_normalized == "both":
-                logger.info("Creating both Yandex and Google pages (source=both)")
-                yandex_page = await self.context.new_page()
-                # Don't bring to front - page will be activated only if CAPTCHA is detected
-                yandex_engine = YandexEngine()
-                tasks.append(yandex_engine.parse(yandex_page, query, depth, collected_links, run_id, keyword, parsing_logs))
-                
-                google_page = await self.context.new_page()
-                # Don't bring to front - page will be activated only if CAPTCHA is detected
-                google_engine = GoogleEngine()
-                tasks.append(google_engine.parse(google_page, query, depth, collected_links, run_id, keyword, parsing_logs))
-            else:
-                # Default to Google if source is invalid
-                logger.warning(f"Invalid source '{source_normalized}', defaulting to Google")
-                google_page = await self.context.new_page()
-                # Don't bring to front - page will be activated only if CAPTCHA is detected
-                google_engine = GoogleEngine()
-                tasks.append(google_engine.parse(google_page, query, depth, collected_links, run_id, keyword, parsing_logs))
-            
-            logger.info(f"Created {len(tasks)} task(s) for parsing")
-            
-            # Wait for all search engines to complete
-            if tasks:
-                # Запускаем задачи и периодически отправляем логи в backend
-                # Создаем задачу для периодической отправки логов
-                async def send_logs_periodically():
-                    """Периодически отправляет логи в backend во время парсинга."""
-                    send_count = 0
-                    logger.info(f"Starting periodic logs sending for run_id: {run_id}")
-                    try:
-                        while True:
-                            await asyncio.sleep(2.5)  # Синхронизировано с rate limiting (2.5 сек)
-                            if parsing_logs:
-                                send_count += 1
-                                logger.info(f"Attempting to send logs (attempt #{send_count}) for run_id: {run_id}")
-                                await self._send_parsing_logs(run_id, parsing_logs)
-                            else:
-                                logger.debug(f"No logs to send yet for run_id: {run_id}")
-                    except asyncio.CancelledError:
-                        logger.info(f"Periodic logs sending cancelled for run_id: {run_id}, total attempts: {send_count}")
-                        raise
-                    except Exception as e:
-                        logger.error(f"Error in periodic logs sending for run_id: {run_id}: {e}", exc_info=True)
-                
-                # Запускаем задачу отправки логов в фоне
-                logs_task = asyncio.create_task(send_logs_periodically())
-                
-                try:
-                    # Ждем завершения парсинга
-                    await asyncio.gather(*tasks)
-                finally:
-                    # Отменяем задачу отправки логов и отправляем финальные логи
-                    logs_task.cancel()
-                    try:
-                        await logs_task
-                    except asyncio.CancelledError:
-                        pass
-                    # Отправляем финальные логи
-                    if parsing_logs:
-                        await self._send_parsing_logs(run_id, parsing_logs)
-            
-            # Convert dict to list (no limit - return all collected URLs)
-            urls_with_sources = list(collected_links.items())
-            
-            if not urls_with_sources:
-                logger.warning(f"No URLs found for keyword '{keyword}'")
-                await self.close()
-                return []
-            
-            logger.info(f"Found {len(urls_with_sources)} URLs from search engines")
-            
-            # Return only URLs without parsing pages
-            # Extract domain from each URL and create supplier-like structure
-            suppliers = []
-            for url, sources in urls_with_sources:
-                from urllib.parse import urlparse
-                parsed_url = urlparse(url)
-                domain = parsed_url.netloc.replace("www.", "")
-                
-                # Determine source: "google", "yandex", or "both"
-                url_source = "both" if len(sources) > 1 else list(sources)[0] if sources else "google"
-                
-                suppliers.append(ParsedSupplier(
-                    name=domain,  # Use domain as name since we don't parse pages
-                    domain=domain,
-                    email=None,
-                    phone=None,
-                    inn=None,
-                    source_url=url,
-                    source=url_source  # Add source information
-                ))
-            
+            result = await self._run_engines(self.context.new_page, keyword, depth, source, run_id, on_links)
             await self.close()
-            # Return suppliers with parsing logs
-            return suppliers, parsing_logs
+            return result
         except Exception as e:
             logger.error(f"Error in parse_keyword: {e}", exc_info=True)
             # Ensure cleanup on error
@@ -475,3 +376,167 @@ class Parser:
                 pass
             raise
 
+    async def _run_engines(self, new_page, keyword: str, depth: int, source: str, run_id: Optional[str], on_links=None):
+        """Run search engines on pages from new_page() and collect supplier URLs.
+        
+        Returns:
+            (suppliers, parsing_logs)
+        """
+        from src.engines import YandexEngine, GoogleEngine
+        
+        # Use depth directly from parameter
+        logger.info(f"Parsing with depth={depth} (type: {type(depth)}), source={source}")
+        if depth != int(depth) or depth < 1:
+            logger.warning(f"Invalid depth value: {depth}, using 1")
+            depth = 1
+        depth = int(depth)  # Ensure it's an integer
+        
+        # Prepare query (add "купить" as in old parser)
+        query = f"{keyword} купить"
+        
+        if settings.BLACKLIST_FILTER_ENABLED:
+            from src.blacklist_filter import get_blacklist_filter
+            await get_blacklist_filter().refresh_if_stale()
+        
+        # Collect links from search engines with source tracking
+        # Use dict to track which source(s) found each URL
+        collected_links: Dict[str, Set[str]] = {}  # URL -> set of sources (google, yandex)
+        
+        async def emit_page_links(engine: str, page_num: int, urls: List[str], meta: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+            """Forward one results page to on_links; never breaks the engine loop."""
+            if on_links is None:
+                return
+            from urllib.parse import urlparse
+            links = [
+                {
+                    "url": url,
+                    "domain": urlparse(url).netloc.replace("www.", ""),
+                    "source": "both" if len(collected_links.get(url, ())) > 1 else engine,
+                    **((meta or {}).get(url) or {}),
+                }
+                for url in urls
+            ]
+            try:
+                await on_links({"event": "links", "engine": engine, "page": page_num, "links": links})
+            except Exception as e:
+                logger.warning(f"on_links callback failed for {engine} page {page_num}: {e}")
+        
+        # Normalize source parameter (lowercase, strip whitespace)
+        source_normalized = str(source).lower().strip() if source else "google"
+        logger.info(f"Source (original): '{source}', source (normalized): '{source_normalized}'")
+        
+        # Run search engines in parallel
+        tasks = []
+        
+        # Per-engine stats shared by all engines; serialized with to_dict() for backend
+        parsing_stats = ParsingStats()
+        
+        # Create pages only for requested sources (use elif to ensure only one branch executes)
+        # Note: Playwright automatically activates new pages, but we don't call bring_to_front()
+        # Pages will only be brought to front if CAPTCHA is detected (in wait_for_captcha())
+        if source_normalized == "yandex":
+            logger.info("Creating Yandex page only (source=yandex)")
+            yandex_page = await new_page()
+            # Don't bring to front - page will be activated only if CAPTCHA is detected
+            yandex_engine = YandexEngine()
+            tasks.append(yandex_engine.parse(yandex_page, query, depth, collected_links, run_id, keyword, parsing_stats, on_page_links=emit_page_links))
+        elif source_normalized == "google":
+            logger.info("Creating Google page only (source=google)")
+            google_page = await new_page()
+            # Don't bring to front - page will be activated only if CAPTCHA is detected
+            google_engine = GoogleEngine()
+            tasks.append(google_engine.parse(google_page, query, depth, collected_links, run_id, keyword, parsing_stats, on_page_links=emit_page_links))
+        elif source_normalized == "both":
+            logger.info("Creating both Yandex and Google pages (source=both)")
+            yandex_page = await new_page()
+            # Don't bring to front - page will be activated only if CAPTCHA is detected
+            yandex_engine = YandexEngine()
+            tasks.append(yandex_engine.parse(yandex_page, query, depth, collected_links, run_id, keyword, parsing_stats, on_page_links=emit_page_links))
+            
+            google_page = await new_page()
+            # Don't bring to front - page will be activated only if CAPTCHA is detected
+            google_engine = GoogleEngine()
+            tasks.append(google_engine.parse(google_page, query, depth, collected_links, run_id, keyword, parsing_stats, on_page_links=emit_page_links))
+        else:
+            # Default to Google if source is invalid
+            logger.warning(f"Invalid source '{source_normalized}', defaulting to Google")
+            google_page = await new_page()
+            # Don't bring to front - page will be activated only if CAPTCHA is detected
+            google_engine = GoogleEngine()
+            tasks.append(google_engine.parse(google_page, query, depth, collected_links, run_id, keyword, parsing_stats, on_page_links=emit_page_links))
+        
+        logger.info(f"Created {len(tasks)} task(s) for parsing")
+        
+        # Wait for all search engines to complete
+        if tasks:
+            # Запускаем задачи и периодически отправляем логи в backend
+            # Создаем задачу для периодической отправки логов
+            async def send_logs_periodically():
+                """Периодически отправляет логи в backend во время парсинга."""
+                send_count = 0
+                logger.info(f"Starting periodic logs sending for run_id: {run_id}")
+                try:
+                    while True:
+                        await asyncio.sleep(2.5)  # Синхронизировано с rate limiting (2.5 сек)
+                        if parsing_stats:
+                            send_count += 1
+                            logger.info(f"Attempting to send logs (attempt #{send_count}) for run_id: {run_id}")
+                            await self._send_parsing_logs(run_id, parsing_stats)
+                        else:
+                            logger.debug(f"No logs to send yet for run_id: {run_id}")
+                except asyncio.CancelledError:
+                    logger.info(f"Periodic logs sending cancelled for run_id: {run_id}, total attempts: {send_count}")
+                    raise
+                except Exception as e:
+                    logger.error(f"Error in periodic logs sending for run_id: {run_id}: {e}", exc_info=True)
+            
+            # Запускаем задачу отправки логов в фоне
+            logs_task = asyncio.create_task(send_logs_periodically())
+            
+            try:
+                # Ждем завершения парсинга
+                await asyncio.gather(*tasks)
+            finally:
+                # Отменяем задачу отправки логов и отправляем финальные логи
+                logs_task.cancel()
+                try:
+                    await logs_task
+                except asyncio.CancelledError:
+                    pass
+                # Отправляем финальные логи
+                if parsing_stats:
+                    await self._send_parsing_logs(run_id, parsing_stats, force=True)
+                await self._close_logs_client()
+        
+        # Convert dict to list (no limit - return all collected URLs)
+        urls_with_sources = list(collected_links.items())
+        
+        if not urls_with_sources:
+            logger.warning(f"No URLs found for keyword '{keyword}'")
+            return [], parsing_stats.to_dict()
+        
+        logger.info(f"Found {len(urls_with_sources)} URLs from search engines")
+        
+        # Return only URLs without parsing pages
+        # Extract domain from each URL and create supplier-like structure
+        suppliers = []
+        for url, sources in urls_with_sources:
+            from urllib.parse import urlparse
+            parsed_url = urlparse(url)
+            domain = parsed_url.netloc.replace("www.", "")
+            
+            # Determine source: "google", "yandex", or "both"
+            url_source = "both" if len(sources) > 1 else list(sources)[0] if sources else "google"
+            
+            suppliers.append(ParsedSupplier(
+                name=domain,  # Use domain as name since we don't parse pages
+                domain=domain,
+                email=None,
+                phone=None,
+                inn=None,
+                source_url=url,
+                source=url_source  # Add source information
+            ))
+        
+        # Return suppliers with parsing logs
+        return suppliers, parsing_stats.to_dict()
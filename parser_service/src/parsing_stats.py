@@ -0,0 +1,119 @@
+"""Per-engine parsing statistics (the parsing_logs sent to backend)."""
+import uuid
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+
+class EngineStats:
+    """Counters for one search engine, updated in O(1) per link."""
+
+    def __init__(self, last_links_size: int = 20):
+        self.total_links = 0  # unique URLs found by this engine
+        self.links_by_page: Dict[int, int] = {}  # page -> accepted links (incl. repeats)
+        self.last_links: deque = deque(maxlen=last_links_size)
+        self.pages_processed = 0
+
+    def record_link(self, page: int, url: str, is_new_for_engine: bool) -> None:
+        """Count an accepted link; is_new_for_engine=False for repeats of a known URL."""
+        self.links_by_page[page] = self.links_by_page.get(page, 0) + 1
+        if is_new_for_engine:
+            # Each URL is new only once per engine, so last_links needs no membership check
+            self.total_links += 1
+            self.last_links.append(url)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "links_by_page": dict(self.links_by_page),
+            "total_links": self.total_links,
+            "last_links": list(self.last_links),
+            "pages_processed": self.pages_processed,
+        }
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """Counter values to compute the next delta against."""
+        return {"total_links": self.total_links, "links_by_page": dict(self.links_by_page)}
+
+    def delta_since(self, base: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Increments since checkpoint `base` (None = since start)."""
+        base = base or {}
+        base_pages = base.get("links_by_page", {})
+        new_count = self.total_links - base.get("total_links", 0)
+        return {
+            "total_links_inc": new_count,
+            "links_by_page_inc": {
+                page: count - base_pages.get(page, 0)
+                for page, count in self.links_by_page.items()
+                if count != base_pages.get(page, 0)
+            },
+            # Only the tail is kept anyway (last_links is bounded)
+            "new_links": list(self.last_links)[-new_count:] if new_count > 0 else [],
+            "pages_processed": self.pages_processed,
+        }
+
+
+class ParsingStats:
+    """Stats of all engines of one parse; serialized with to_dict() for _send_parsing_logs.
+
+    Also tracks what the backend has acknowledged: delta() returns only increments
+    since the last ack, tagged with base_seq/seq so the backend can apply each delta
+    exactly once (see PATCH /parsing/runs/{run_id}/logs). epoch is unique per parse,
+    so a retried run (same run_id, seq starting over) is not taken for a duplicate.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex
+        self.engines: Dict[str, EngineStats] = {}
+        self.seq = 0  # last sequence number acknowledged by backend
+        self._acked: Dict[str, Dict[str, Any]] = {}
+        self._acked_pages: Dict[str, int] = {}
+
+    def engine(self, name: str) -> EngineStats:
+        """Get (or create) stats for an engine ("google", "yandex")."""
+        stats = self.engines.get(name)
+        if stats is None:
+            stats = self.engines[name] = EngineStats()
+        return stats
+
+    def get(self, name: str) -> Optional[EngineStats]:
+        return self.engines.get(name)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: stats.to_dict() for name, stats in self.engines.items()}
+
+    def has_changes(self) -> bool:
+        """True if something changed since the last acknowledged delta."""
+        for name, stats in self.engines.items():
+            acked = self._acked.get(name)
+            if acked is None or acked["total_links"] != stats.total_links or acked["links_by_page"] != stats.links_by_page:
+                return True
+            if self._acked_pages.get(name) != stats.pages_processed:
+                return True
+        return False
+
+    def delta(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Build the next delta payload.
+
+        Returns:
+            (payload, checkpoint) - pass checkpoint to ack() once backend accepted payload
+        """
+        seq = self.seq + 1
+        payload = {
+            "epoch": self.epoch,
+            "base_seq": self.seq,
+            "seq": seq,
+            "engines": {name: stats.delta_since(self._acked.get(name)) for name, stats in self.engines.items()},
+        }
+        checkpoint = {
+            "seq": seq,
+            "counters": {name: stats.checkpoint() for name, stats in self.engines.items()},
+            "pages": {name: stats.pages_processed for name, stats in self.engines.items()},
+        }
+        return payload, checkpoint
+
+    def ack(self, checkpoint: Dict[str, Any]) -> None:
+        self.seq = checkpoint["seq"]
+        self._acked = checkpoint["counters"]
+        self._acked_pages = checkpoint["pages"]
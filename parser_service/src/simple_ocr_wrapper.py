@@ -2,10 +2,12 @@
 Simple OCR wrapper using EasyOCR as fallback for PaddleOCR issues.
 Lightweight, reliable for basic table extraction.
 """
-import os
 import logging
 from io import BytesIO
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Optional
+
+from src.ocr_pool import get_ocr_pool, page_text_layer, pdf_tempfile, render_pdf_page
+
 try:
     import easyocr
 except ImportError:
@@ -29,13 +31,18 @@ def get_ocr_reader() -> Any:
     return _reader
 
 
+def preload_ocr_reader() -> None:
+    """Load the EasyOCR model ahead of the first request (no-op without easyocr)."""
+    if easyocr is not None:
+        get_ocr_reader()
+
+
 def _tesseract_image_ocr(image_bytes: bytes) -> str:
     try:
         import pytesseract
     except Exception:
         return ""
     from PIL import Image
-    import numpy as np
 
     image = Image.open(BytesIO(image_bytes))
     return pytesseract.image_to_string(image, lang="rus+eng") or ""
@@ -164,12 +171,28 @@ def extract_text_from_image(image_bytes: bytes) -> str:
         uniq.append(t)
     return "\n".join(uniq)
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+def ocr_pdf_page(pdf_path: str, page_index: int) -> str:
+    """
+    OCR one page of a PDF file (runs in an OCR worker pool worker).
+    
+    Args:
+        pdf_path: Path to the PDF file
+        page_index: 0-based page number
+        
+    Returns:
+        Extracted text of the page
+    """
+    return extract_text_from_image(render_pdf_page(pdf_path, page_index))
+
+def extract_text_from_pdf(pdf_bytes: bytes, use_text_layer: bool = False) -> str:
     """
     Extract text from PDF bytes using EasyOCR (for scanned PDFs).
     
+    Pages are OCR'ed in parallel by the OCR worker pool and reassembled in page order.
+    
     Args:
         pdf_bytes: PDF file content
+        use_text_layer: Take text of digital pages from the PDF text layer, OCR only the rest
         
     Returns:
         Extracted text as string
@@ -180,21 +203,31 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> str:
         raise ImportError("Install PyMuPDF: pip install pymupdf") from e
     
     doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    all_text = []
+    page_count = len(doc)
+    page_texts: Dict[int, str] = {}
+    ocr_pages = []
+    try:
+        for page_num in range(page_count):
+            text = page_text_layer(doc.load_page(page_num)) if use_text_layer else None
+            if text is None:
+                ocr_pages.append(page_num)
+            else:
+                page_texts[page_num] = text
+    finally:
+        doc.close()
     
-    for page_num in range(len(doc)):
-        page = doc.load_page(page_num)
-        # Render page to image
-        pix = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))
-        img_data = pix.tobytes("png")
-        
-        # Extract text from page image
-        page_text = extract_text_from_image(img_data)
+    if ocr_pages:
+        logger.info(f"PDF: {page_count - len(ocr_pages)} digital pages, OCR of {len(ocr_pages)} pages")
+        pool = get_ocr_pool("easyocr")
+        with pdf_tempfile(pdf_bytes) as pdf_path:
+            page_texts.update(pool.map_pages(ocr_pdf_page, pdf_path, ocr_pages))
+    
+    all_text = []
+    for page_num in range(page_count):
+        page_text = page_texts.get(page_num) or ""
         if page_text.strip():
             all_text.append(f"=== PAGE {page_num + 1} ===")
             all_text.append(page_text)
-    
-    doc.close()
     return "\n".join(all_text)
 
 def is_digital_pdf(pdf_bytes: bytes) -> bool:
@@ -267,17 +300,13 @@ def smart_extract_text(filename: str, content: bytes) -> str:
     name = (filename or "").lower()
     
     if name.endswith(".pdf"):
-        # Check if digital or scanned
-        if is_digital_pdf(content):
-            logger.info("Digital PDF detected, using direct text extraction")
-            return extract_text_from_digital_pdf(content)
-        else:
-            logger.info("Scanned PDF detected, using OCR")
-            return extract_text_from_pdf(content)
+        # Digital pages are read from the text layer, scanned pages are OCR'ed
+        return extract_text_from_pdf(content, use_text_layer=True)
     
     elif name.endswith((".png", ".jpg", ".jpeg")):
         logger.info("Image file detected, using OCR")
-        return extract_text_from_image(content)
+        # On a pool worker: the service process never loads its own OCR model
+        return get_ocr_pool("easyocr").run(extract_text_from_image, content)
     
     elif name.endswith((".docx", ".xlsx")):
         # For Office docs, we'll use existing extractors
@@ -295,7 +324,7 @@ def smart_extract_text(filename: str, content: bytes) -> str:
 def test_easyocr():
     """Test EasyOCR installation and basic functionality."""
     try:
-        reader = get_ocr_reader()
+        get_ocr_reader()
         logger.info("[OK] EasyOCR initialized successfully")
         return True
     except Exception as e: